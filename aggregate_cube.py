@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from data_schema import to_category
+
+CUBE_DIMENSIONS = ['department', 'status', 'priority', 'manager']
+CUBE_MEASURES = ['budget', 'spent', 'progress', 'risk_score']
+
+# Risk score at or above which a project counts as high risk
+HIGH_RISK_THRESHOLD = 7
+
+class AggregateCube:
+    """Counts, sums and sums of squares per (department, status, priority, manager) cell"""
+    
+    def __init__(self, projects_df, dimensions=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+        """Aggregate every project into its dense cube cell in one pass per measure"""
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.categories = {}
+        
+        codes = []
+        for dim in self.dimensions:
+            values = to_category(projects_df[dim])
+            self.categories[dim] = pd.Index(values.cat.categories)
+            codes.append(values.cat.codes.to_numpy())
+        
+        self.shape = tuple(len(self.categories[dim]) for dim in self.dimensions)
+        size = int(np.prod(self.shape))
+        
+        # Rows with a missing dimension value cannot be placed in a cell
+        valid = np.logical_and.reduce([dim_codes >= 0 for dim_codes in codes])
+        cells = np.ravel_multi_index([dim_codes[valid] for dim_codes in codes], self.shape)
+        
+        self.count = np.bincount(cells, minlength=size).reshape(self.shape)
+        self.sums = {}
+        self.sums_of_squares = {}
+        for measure in self.measures:
+            values = projects_df[measure].to_numpy(np.float64)[valid]
+            self.sums[measure] = np.bincount(cells, weights=values, minlength=size).reshape(self.shape)
+            self.sums_of_squares[measure] = np.bincount(
+                cells, weights=values * values, minlength=size
+            ).reshape(self.shape)
+        
+        high_risk = projects_df['risk_score'].to_numpy()[valid] >= HIGH_RISK_THRESHOLD
+        self.high_risk = np.bincount(cells[high_risk], minlength=size).reshape(self.shape)
+    
+    def _select(self, cube, filters):
+        """Keep only the cells whose dimension values pass the filters"""
+        for axis, dim in enumerate(self.dimensions):
+            values = (filters or {}).get(dim)
+            if values:
+                cube = np.compress(self.categories[dim].isin(list(values)), cube, axis=axis)
+        return cube
+    
+    def _selected_categories(self, dim, filters):
+        """Categories of one dimension that pass the filters"""
+        values = (filters or {}).get(dim)
+        if not values:
+            return self.categories[dim]
+        return self.categories[dim][self.categories[dim].isin(list(values))]
+    
+    def rollup(self, by=None, filters=None):
+        """Roll the filtered cube up to one row per value of `by`, or a single 'total' row"""
+        if by is None:
+            keep_axes = ()
+            index = pd.Index(['total'])
+        else:
+            keep_axes = (self.dimensions.index(by),)
+            index = self._selected_categories(by, filters)
+        
+        sum_axes = tuple(axis for axis in range(len(self.dimensions)) if axis not in keep_axes)
+        
+        def roll(cube):
+            return np.atleast_1d(self._select(cube, filters).sum(axis=sum_axes))
+        
+        result = pd.DataFrame({'count': roll(self.count), 'high_risk': roll(self.high_risk)}, index=index)
+        for measure in self.measures:
+            result[f'{measure}_sum'] = roll(self.sums[measure])
+            result[f'{measure}_sum_sq'] = roll(self.sums_of_squares[measure])
+        
+        # Means and standard deviations come from the rolled-up sums
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for measure in self.measures:
+                mean = result[f'{measure}_sum'] / result['count']
+                variance = result[f'{measure}_sum_sq'] / result['count'] - mean ** 2
+                result[f'{measure}_mean'] = mean
+                result[f'{measure}_std'] = np.sqrt(variance.clip(lower=0))
+        
+        if by is not None:
+            result = result[result['count'] > 0]
+            result.index.name = by
+        return result
+    
+    def totals(self, filters=None):
+        """Single row of totals for the filtered cube"""
+        return self.rollup(filters=filters).iloc[0]
@@ -0,0 +1,125 @@
+import ast
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Declarative rules: a condition over project columns, the alert style it shows with, and its label.
+# Conditions are Python expressions where and/or/not apply row by row; `today` is the evaluation date.
+ALERT_RULES = {
+    'high_risk_high_priority': {
+        'label': 'High priority project at high risk',
+        'condition': "risk_score >= 7 and priority == 'High'",
+        'severity': 'danger'
+    },
+    'spend_ahead_of_progress': {
+        'label': 'Spend running 15+ points ahead of progress',
+        'condition': "spent / budget * 100 - progress > 15",
+        'severity': 'warning'
+    },
+    'past_due': {
+        'label': 'Past its planned end and not complete',
+        'condition': "end_date < today and status != 'Complete'",
+        'severity': 'warning'
+    }
+}
+
+# Syntax a condition may use once and/or/not are rewritten to element-wise operators
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+    ast.BitAnd, ast.BitOr, ast.Invert, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE
+)
+
+class AlertEngine:
+    """Alert rules compiled once into vectorized expressions evaluated over whole snapshot columns"""
+    
+    def __init__(self, rules=ALERT_RULES):
+        """Initialize engine, compiling every rule's condition"""
+        self.rules = rules
+        self._conditions = {rule_id: compile_condition(rule['condition']) for rule_id, rule in rules.items()}
+    
+    def evaluate(self, projects_df, as_of=None):
+        """Active alerts, one row per rule and matching project, ordered by rule and then row position"""
+        # Each referenced column is pulled out once and shared by every rule
+        namespace = {'today': pd.Timestamp(as_of or datetime.now()).normalize()}
+        for _, names in self._conditions.values():
+            for name in names:
+                if name in namespace:
+                    continue
+                if name not in projects_df.columns:
+                    raise ValueError(f"Alert rule refers to unknown column: {name}")
+                namespace[name] = projects_df[name]
+        
+        rule_positions = []
+        for code, _ in self._conditions.values():
+            matches = eval(code, {'__builtins__': {}}, namespace)
+            matches = np.broadcast_to(np.asarray(matches, dtype=bool), len(projects_df))
+            rule_positions.append(np.flatnonzero(matches))
+        
+        positions = np.concatenate(rule_positions) if rule_positions else np.array([], dtype=np.intp)
+        rule_codes = np.repeat(np.arange(len(self.rules)), [len(rule_rows) for rule_rows in rule_positions])
+        return pd.DataFrame({
+            'rule_id': pd.Categorical.from_codes(rule_codes, categories=list(self.rules)),
+            'position': positions,
+            'project_id': projects_df['project_id'].to_numpy()[positions],
+            'project_name': projects_df['project_name'].take(positions).to_numpy(),
+            'label': np.array([rule['label'] for rule in self.rules.values()], dtype=object)[rule_codes],
+            'severity': np.array([rule['severity'] for rule in self.rules.values()], dtype=object)[rule_codes]
+        })
+    
+    def diff(self, previous, current):
+        """(raised, resolved) alerts between two evaluations, matched on rule and project id"""
+        if previous is None:
+            return current.iloc[:0], current.iloc[:0]
+        
+        previous_keys = _alert_keys(previous)
+        current_keys = _alert_keys(current)
+        raised = current[~np.isin(current_keys, previous_keys)]
+        resolved = previous[~np.isin(previous_keys, current_keys)]
+        return raised, resolved
+
+def compile_condition(condition):
+    """Compile a rule condition into a code object over column Series, with the names it reads"""
+    tree = _ElementwiseLogic().visit(ast.parse(condition, mode='eval'))
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in alert condition {condition!r}: {type(node).__name__}")
+    
+    names = sorted({node.id for node in ast.walk(tree) if isinstance(node, ast.Name)})
+    return compile(ast.fix_missing_locations(tree), '<alert rule>', 'eval'), names
+
+class _ElementwiseLogic(ast.NodeTransformer):
+    """Rewrite and/or/not and chained comparisons into operators that apply row by row"""
+    
+    def visit_BoolOp(self, node):
+        """a and b -> (a) & (b); a or b -> (a) | (b)"""
+        self.generic_visit(node)
+        operator = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        combined = node.values[0]
+        for value in node.values[1:]:
+            combined = ast.BinOp(left=combined, op=operator, right=value)
+        return combined
+    
+    def visit_UnaryOp(self, node):
+        """not a -> ~(a)"""
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=node.operand)
+        return node
+    
+    def visit_Compare(self, node):
+        """a < b < c -> (a < b) & (b < c)"""
+        self.generic_visit(node)
+        operands = [node.left] + node.comparators
+        pairs = [
+            ast.Compare(left=left, ops=[op], comparators=[right])
+            for left, op, right in zip(operands, node.ops, operands[1:])
+        ]
+        combined = pairs[0]
+        for pair in pairs[1:]:
+            combined = ast.BinOp(left=combined, op=ast.BitAnd(), right=pair)
+        return combined
+
+def _alert_keys(alerts):
+    """One int64 key per alert from its rule code and project id"""
+    return (alerts['rule_id'].cat.codes.to_numpy(np.int64) << 40) | alerts['project_id'].to_numpy(np.int64)
@@ -1,10 +1,28 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+import html
+import os
 import numpy as np
-import random
+import pandas as pd
+import streamlit as st
+from datetime import datetime
+from data_access import get_provider
+from data_generator import DataGenerator
+from data_export import EXPORT_FORMATS, ExportCache, available_formats
+from data_refresher import SnapshotRefresher
+from aggregate_cube import AggregateCube
+from alert_engine import AlertEngine
+from data_store import ProjectDataStore
+from filter_index import DATE_FILTER_KEY, FilterIndex
+from interval_index import DATE_FILTER_MODES
+from project_table import ProjectTable, page_count
+from kpi_engine import KpiEngine, kpi_values
+from resource_allocation import ALLOCATION_GROUPS, ResourceAllocation
+from risk_simulation import RiskSimulation
+from search_index import SearchIndex
+from snapshot_history import SnapshotHistory
+from utils.styling import PERCENT_FORMAT, SCORE_FORMAT, format_number
+from utils.styling import apply_custom_styling, column_format_config, create_alert, create_kpi_card
+from utils.chart_components import ChartComponents
+from utils.figure_cache import FigureCache
 
 # Page configuration
 st.set_page_config(
@@ -14,377 +32,117 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Apply custom styling
-def apply_custom_styling():
-    """Apply Zumiez brand styling to the Streamlit dashboard"""
-    
-    st.markdown("""
-    <style>
-    /* Zumiez Brand Colors */
-    :root {
-        --zumiez-orange: #FF6B35;
-        --zumiez-dark: #262730;
-        --zumiez-light: #F5F5F5;
-        --zumiez-white: #FFFFFF;
-        --success-green: #4CAF50;
-        --warning-orange: #FF9800;
-        --danger-red: #F44336;
-        --info-blue: #2196F3;
-    }
-    
-    /* Main app styling */
-    .main .block-container {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-    }
-    
-    /* Header styling */
-    h1, h2, h3 {
-        color: var(--zumiez-dark) !important;
-        font-weight: 600;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        background-color: var(--zumiez-orange);
-        color: white;
-        border: none;
-        border-radius: 6px;
-        padding: 0.5rem 1rem;
-        font-weight: 500;
-    }
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab"] {
-        padding: 8px 24px;
-        background-color: var(--zumiez-light);
-        border-radius: 6px;
-        color: var(--zumiez-dark);
-        font-weight: 500;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background-color: var(--zumiez-orange);
-        color: white;
-    }
-    
-    /* Hide Streamlit branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    </style>
-    """, unsafe_allow_html=True)
+# Live refresh interval in seconds (the spec asks for 30); 0 turns background polling off
+REFRESH_SECONDS = int(os.environ.get('SCORECARD_REFRESH_SECONDS', '30'))
 
-# Data Generator Class
-class DataGenerator:
-    """Generate realistic demonstration data for Zumiez project dashboard"""
-    
-    def __init__(self):
-        """Initialize data generator with realistic Zumiez project scenarios"""
-        self.project_categories = {
-            'Retail Technology': [
-                'Zumiez Mobile App 2.0 Launch',
-                'POS System Rollout - Q1 Stores',
-                'Inventory Management System Enhancement',
-                'E-commerce Platform Mobile Optimization',
-                'Customer Data Platform Integration',
-                'Digital Receipt System Implementation',
-                'Store WiFi Infrastructure Upgrade',
-                'Loyalty Program App Development'
-            ],
-            'Store Operations': [
-                'Seattle Flagship Store Renovation',
-                'Snowboard Season Merchandising Rollout',
-                'New Store Opening: Portland Downtown',
-                'Visual Merchandising Standards Update',
-                'Store Security System Upgrade',
-                'Energy Efficiency Retrofit Program',
-                'Store Layout Optimization Project',
-                'Holiday Season Store Prep Initiative'
-            ],
-            'Brand & Marketing': [
-                'Summer Campaign: Skateboard Collection',
-                'Influencer Partnership Program Launch',
-                'Social Media Content Strategy Overhaul',
-                'Brand Ambassador Training Program',
-                'Digital Marketing Analytics Platform',
-                'Customer Experience Research Project',
-                'Sustainability Marketing Campaign',
-                'Youth Culture Trend Analysis Initiative'
-            ],
-            'Supply Chain': [
-                'West Coast Distribution Center Expansion',
-                'Vendor Portal Integration Project',
-                'Supply Chain Visibility Platform',
-                'Sustainable Packaging Initiative',
-                'International Shipping Optimization',
-                'Inventory Forecasting System Upgrade',
-                'Vendor Performance Management System',
-                'Logistics Cost Optimization Program'
-            ]
-        }
-        
-        self.project_managers = [
-            'Sarah Johnson', 'Mike Chen', 'Emily Rodriguez', 'David Kim',
-            'Jessica Williams', 'Alex Thompson', 'Maria Garcia', 'Ryan O\'Connor',
-            'Amanda Foster', 'Chris Martinez', 'Nicole Davis', 'Brandon Lee'
-        ]
-        
-        self.statuses = ['On Track', 'At Risk', 'Behind', 'Complete']
-        
-    def generate_projects_data(self, num_projects=25):
-        """Generate realistic project data for demonstration purposes"""
-        projects = []
-        
-        for _ in range(num_projects):
-            # Select random category and project
-            category = random.choice(list(self.project_categories.keys()))
-            project_name = random.choice(self.project_categories[category])
-            
-            # Generate project details
-            start_date = datetime.now() - timedelta(days=random.randint(30, 180))
-            duration_days = random.randint(60, 365)
-            end_date = start_date + timedelta(days=duration_days)
-            
-            # Budget based on project category
-            budget_ranges = {
-                'Retail Technology': (50000, 2000000),
-                'Store Operations': (25000, 800000),
-                'Brand & Marketing': (15000, 500000),
-                'Supply Chain': (100000, 1500000)
-            }
-            
-            min_budget, max_budget = budget_ranges[category]
-            budget = random.randint(min_budget, max_budget)
-            
-            # Progress and spending
-            progress = random.uniform(15, 95)
-            spent_ratio = min(progress / 100 + random.uniform(-0.1, 0.2), 1.0)
-            spent = budget * spent_ratio
-            
-            # Risk score based on various factors
-            risk_score = self._calculate_risk_score(progress, spent_ratio, start_date, end_date)
-            
-            # Status based on risk and progress
-            status = self._determine_status(progress, risk_score)
-            
-            project = {
-                'project_name': project_name,
-                'department': category,
-                'manager': random.choice(self.project_managers),
-                'status': status,
-                'budget': budget,
-                'spent': spent,
-                'progress': progress,
-                'risk_score': risk_score,
-                'start_date': start_date.strftime('%Y-%m-%d'),
-                'end_date': end_date.strftime('%Y-%m-%d'),
-                'team_size': random.randint(3, 15),
-                'priority': random.choice(['High', 'Medium', 'Low']),
-                'completion_date': end_date.strftime('%Y-%m-%d') if status == 'Complete' else None
-            }
-            
-            projects.append(project)
-        
-        return pd.DataFrame(projects)
-    
-    def _calculate_risk_score(self, progress, spent_ratio, start_date, end_date):
-        """Calculate risk score based on multiple factors"""
-        # Base risk
-        risk = 3.0
-        
-        # Budget overrun risk
-        if spent_ratio > 0.8:
-            risk += 2.0
-        elif spent_ratio > 0.6:
-            risk += 1.0
-        
-        # Timeline risk
-        total_days = (end_date - start_date).days
-        elapsed_days = (datetime.now() - start_date).days
-        time_progress = elapsed_days / total_days if total_days > 0 else 0
-        
-        if time_progress > progress / 100 + 0.2:
-            risk += 2.5
-        elif time_progress > progress / 100 + 0.1:
-            risk += 1.5
-        
-        # Progress risk
-        if progress < 30 and time_progress > 0.5:
-            risk += 2.0
-        elif progress < 50 and time_progress > 0.7:
-            risk += 1.0
-        
-        # Add some randomness
-        risk += random.uniform(-0.5, 0.5)
-        
-        return min(max(risk, 1.0), 10.0)
-    
-    def _determine_status(self, progress, risk_score):
-        """Determine project status based on progress and risk"""
-        if progress >= 95:
-            return 'Complete'
-        elif risk_score >= 7:
-            return 'Behind'
-        elif risk_score >= 5:
-            return 'At Risk'
-        else:
-            return 'On Track'
-    
-    def generate_kpi_data(self, projects_df):
-        """Generate KPI metrics based on project data"""
-        total_projects = len(projects_df)
-        
-        kpis = {
-            'budget_health': {
-                'value': 100 - (projects_df['spent'].sum() / projects_df['budget'].sum() * 100 - 70),
-                'target': 85,
-                'trend': random.choice(['up', 'down', 'stable'])
-            },
-            'timeline_performance': {
-                'value': len(projects_df[projects_df['status'].isin(['On Track', 'Complete'])]) / total_projects * 100,
-                'target': 80,
-                'trend': random.choice(['up', 'down', 'stable'])
-            },
-            'risk_level': {
-                'value': projects_df['risk_score'].mean(),
-                'target': 4.0,
-                'trend': random.choice(['up', 'down', 'stable'])
-            },
-            'team_velocity': {
-                'value': projects_df['progress'].mean(),
-                'target': 75,
-                'trend': random.choice(['up', 'down', 'stable'])
-            },
-            'resource_utilization': {
-                'value': random.uniform(75, 95),
-                'target': 85,
-                'trend': random.choice(['up', 'down', 'stable'])
-            },
-            'quality_score': {
-                'value': random.uniform(85, 98),
-                'target': 90,
-                'trend': random.choice(['up', 'down', 'stable'])
-            }
-        }
-        
-        return kpis
-    
-    def generate_all_data(self):
-        """Generate complete dataset for dashboard"""
-        projects_df = self.generate_projects_data()
-        kpi_data = self.generate_kpi_data(projects_df)
-        
-        return {
-            'projects': projects_df,
-            'kpis': kpi_data
-        }
+# SQLite file keeping per-day KPI totals and project deltas; empty turns history off
+HISTORY_PATH = os.environ.get('SCORECARD_HISTORY_PATH', 'scorecard_history.sqlite')
 
-# Chart Components Class
-class ChartComponents:
-    """Chart components for the Zumiez dashboard"""
-    
-    def __init__(self):
-        """Initialize chart components with Zumiez brand colors"""
-        self.colors = {
-            'primary': '#FF6B35',
-            'secondary': '#262730',
-            'success': '#4CAF50',
-            'warning': '#FF9800',
-            'danger': '#F44336',
-            'info': '#2196F3'
-        }
-    
-    def create_status_distribution_chart(self, df):
-        """Create project status distribution pie chart"""
-        status_counts = df['status'].value_counts()
-        
-        colors = {
-            'On Track': self.colors['success'],
-            'At Risk': self.colors['warning'],
-            'Behind': self.colors['danger'],
-            'Complete': self.colors['info']
-        }
-        
-        fig = px.pie(
-            values=status_counts.values,
-            names=status_counts.index,
-            title='Project Status Distribution',
-            color_discrete_map=colors
-        )
-        
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
-    
-    def create_department_progress_chart(self, df):
-        """Create department progress bar chart"""
-        dept_progress = df.groupby('department')['progress'].mean().sort_values(ascending=True)
-        
-        fig = px.bar(
-            x=dept_progress.values,
-            y=dept_progress.index,
-            orientation='h',
-            title='Average Progress by Department',
-            color_discrete_sequence=[self.colors['primary']]
-        )
-        
-        fig.update_layout(height=400, xaxis_title='Progress (%)', yaxis_title='Department')
-        st.plotly_chart(fig, use_container_width=True)
-    
-    def create_budget_variance_chart(self, df):
-        """Create budget variance chart"""
-        dept_budgets = df.groupby('department').agg({
-            'budget': 'sum',
-            'spent': 'sum'
-        }).reset_index()
-        
-        fig = px.bar(
-            dept_budgets,
-            x='department',
-            y=['budget', 'spent'],
-            title='Budget vs Actual Spending by Department',
-            barmode='group',
-            color_discrete_sequence=[self.colors['info'], self.colors['primary']]
-        )
-        
-        fig.update_layout(height=400, yaxis_title='Amount ($)')
-        st.plotly_chart(fig, use_container_width=True)
-    
-    def create_risk_gauge(self, df):
-        """Create risk level gauge chart"""
-        avg_risk = df['risk_score'].mean()
-        
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = avg_risk,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "Average Risk Level"},
-            delta = {'reference': 5.0},
-            gauge = {
-                'axis': {'range': [None, 10]},
-                'bar': {'color': self.colors['primary']},
-                'steps': [
-                    {'range': [0, 3], 'color': self.colors['success']},
-                    {'range': [3, 6], 'color': self.colors['warning']},
-                    {'range': [6, 10], 'color': self.colors['danger']}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 7
-                }
-            }
-        ))
-        
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+# KPI card titles and value formats
+KPI_DISPLAY = {
+    'budget_health': ('Budget Health', PERCENT_FORMAT),
+    'timeline_performance': ('Timeline Performance', PERCENT_FORMAT),
+    'risk_level': ('Risk Level', SCORE_FORMAT),
+    'team_velocity': ('Team Velocity', PERCENT_FORMAT),
+    'resource_utilization': ('Resource Utilization', PERCENT_FORMAT),
+    'quality_score': ('Quality Score', SCORE_FORMAT)
+}
+
+# Worker processes for the risk simulation; 0 simulates inside the app process
+SIMULATION_WORKERS = int(os.environ.get('SCORECARD_SIMULATION_WORKERS', '0'))
+
+# Projects shown with their simulated schedule and budget bands on the Risk Analysis tab
+RISK_TOP_PROJECTS = 15
+RISK_TABLE_COLUMNS = [
+    'project_name', 'late_probability', 'over_budget_probability', 'end_date', 'finish_p50', 'finish_p90',
+    'spend_p50', 'spend_p90'
+]
+
+# Projects named per alert box, and active alerts listed per page of the details table
+ALERT_NAME_LIMIT = 5
+ALERT_PAGE_SIZE = 20
+
+# Page sizes offered by the Project Details table
+TABLE_PAGE_SIZES = [25, 50, 100, 250]
+
+# Ranked search results shown under the search bar
+SEARCH_RESULT_LIMIT = 20
+SEARCH_RESULT_COLUMNS = ['project_name', 'manager', 'department', 'status', 'progress', 'risk_score']
 
 # Main Application
+@st.cache_resource
+def get_snapshot_refresher():
+    """Create the single background refresher shared by every session"""
+    return SnapshotRefresher(REFRESH_SECONDS)
+
+@st.cache_resource
+def get_data_provider():
+    """Create the configured data provider once per server process"""
+    return get_provider(os.environ.get('SCORECARD_DATA_SOURCE', 'synthetic'))
+
+@st.cache_resource
+def get_figure_cache():
+    """Create the figure cache shared by every session"""
+    return FigureCache()
+
 @st.cache_data
-def load_data():
-    """Load and cache project data"""
-    generator = DataGenerator()
-    return generator.generate_all_data()
+def load_filter_options():
+    """Load and cache sidebar filter options and the total project count"""
+    provider = get_data_provider()
+    return {
+        'departments': provider.distinct_values('department'),
+        'statuses': provider.distinct_values('status'),
+        'managers': provider.distinct_values('manager'),
+        'priorities': provider.distinct_values('priority'),
+        'total_projects': provider.count_projects()
+    }
+
+@st.cache_resource
+def get_snapshot_history():
+    """Open the data source's KPI history, or None when history is off or the source changes on every start"""
+    source = get_data_provider().history_key()
+    return SnapshotHistory(HISTORY_PATH, source) if HISTORY_PATH and source else None
+
+@st.cache_resource
+def get_alert_engine():
+    """Compile the alert rules once per server process"""
+    return AlertEngine()
+
+@st.cache_data(ttl=REFRESH_SECONDS or None)
+def load_portfolio_kpis():
+    """Whole-portfolio KPIs from aggregates computed by the source, trending against the history"""
+    accumulators = get_data_provider().kpi_accumulators(KpiEngine())
+    history = get_snapshot_history()
+    previous_totals = history.previous_totals(days=1) if history is not None else None
+    return DataGenerator().kpis_from_totals(accumulators, previous_totals)
+
+@st.cache_resource(max_entries=32)
+def get_data_store(departments=(), statuses=()):
+    """Create one shared, incrementally refreshed store per filter selection"""
+    filters = {'department': list(departments), 'status': list(statuses)}
+    # Only the whole-portfolio store records history
+    history = None if departments or statuses else get_snapshot_history()
+    data_store = ProjectDataStore(get_data_provider(), filters, history, get_alert_engine())
+    get_snapshot_refresher().register(data_store)
+    return data_store
+
+@st.fragment(run_every=REFRESH_SECONDS or None)
+def watch_snapshot(data_store, version):
+    """Rerun the page once the background refresher has published a newer snapshot"""
+    if data_store.snapshot.version != version:
+        st.rerun()
+    
+    if REFRESH_SECONDS:
+        st.caption(f"🟢 Live refresh every {REFRESH_SECONDS}s · snapshot v{version}")
+
+def show_alert_groups(alerts, prefix, alert_type=None):
+    """Render one alert box per rule naming its first projects; alert_type overrides the rule severity"""
+    for _, rule_alerts in alerts.groupby('rule_id', observed=True, sort=False):
+        names = [html.escape(str(name)) for name in rule_alerts['project_name'].head(ALERT_NAME_LIMIT)]
+        more = len(rule_alerts) - len(names)
+        listed = ', '.join(names) + (f" and {more:,} more" if more > 0 else "")
+        message = f"{prefix}<strong>{html.escape(rule_alerts['label'].iloc[0])}</strong> ({len(rule_alerts):,}): {listed}"
+        st.markdown(create_alert(message, alert_type or rule_alerts['severity'].iloc[0]), unsafe_allow_html=True)
 
 def main():
     """Main dashboard application"""
@@ -404,38 +162,107 @@ def main():
         </div>
         """.format(datetime.now().strftime("%B %d, %Y at %I:%M %p")), unsafe_allow_html=True)
     
-    # Load data
-    data = load_data()
-    projects_df = data['projects']
-    kpi_data = data['kpis']
+    # Load filter options
+    filter_options = load_filter_options()
     
     # Sidebar filters
     st.sidebar.header("🎛️ Dashboard Controls")
     
     # Department filter
-    departments = ['All'] + list(projects_df['department'].unique())
+    departments = ['All'] + filter_options['departments']
     selected_dept = st.sidebar.selectbox("Department", departments)
     
     # Status filter
+    status_options = filter_options['statuses']
     statuses = st.sidebar.multiselect(
         "Project Status",
-        options=projects_df['status'].unique(),
-        default=projects_df['status'].unique()
+        options=status_options,
+        default=status_options
     )
     
-    # Refresh button
+    # Manager and priority filters (empty means all)
+    managers = st.sidebar.multiselect("Project Manager", options=filter_options['managers'])
+    priorities = st.sidebar.multiselect("Priority", options=filter_options['priorities'])
+    
+    filters = {
+        'department': [] if selected_dept == 'All' else [selected_dept],
+        'status': statuses,
+        'manager': managers,
+        'priority': priorities
+    }
+    
+    # Shared store; sources that filter at the source only load the department/status selection,
+    # and selecting every status is the unfiltered store
+    provider = get_data_provider()
+    pushdown_statuses = () if set(statuses) == set(status_options) else tuple(statuses)
+    if provider.supports_pushdown and (filters['department'] or pushdown_statuses):
+        data_store = get_data_store(departments=tuple(filters['department']), statuses=pushdown_statuses)
+    else:
+        data_store = get_data_store()
+    
+    # Refresh button merges rows changed since the last refresh instead of reloading everything
     if st.sidebar.button("🔄 Refresh Data", type="primary"):
-        st.cache_data.clear()
+        data_store.refresh()
+        load_filter_options.clear()
+        load_portfolio_kpis.clear()
         st.rerun()
     
-    # Filter data based on selections
-    filtered_df = projects_df.copy()
+    snapshot = data_store.snapshot
+    
+    # Portfolio KPIs come from the unfiltered store, which trends them against the history; a store
+    # pushed down to a subset leaves the whole portfolio to aggregates computed by the source
+    if data_store.filters['department'] or data_store.filters['status']:
+        kpi_data = load_portfolio_kpis()
+    else:
+        kpi_data = snapshot.kpis
     
-    if selected_dept != 'All':
-        filtered_df = filtered_df[filtered_df['department'] == selected_dept]
+    # Resolve the filters against the snapshot's prebuilt bitmaps instead of scanning the frame
+    filter_index = snapshot.derive('filter_index', FilterIndex)
     
-    if statuses:
-        filtered_df = filtered_df[filtered_df['status'].isin(statuses)]
+    # Date range filter, answered by binary search over the snapshot's sorted start/end dates
+    date_bounds = filter_index.interval_index.date_bounds()
+    date_mode = st.sidebar.selectbox(
+        "Date Filter",
+        options=['any'] + list(DATE_FILTER_MODES),
+        format_func=lambda mode: DATE_FILTER_MODES.get(mode, 'Any time')
+    )
+    if date_mode != 'any' and date_bounds is not None:
+        date_range = st.sidebar.date_input("Date Range", value=date_bounds)
+        if len(date_range) == 2:
+            filters[DATE_FILTER_KEY] = (date_mode, *date_range)
+    
+    filtered_df = filter_index.filter(snapshot.projects, filters)
+    
+    # Summary metrics and charts roll up the snapshot's aggregate cube instead of rescanning rows;
+    # the cube has no date axis, so a date-filtered view is aggregated from its own rows
+    if filters.get(DATE_FILTER_KEY):
+        cube = AggregateCube(filtered_df)
+    else:
+        cube = snapshot.derive('aggregate_cube', AggregateCube)
+    totals = cube.totals(filters)
+    status_counts = cube.rollup('status', filters)['count']
+    
+    with st.sidebar:
+        watch_snapshot(data_store, snapshot.version)
+    
+    # Project search, ranked within the current filters from a trigram index extended snapshot to snapshot
+    search_index = snapshot.derive_incremental(
+        'search_index', lambda df, previous: SearchIndex(df, previous=previous)
+    )
+    search_query = st.text_input("🔍 Search Projects", placeholder="Project name, manager or department")
+    if search_query.strip():
+        result_rows, _ = search_index.search(
+            search_query, limit=SEARCH_RESULT_LIMIT, within=filter_index.positions(filters)
+        )
+        if len(result_rows):
+            st.dataframe(
+                snapshot.projects.take(result_rows)[SEARCH_RESULT_COLUMNS],
+                use_container_width=True,
+                hide_index=True,
+                column_config=column_format_config(SEARCH_RESULT_COLUMNS)
+            )
+        else:
+            st.info(f"No projects match \"{search_query}\"")
     
     # Executive Summary
     st.markdown("### 📊 Executive Summary")
@@ -443,44 +270,190 @@ def main():
     summary_col1, summary_col2, summary_col3 = st.columns(3)
     
     with summary_col1:
-        total_projects = len(filtered_df)
-        on_track = len(filtered_df[filtered_df['status'] == 'On Track'])
+        total_projects = int(totals['count'])
+        on_track = int(status_counts.get('On Track', 0))
         st.metric("Active Projects", total_projects, f"{on_track} On Track")
     
     with summary_col2:
-        total_budget = filtered_df['budget'].sum()
-        spent_budget = filtered_df['spent'].sum()
+        total_budget = totals['budget_sum']
+        spent_budget = totals['spent_sum']
         utilization = (spent_budget / total_budget * 100) if total_budget > 0 else 0
         st.metric("Budget Utilization", f"{utilization:.1f}%", f"${spent_budget:,.0f} of ${total_budget:,.0f}")
     
     with summary_col3:
-        avg_progress = filtered_df['progress'].mean()
-        risk_projects = len(filtered_df[filtered_df['risk_score'] >= 7])
-        st.metric("Avg Progress", f"{avg_progress:.1f}%", f"{risk_projects} High Risk")
+        avg_progress = totals['progress_mean']
+        risk_projects = int(totals['high_risk'])
+        st.metric(
+            "Avg Progress", f"{avg_progress:.1f}%" if total_projects else 'n/a', f"{risk_projects} High Risk"
+        )
+    
+    # KPI Overview Cards
+    st.markdown("### 🎯 Portfolio KPIs")
+    
+    kpi_columns = st.columns(3)
+    for kpi_number, (kpi_name, (title, value_format)) in enumerate(KPI_DISPLAY.items()):
+        kpi = kpi_data[kpi_name]
+        # A view without projects (or capacity) has no KPI value to show
+        has_value = not np.isnan(kpi['value'])
+        subtitle = f"Target {format_number(kpi['target'], value_format)}"
+        if has_value and kpi['previous'] is not None:
+            subtitle += f" · {kpi['value'] - kpi['previous']:+.1f} vs last recorded day"
+        if has_value and 'spread' in kpi:
+            subtitle += f" · σ {kpi['spread']:.1f}"
+        
+        value = format_number(kpi['value'], value_format) if has_value else 'n/a'
+        with kpi_columns[kpi_number % 3]:
+            st.markdown(
+                create_kpi_card(title, value, subtitle, kpi['trend']),
+                unsafe_allow_html=True
+            )
+    
+    # Alerts are evaluated once per published snapshot; only changes since the previous one are called out
+    filter_positions = filter_index.positions(filters)
+    if snapshot.alerts is not None:
+        st.markdown("### 🚨 Alerts")
+        
+        alerts = snapshot.alerts
+        raised_alerts = snapshot.raised_alerts
+        resolved_alerts = snapshot.resolved_alerts
+        if filter_positions is not None:
+            alerts = alerts[np.isin(alerts['position'].to_numpy(), filter_positions)]
+            raised_alerts = raised_alerts[np.isin(raised_alerts['position'].to_numpy(), filter_positions)]
+            resolved_alerts = resolved_alerts[resolved_alerts['project_id'].isin(filtered_df['project_id'])]
+        
+        show_alert_groups(raised_alerts, "🆕 New: ")
+        show_alert_groups(resolved_alerts, "✅ Resolved: ", 'success')
+        
+        if alerts.empty:
+            st.markdown(create_alert("No active alerts in this view", 'success'), unsafe_allow_html=True)
+        else:
+            with st.expander(f"Active alerts ({len(alerts):,})"):
+                st.dataframe(
+                    alerts['label'].value_counts().rename_axis('Alert').reset_index(name='Projects'),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                # Only one small page of the active set is sent on each rerun
+                num_pages = page_count(len(alerts), ALERT_PAGE_SIZE)
+                page_number = st.number_input(
+                    f"Alerts page (of {num_pages:,})", min_value=1, max_value=num_pages, value=1
+                )
+                start = (page_number - 1) * ALERT_PAGE_SIZE
+                st.dataframe(
+                    alerts[['label', 'project_name', 'severity']].iloc[start:start + ALERT_PAGE_SIZE],
+                    use_container_width=True,
+                    hide_index=True
+                )
+    
+    # Period-over-period history is read from per-day totals, never by replaying project rows
+    history = get_snapshot_history()
+    if history is not None:
+        with st.expander("📈 KPI History (last 90 days)"):
+            period_totals = history.period_totals(days=90)
+            if len(period_totals) > 1:
+                st.line_chart(pd.DataFrame(kpi_values(period_totals)))
+            else:
+                st.caption("History builds up as the dashboard records one KPI snapshot per day.")
     
     st.divider()
     
     # Charts Section
     st.markdown("### 📈 Project Analytics")
-    chart_components = ChartComponents()
+    chart_components = ChartComponents(get_figure_cache(), snapshot.snapshot_id)
     
     # Create tabs for different chart views
-    tab1, tab2, tab3 = st.tabs(["📊 Overview", "💰 Budget Analysis", "⚠️ Risk Analysis"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "💰 Budget Analysis", "⚠️ Risk Analysis", "🗺️ Portfolio"])
     
     with tab1:
         col1, col2 = st.columns(2)
         
         with col1:
-            chart_components.create_status_distribution_chart(filtered_df)
+            chart_components.create_status_distribution_chart(cube, filters)
         
         with col2:
-            chart_components.create_department_progress_chart(filtered_df)
+            chart_components.create_department_progress_chart(cube, filters)
     
     with tab2:
-        chart_components.create_budget_variance_chart(filtered_df)
+        chart_components.create_budget_variance_chart(cube, filters)
     
     with tab3:
-        chart_components.create_risk_gauge(filtered_df)
+        chart_components.create_risk_gauge(cube, filters)
+        
+        # Monte Carlo outcomes are simulated once per snapshot, then summarised within the filters;
+        # a new snapshot only re-simulates the projects changed since the previous simulation
+        with st.spinner("Simulating project outcomes..."):
+            risk_simulation = snapshot.derive_incremental(
+                'risk_simulation',
+                lambda df, previous: RiskSimulation(df, max_workers=SIMULATION_WORKERS, previous=previous)
+            )
+        risk_summary = risk_simulation.summary(filter_positions)
+        
+        risk_col1, risk_col2 = st.columns(2)
+        with risk_col1:
+            st.metric(
+                "Expected Late Projects",
+                f"{risk_summary['expected_late']:.1f}",
+                f"{risk_summary['likely_late']} Likely Late",
+                delta_color='inverse'
+            )
+        with risk_col2:
+            st.metric(
+                "Expected Over Budget",
+                f"{risk_summary['expected_over_budget']:.1f}",
+                f"{risk_summary['likely_over_budget']} Likely Over",
+                delta_color='inverse'
+            )
+        
+        top_risks = risk_simulation.top_risks(RISK_TOP_PROJECTS, filter_positions)
+        if len(top_risks):
+            chart_components.create_schedule_risk_chart(top_risks, filters)
+            st.dataframe(
+                top_risks[RISK_TABLE_COLUMNS],
+                use_container_width=True,
+                hide_index=True,
+                column_config=column_format_config(RISK_TABLE_COLUMNS)
+            )
+            st.caption(f"{risk_simulation.num_simulations:,} simulated outcomes per project")
+    
+    # Per-project views switch to server-side aggregates for large portfolios
+    with tab4:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            chart_components.create_risk_impact_scatter(filtered_df, filters)
+        
+        with col2:
+            allocation_group = st.radio(
+                "Allocate By", list(ALLOCATION_GROUPS), format_func=ALLOCATION_GROUPS.get, horizontal=True
+            )
+            # Date ranges are binned once per snapshot; a filtered view only re-sums its own rows
+            allocation = snapshot.derive(
+                f'resource_allocation_{allocation_group}', lambda df: ResourceAllocation(df, allocation_group)
+            )
+            chart_components.create_allocation_heatmap(
+                allocation.matrix(filter_index.positions(filters)), filters, ALLOCATION_GROUPS[allocation_group]
+            )
+        
+        # Zooming the timeline resolves the window against the snapshot's interval index
+        interval_index = filter_index.interval_index
+        date_bounds = interval_index.date_bounds()
+        if date_bounds is not None:
+            timeline_window = st.date_input(
+                "Timeline Window",
+                value=date_bounds,
+                min_value=date_bounds[0],
+                max_value=date_bounds[1]
+            )
+            if len(timeline_window) != 2:
+                timeline_window = date_bounds
+            
+            timeline_rows = interval_index.active_positions(*timeline_window, within=filter_index.positions(filters))
+            chart_components.create_timeline_chart(
+                snapshot.projects.take(timeline_rows), filters, timeline_window
+            )
+            chart_components.create_concurrency_chart(
+                interval_index.concurrency(*timeline_window, positions=timeline_rows), filters, timeline_window
+            )
     
     st.divider()
     
@@ -494,36 +467,58 @@ def main():
         default=['project_name', 'status', 'department', 'progress', 'budget', 'risk_score']
     )
     
-    # Format and display table
+    # Only the visible page is sent to the browser; sort and search run against the snapshot
     if show_columns:
-        display_df = filtered_df[show_columns].copy()
+        search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+        search = search_col.text_input("Filter Table", placeholder="Name, manager or department")
+        sort_by = sort_col.selectbox("Sort by", options=['(none)'] + show_columns)
+        descending = order_col.toggle("Descending")
+        page_size = size_col.selectbox("Rows per page", options=TABLE_PAGE_SIZES, index=1)
         
-        # Format columns for better display
-        if 'budget' in display_df.columns:
-            display_df['budget'] = display_df['budget'].apply(lambda x: f"${x:,.0f}")
-        if 'spent' in display_df.columns:
-            display_df['spent'] = display_df['spent'].apply(lambda x: f"${x:,.0f}")
-        if 'progress' in display_df.columns:
-            display_df['progress'] = display_df['progress'].apply(lambda x: f"{x:.1f}%")
-        if 'risk_score' in display_df.columns:
-            display_df['risk_score'] = display_df['risk_score'].apply(lambda x: f"{x:.1f}")
+        project_table = snapshot.derive('project_table', lambda df: ProjectTable(df, filter_index, search_index))
+        rows = project_table.rows(
+            filters,
+            search=search,
+            sort_by=None if sort_by == '(none)' else sort_by,
+            ascending=not descending
+        )
         
-        st.dataframe(display_df, use_container_width=True, height=400)
+        num_pages = page_count(len(rows), page_size)
+        page_number = st.number_input(f"Page (of {num_pages:,})", min_value=1, max_value=num_pages, value=1)
+        
+        st.dataframe(
+            project_table.page(rows, page_number, page_size, show_columns),
+            use_container_width=True,
+            height=400,
+            column_config=column_format_config(show_columns)
+        )
+        st.caption(f"Showing {min((page_number - 1) * page_size + 1, len(rows)):,}-"
+                   f"{min(page_number * page_size, len(rows)):,} of {len(rows):,} projects")
     
     # Export functionality
     st.markdown("### 📤 Export Options")
     
+    # Exports are written in chunks and kept per snapshot and filter selection, so repeat downloads are not rebuilt
+    export_cache = snapshot.derive('export_cache', lambda df: ExportCache())
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.button("📊 Download CSV", type="secondary"):
-            csv = filtered_df.to_csv(index=False)
-            st.download_button(
-                label="Download Project Data",
-                data=csv,
-                file_name=f"zumiez_projects_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
-            )
+        export_format = st.selectbox(
+            "Export Format",
+            options=available_formats(),
+            format_func=lambda file_format: EXPORT_FORMATS[file_format]['label']
+        )
+        
+        # The export is only written (or read back from the cache) when the button is clicked
+        export_info = EXPORT_FORMATS[export_format]
+        st.download_button(
+            label=f"Download Project Data ({export_info['label']})",
+            data=lambda: export_cache.get(filtered_df, filters, export_format),
+            file_name=f"zumiez_projects_{datetime.now().strftime('%Y%m%d')}.{export_info['extension']}",
+            mime=export_info['mime'],
+            on_click='ignore'
+        )
     
     # Footer
     st.markdown("---")
@@ -531,7 +526,7 @@ def main():
         f"<div style='text-align: center; color: #666; padding: 20px;'>"
         f"Last Updated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')} | "
         f"Data Source: Zumiez Project Management System | "
-        f"Showing {len(filtered_df)} of {len(projects_df)} projects"
+        f"Showing {len(filtered_df)} of {filter_options['total_projects']} projects"
         f"</div>",
         unsafe_allow_html=True
     )
@@ -0,0 +1,444 @@
+import os
+import sqlite3
+from contextlib import closing
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from data_generator import DataGenerator
+from data_schema import optimize_projects_frame
+from data_sink import ChunkedFileSink
+from kpi_engine import KPI_COLUMNS, ON_SCHEDULE_STATUSES, RunningMoments
+
+# Columns the sidebar may filter on; also the whitelist for SQL pushdown
+FILTER_COLUMNS = ['department', 'status', 'manager', 'priority']
+
+class DataProvider:
+    """Interface every project data source implements behind load_data()"""
+    
+    name = 'base'
+    
+    # Whether filters passed to load_projects are applied by the source itself
+    supports_pushdown = False
+    
+    def load_projects(self, filters=None):
+        """Return the projects frame, restricted to rows matching the column filters"""
+        raise NotImplementedError
+    
+    def load_milestones(self, filters=None, project_ids=None):
+        """Return milestones of the projects matching the column filters or the given project ids"""
+        raise NotImplementedError
+    
+    def load_changes(self, since):
+        """Return every project row updated after the since watermark"""
+        raise NotImplementedError
+    
+    def distinct_values(self, col):
+        """Return the sorted distinct values of a project column, for filter options"""
+        raise NotImplementedError
+    
+    def count_projects(self):
+        """Return the total number of projects in the source"""
+        raise NotImplementedError
+    
+    def compute_kpis(self, projects_df):
+        """Compute KPI metrics for the loaded projects"""
+        return DataGenerator().generate_kpi_data(projects_df)
+    
+    def kpi_accumulators(self, kpi_engine):
+        """Return a KpiEngine's accumulators over every project in the source"""
+        return kpi_engine.accumulate(self.load_projects())
+    
+    def refresh(self):
+        """Discard any state held by the provider so the next load sees fresh data"""
+    
+    def history_key(self):
+        """Return a key naming the same portfolio across restarts, or None when it has no stable identity"""
+        return None
+    
+    def load_data(self, filters=None):
+        """Load the complete dataset for the dashboard"""
+        projects_df = self.load_projects(filters)
+        
+        return {
+            'projects': projects_df,
+            'kpis': self.compute_kpis(projects_df),
+            'milestones': self.load_milestones(filters)
+        }
+
+class SyntheticDataProvider(DataProvider):
+    """Serve a generated demonstration portfolio held in memory"""
+    
+    name = 'synthetic'
+    
+    def __init__(self, num_projects=25, seed=None, as_of=None, chunk_size=None):
+        """Initialize provider with the portfolio size and generator seed"""
+        self.num_projects = num_projects
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.as_of = as_of
+        self._data = None
+    
+    def _ensure_data(self):
+        """Generate the portfolio on first use"""
+        if self._data is None:
+            generator = DataGenerator(seed=self.seed, as_of=self.as_of)
+            data = generator.generate_all_data(self.num_projects, chunk_size=self.chunk_size)
+            data['projects'] = optimize_projects_frame(data['projects'])
+            self.generator = generator
+            self._data = data
+        return self._data
+    
+    def load_projects(self, filters=None):
+        """Return generated projects matching the column filters"""
+        return filter_projects(self._ensure_data()['projects'], filters)
+    
+    def load_milestones(self, filters=None, project_ids=None):
+        """Return generated milestones of the projects matching the column filters or ids"""
+        milestones_df = self._ensure_data()['milestones']
+        if project_ids is None and filters:
+            project_ids = self.load_projects(filters)['project_id']
+        if project_ids is None:
+            return milestones_df
+        
+        return milestones_df[milestones_df['project_id'].isin(project_ids)]
+    
+    def load_changes(self, since):
+        """Return projects updated after since; each poll first simulates activity on a few projects"""
+        self._simulate_activity()
+        projects_df = self._ensure_data()['projects']
+        return projects_df[projects_df['updated_at'] > since]
+    
+    def _simulate_activity(self, fraction=0.02):
+        """Advance progress and spend on a random subset of projects, as a live system would"""
+        data = self._ensure_data()
+        projects_df = data['projects'].copy()
+        if projects_df.empty:
+            return
+        
+        rng = self.generator.rng
+        num_changed = max(1, int(len(projects_df) * fraction))
+        rows = rng.choice(len(projects_df), size=num_changed, replace=False)
+        changed = projects_df.iloc[rows]
+        
+        progress = np.minimum(changed['progress'].to_numpy(np.float64) + rng.uniform(0, 5, num_changed), 100.0)
+        spent_ratio = np.minimum(progress / 100 + rng.uniform(-0.1, 0.2, num_changed), 1.0)
+        risk_scores, statuses = self.generator.score_projects({
+            'progress': progress,
+            'spent_ratio': spent_ratio,
+            'start_date': changed['start_date'],
+            'end_date': changed['end_date']
+        }, jitter=True)
+        
+        updates = {
+            'progress': progress,
+            'spent': changed['budget'].to_numpy(np.float64) * spent_ratio,
+            'risk_score': risk_scores,
+            'status': statuses,
+            'completion_date': changed['end_date'].where(statuses == 'Complete'),
+            'updated_at': pd.Timestamp.now()
+        }
+        for col, values in updates.items():
+            values = pd.Series(values, index=changed.index).astype(projects_df[col].dtype)
+            projects_df.iloc[rows, projects_df.columns.get_loc(col)] = values.to_numpy()
+        
+        # Replace rather than mutate, so frames already handed out stay unchanged
+        data['projects'] = projects_df
+    
+    def distinct_values(self, col):
+        """Return the sorted distinct values of a generated project column"""
+        return sorted(self._ensure_data()['projects'][col].dropna().unique().tolist())
+    
+    def count_projects(self):
+        """Return the number of generated projects"""
+        return len(self._ensure_data()['projects'])
+    
+    def compute_kpis(self, projects_df):
+        """Compute KPI metrics with the provider's own generator"""
+        self._ensure_data()
+        return self.generator.generate_kpi_data(projects_df)
+    
+    def refresh(self):
+        """Drop the generated portfolio so a new one is generated on next load"""
+        self._data = None
+    
+    def history_key(self):
+        """Key seeded portfolios by size and seed; unseeded ones differ on every start"""
+        if self.seed is None:
+            return None
+        return f"synthetic:{self.num_projects}:{self.seed}"
+
+class SQLiteDataProvider(DataProvider):
+    """Read projects and milestones from a local SQLite database, pushing filters into SQL"""
+    
+    name = 'sqlite'
+    supports_pushdown = True
+    
+    def __init__(self, path):
+        """Initialize provider with the database path"""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"SQLite database not found: {path}")
+        self.path = path
+    
+    def history_key(self):
+        """Key the history on the absolute database path"""
+        return f"sqlite:{os.path.abspath(self.path)}"
+    
+    def _query(self, query, params=()):
+        """Run a query on a short-lived connection (Streamlit reruns on many threads)"""
+        with closing(sqlite3.connect(self.path)) as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    
+    def load_projects(self, filters=None):
+        """Return only the projects matching the filters, selected by a WHERE clause"""
+        where, params = _sql_where(filters)
+        return optimize_projects_frame(self._query(f"SELECT * FROM projects{where}", params))
+    
+    def load_milestones(self, filters=None, project_ids=None):
+        """Return milestones of the matching projects via a project_id subquery"""
+        where, params = _sql_where(filters)
+        query = "SELECT * FROM milestones"
+        if project_ids is not None:
+            params = [int(project_id) for project_id in project_ids]
+            query += f" WHERE project_id IN ({', '.join('?' * len(params))})"
+        elif where:
+            query += f" WHERE project_id IN (SELECT project_id FROM projects{where})"
+        
+        milestones_df = self._query(query, params)
+        milestones_df['due_date'] = pd.to_datetime(milestones_df['due_date'], format='ISO8601')
+        return milestones_df
+    
+    def load_changes(self, since):
+        """Return projects whose updated_at is after the since watermark"""
+        # julianday() reads any ISO layout ('T' or space, with or without fractions) and can use the
+        # expression index, but only to the millisecond; rows in the watermark's millisecond are dropped here
+        since = pd.Timestamp(since)
+        query = "SELECT * FROM projects WHERE julianday(updated_at) >= julianday(?)"
+        changes_df = optimize_projects_frame(self._query(query, [since.strftime('%Y-%m-%d %H:%M:%S.%f')]))
+        return changes_df[changes_df['updated_at'] > since].reset_index(drop=True)
+    
+    def kpi_accumulators(self, kpi_engine):
+        """Return a KpiEngine's accumulators from one aggregate query, without loading any rows"""
+        window_start = str(kpi_engine.window_start)
+        window_end = str(kpi_engine.window_end)
+        query = (
+            "SELECT COUNT(*) AS projects, TOTAL(spent) AS spent, TOTAL(budget) AS budget, "
+            f"TOTAL(status IN ({', '.join('?' * len(ON_SCHEDULE_STATUSES))})) AS on_schedule, "
+            "TOTAL(risk_score) AS risk_score, TOTAL(risk_score * risk_score) AS risk_score_sq, "
+            "TOTAL(progress) AS progress, TOTAL(progress * progress) AS progress_sq, "
+            "TOTAL(CASE WHEN overlap > 0 THEN team_size * overlap END) AS staffed_days, "
+            "TOTAL(CASE WHEN overlap > 0 THEN team_size END) AS active_team_size "
+            # Days of each project's date range falling inside the utilization window
+            "FROM (SELECT *, julianday(MIN(date(end_date), ?)) - julianday(MAX(date(start_date), ?)) + 1 AS overlap "
+            "FROM projects)"
+        )
+        sums = self._query(query, ON_SCHEDULE_STATUSES + [window_end, window_start]).iloc[0]
+        
+        projects = int(sums['projects'])
+        return {
+            'budget_health': {'spent': sums['spent'], 'budget': sums['budget']},
+            'timeline_performance': {'projects': projects, 'on_schedule': int(sums['on_schedule'])},
+            'risk_level': {'risk_score': RunningMoments.from_sums(projects, sums['risk_score'], sums['risk_score_sq'])},
+            'team_velocity': {'progress': RunningMoments.from_sums(projects, sums['progress'], sums['progress_sq'])},
+            'resource_utilization': {
+                'staffed_days': sums['staffed_days'],
+                'capacity_days': sums['active_team_size'] * kpi_engine.window_days
+            }
+        }
+    
+    def distinct_values(self, col):
+        """Return the sorted distinct values of a project column"""
+        _check_filter_column(col)
+        return self._query(f"SELECT DISTINCT {col} FROM projects WHERE {col} IS NOT NULL ORDER BY {col}")[col].tolist()
+    
+    def count_projects(self):
+        """Return the number of projects in the database"""
+        return int(self._query("SELECT COUNT(*) AS n FROM projects")['n'].iloc[0])
+
+class ParquetDataProvider(DataProvider):
+    """Read projects and milestones from a Parquet dataset, pushing filters into the scan"""
+    
+    name = 'parquet'
+    supports_pushdown = True
+    
+    def __init__(self, directory):
+        """Initialize provider with a directory holding projects/ and milestones/ datasets"""
+        self.projects_path = os.path.join(directory, 'projects')
+        self.milestones_path = os.path.join(directory, 'milestones')
+        if not os.path.isdir(self.projects_path):
+            raise FileNotFoundError(f"Parquet projects dataset not found: {self.projects_path}")
+        # Latest updated_at of each part file, from its footer, keyed by path, mtime and size so
+        # rewritten files are inspected again
+        self._file_watermarks = {}
+    
+    def history_key(self):
+        """Key the history on the absolute dataset directory"""
+        return f"parquet:{os.path.abspath(os.path.dirname(self.projects_path))}"
+    
+    def load_projects(self, filters=None, columns=None):
+        """Return only the projects matching the filters, pruned by partition and row-group statistics"""
+        projects_df = pd.read_parquet(self.projects_path, columns=columns, filters=_parquet_filters(filters))
+        return optimize_projects_frame(projects_df)
+    
+    def load_milestones(self, filters=None, project_ids=None):
+        """Return milestones of the matching projects"""
+        if project_ids is None and _parquet_filters(filters):
+            project_ids = self.load_projects(filters, columns=['project_id'])['project_id']
+        
+        milestone_filters = None
+        if project_ids is not None:
+            milestone_filters = [('project_id', 'in', [int(project_id) for project_id in project_ids])]
+        
+        return pd.read_parquet(self.milestones_path, filters=milestone_filters)
+    
+    def kpi_accumulators(self, kpi_engine):
+        """Return a KpiEngine's accumulators, reading only the columns the KPIs use"""
+        return kpi_engine.accumulate(self.load_projects(columns=KPI_COLUMNS))
+    
+    def load_changes(self, since):
+        """Return projects whose updated_at is after the since watermark, reading only files that can hold them"""
+        since = pd.Timestamp(since)
+        paths = self._changed_files(since)
+        if not paths:
+            dataset = ds.dataset(self.projects_path, format='parquet', partitioning='hive')
+            return optimize_projects_frame(dataset.schema.empty_table().to_pandas())
+        
+        dataset = ds.dataset(paths, format='parquet', partitioning='hive', partition_base_dir=self.projects_path)
+        changes = dataset.to_table(filter=ds.field('updated_at') > since.to_pydatetime())
+        return optimize_projects_frame(changes.to_pandas())
+    
+    def _changed_files(self, since):
+        """Part files whose footer statistics allow rows updated after since"""
+        watermarks = {}
+        paths = []
+        for root, _, names in os.walk(self.projects_path):
+            for name in sorted(names):
+                if not name.endswith('.parquet'):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                key = (path, stat.st_mtime_ns, stat.st_size)
+                watermark = self._file_watermarks[key] if key in self._file_watermarks else _max_updated_at(path)
+                watermarks[key] = watermark
+                if watermark is None or watermark > since:
+                    paths.append(path)
+        
+        # Replaced wholesale, so removed and rewritten files drop out
+        self._file_watermarks = watermarks
+        return paths
+    
+    def distinct_values(self, col):
+        """Return the sorted distinct values of a project column, reading only that column"""
+        _check_filter_column(col)
+        values = pd.read_parquet(self.projects_path, columns=[col])[col]
+        return sorted(values.dropna().unique().tolist())
+    
+    def count_projects(self):
+        """Return the number of projects in the dataset"""
+        return len(pd.read_parquet(self.projects_path, columns=['project_id']))
+
+def filter_projects(projects_df, filters=None):
+    """Apply {column: allowed values} filters; empty or missing values mean no restriction"""
+    if not filters:
+        return projects_df
+    
+    mask = None
+    for col, values in filters.items():
+        if not values:
+            continue
+        col_mask = projects_df[col].isin(list(values))
+        mask = col_mask if mask is None else mask & col_mask
+    
+    return projects_df if mask is None else projects_df[mask]
+
+def _check_filter_column(col):
+    """Reject column names that are not filterable before they reach a query"""
+    if col not in FILTER_COLUMNS:
+        raise ValueError(f"Column cannot be filtered: {col}")
+
+def _active_filters(filters):
+    """Yield (column, values) pairs for filters that actually restrict rows"""
+    for col, values in (filters or {}).items():
+        if values:
+            _check_filter_column(col)
+            yield col, list(values)
+
+def _sql_where(filters):
+    """Build a parameterised WHERE clause from column filters"""
+    clauses = []
+    params = []
+    for col, values in _active_filters(filters):
+        clauses.append(f"{col} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+def _parquet_filters(filters):
+    """Build pyarrow predicates from column filters"""
+    predicates = [(col, 'in', values) for col, values in _active_filters(filters)]
+    return predicates or None
+
+def _max_updated_at(path):
+    """Largest updated_at in a Parquet file from its row-group statistics, or None when they are missing"""
+    metadata = pq.read_metadata(path)
+    if 'updated_at' not in metadata.schema.names:
+        return None
+    col = metadata.schema.names.index('updated_at')
+    
+    maxima = []
+    for row_group in range(metadata.num_row_groups):
+        statistics = metadata.row_group(row_group).column(col).statistics
+        if statistics is None or not statistics.has_min_max:
+            return None
+        maxima.append(pd.Timestamp(statistics.max))
+    return max(maxima, default=pd.Timestamp.min)
+
+def write_sqlite(data, path):
+    """Persist projects and milestones to SQLite with indexes on the filter and change-tracking columns"""
+    with closing(sqlite3.connect(path)) as conn:
+        data['projects'].to_sql('projects', conn, if_exists='replace', index=False)
+        data['milestones'].to_sql('milestones', conn, if_exists='replace', index=False)
+        
+        for col in FILTER_COLUMNS:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_projects_{col} ON projects ({col})")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_id ON projects (project_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_updated_at ON projects (julianday(updated_at))")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_milestones_project ON milestones (project_id)")
+        conn.commit()
+
+def write_parquet(data, directory, partition_cols=('department',), row_group_size=50000):
+    """Persist projects and milestones as Parquet datasets under directory"""
+    # Sorting by the filter columns keeps row-group min/max statistics selective
+    sort_cols = [col for col in FILTER_COLUMNS if col in data['projects'].columns]
+    projects_df = data['projects'].sort_values(sort_cols, kind='stable')
+    
+    ChunkedFileSink(
+        os.path.join(directory, 'projects'), partition_cols=partition_cols, row_group_size=row_group_size
+    ).write(projects_df)
+    ChunkedFileSink(
+        os.path.join(directory, 'milestones'), row_group_size=row_group_size
+    ).write(data['milestones'].sort_values('project_id', kind='stable'))
+
+def _synthetic_provider(target):
+    """Build a synthetic provider from "[<count>[:<seed>]]"; large portfolios are generated in columnar chunks"""
+    count, _, seed = target.partition(':')
+    num_projects = int(count) if count else 25
+    chunk_size = 100000 if num_projects > 1000 else None
+    return SyntheticDataProvider(num_projects, seed=int(seed) if seed else None, chunk_size=chunk_size)
+
+# Provider factories keyed by the scheme of a data source spec such as "synthetic", "synthetic:500"
+# or the seeded "synthetic:500:7"
+PROVIDERS = {
+    'synthetic': _synthetic_provider,
+    'sqlite': SQLiteDataProvider,
+    'parquet': ParquetDataProvider
+}
+
+def get_provider(source='synthetic'):
+    """Create a data provider from a "<scheme>[:<target>]" source spec"""
+    scheme, _, target = source.partition(':')
+    
+    if scheme not in PROVIDERS:
+        raise ValueError(f"Unknown data source: {source}")
+    
+    return PROVIDERS[scheme](target)
@@ -0,0 +1,116 @@
+import importlib.util
+import tempfile
+import threading
+from collections import OrderedDict
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from filter_index import filters_key
+
+EXPORT_FORMATS = {
+    'csv': {'label': 'CSV', 'extension': 'csv', 'mime': 'text/csv'},
+    'parquet': {'label': 'Parquet', 'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'xlsx': {
+        'label': 'Excel',
+        'extension': 'xlsx',
+        'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    }
+}
+
+# Excel exports need openpyxl, which is an optional dependency
+XLSX_ENGINE = 'openpyxl' if importlib.util.find_spec('openpyxl') else None
+
+# Worksheet row limit, including the header row
+EXCEL_MAX_ROWS = 1048576
+
+# Exports larger than this spill from memory to a temporary file
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+
+def available_formats():
+    """Export formats usable with the installed packages"""
+    return [file_format for file_format in EXPORT_FORMATS if file_format != 'xlsx' or XLSX_ENGINE]
+
+def write_export(df, file_format, chunk_size=100000):
+    """Write a frame chunk by chunk into a spooled temporary file, rewound for reading"""
+    writers = {'csv': _write_csv, 'parquet': _write_parquet, 'xlsx': _write_xlsx}
+    if file_format not in writers:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    if file_format == 'xlsx' and XLSX_ENGINE is None:
+        raise ValueError("Excel export requires openpyxl")
+    
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    writers[file_format](df, spool, chunk_size)
+    spool.seek(0)
+    return spool
+
+def _iter_chunks(df, chunk_size):
+    """Yield consecutive row chunks; an empty frame still yields one (header-only) chunk"""
+    for start in range(0, max(len(df), 1), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+def _write_csv(df, spool, chunk_size):
+    """Encode one chunk at a time so only a chunk's text is ever in memory"""
+    for chunk_number, chunk in enumerate(_iter_chunks(df, chunk_size)):
+        spool.write(chunk.to_csv(index=False, header=chunk_number == 0).encode('utf-8'))
+
+def _write_parquet(df, spool, chunk_size):
+    """Write each chunk as a zstd-compressed row group"""
+    writer = None
+    try:
+        for chunk in _iter_chunks(df, chunk_size):
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(spool, table.schema, compression='zstd')
+            else:
+                table = pa.Table.from_pandas(chunk, preserve_index=False, schema=writer.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _write_xlsx(df, spool, chunk_size):
+    """Append chunks to a worksheet, starting a new sheet whenever one fills up"""
+    rows_per_sheet = EXCEL_MAX_ROWS - 1
+    with pd.ExcelWriter(spool, engine=XLSX_ENGINE) as writer:
+        for sheet_start in range(0, max(len(df), 1), rows_per_sheet):
+            sheet_df = df.iloc[sheet_start:sheet_start + rows_per_sheet]
+            sheet_name = f"Projects {sheet_start // rows_per_sheet + 1}"
+            start_row = 0
+            for chunk in _iter_chunks(sheet_df, chunk_size):
+                chunk.to_excel(writer, sheet_name=sheet_name, startrow=start_row, header=start_row == 0, index=False)
+                start_row += len(chunk) + (start_row == 0)
+
+class ExportCache:
+    """Built exports of one snapshot, keyed by (filters, format) with least-recently-used eviction"""
+    
+    def __init__(self, max_entries=4):
+        """Initialize cache with the number of exports kept at once"""
+        self.max_entries = max_entries
+        self._exports = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, df, filters, file_format):
+        """Return the export's bytes, writing it only if this view and format have not been built yet"""
+        key = (filters_key(filters), file_format)
+        with self._lock:
+            if key in self._exports:
+                return self._read(key)
+        
+        # Written outside the lock so other views' downloads are not held up; of two concurrent
+        # builds of the same export, the first one cached wins
+        spool = write_export(df, file_format)
+        with self._lock:
+            if key in self._exports:
+                spool.close()
+            else:
+                self._exports[key] = spool
+                if len(self._exports) > self.max_entries:
+                    self._exports.popitem(last=False)[1].close()
+            return self._read(key)
+    
+    def _read(self, key):
+        """Read a cached export from the start and mark it most recently used; the caller holds the lock"""
+        self._exports.move_to_end(key)
+        spool = self._exports[key]
+        spool.seek(0)
+        return spool.read()
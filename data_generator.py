@@ -2,11 +2,14 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
+from concurrent.futures import ProcessPoolExecutor
+from data_schema import to_day_array
+from kpi_engine import KpiEngine, build_kpis
 
 class DataGenerator:
     """Generate realistic demonstration data for Zumiez project dashboard"""
     
-    def __init__(self):
+    def __init__(self, seed=None, as_of=None):
         """Initialize data generator with realistic Zumiez project scenarios"""
         self.project_categories = {
             'Retail Technology': [
@@ -59,35 +62,50 @@ class DataGenerator:
         
         self.statuses = ['On Track', 'At Risk', 'Behind', 'Complete']
         self.risk_factors = ['Low', 'Medium', 'High', 'Critical']
+        self.priorities = ['High', 'Medium', 'Low']
         
-    def generate_projects_data(self, num_projects=25):
+        # Budget based on project category
+        self.budget_ranges = {
+            'Retail Technology': (50000, 2000000),
+            'Store Operations': (25000, 800000),
+            'Brand & Marketing': (15000, 500000),
+            'Supply Chain': (100000, 1500000)
+        }
+        
+        # Seed and fixed "as-of" timestamp make every generated dataset reproducible
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self.random = random.Random(int(self.seed_sequence.generate_state(1)[0]))
+        self.as_of = as_of or datetime.now()
+    
+    def generate_projects_data(self, num_projects=25, columnar=False, first_project_id=1):
         """Generate realistic project data for demonstration purposes"""
+        # Columnar mode draws whole NumPy columns; use it for large load-testing portfolios
+        if columnar:
+            return self._generate_projects_columnar(num_projects, first_project_id)
+        
         projects = []
         
-        for _ in range(num_projects):
+        for i in range(num_projects):
             # Select random category and project
-            category = random.choice(list(self.project_categories.keys()))
-            project_name = random.choice(self.project_categories[category])
+            category = self.random.choice(list(self.project_categories.keys()))
+            project_name = self.random.choice(self.project_categories[category])
             
             # Generate project details
-            start_date = datetime.now() - timedelta(days=random.randint(30, 180))
-            duration_days = random.randint(60, 365)
+            start_date = self.as_of - timedelta(days=self.random.randint(30, 180))
+            duration_days = self.random.randint(60, 365)
             end_date = start_date + timedelta(days=duration_days)
             
             # Budget based on project category
-            budget_ranges = {
-                'Retail Technology': (50000, 2000000),
-                'Store Operations': (25000, 800000),
-                'Brand & Marketing': (15000, 500000),
-                'Supply Chain': (100000, 1500000)
-            }
-            
-            min_budget, max_budget = budget_ranges[category]
-            budget = random.randint(min_budget, max_budget)
+            min_budget, max_budget = self.budget_ranges[category]
+            budget = self.random.randint(min_budget, max_budget)
             
             # Progress and spending
-            progress = random.uniform(15, 95)
-            spent_ratio = min(progress / 100 + random.uniform(-0.1, 0.2), 1.0)
+            progress = self.random.uniform(15, 95)
+            spent_ratio = min(progress / 100 + self.random.uniform(-0.1, 0.2), 1.0)
             spent = budget * spent_ratio
             
             # Risk score based on various factors
@@ -97,9 +115,10 @@ class DataGenerator:
             status = self._determine_status(progress, risk_score)
             
             project = {
+                'project_id': first_project_id + i,
                 'project_name': project_name,
                 'department': category,
-                'manager': random.choice(self.project_managers),
+                'manager': self.random.choice(self.project_managers),
                 'status': status,
                 'budget': budget,
                 'spent': spent,
@@ -107,15 +126,188 @@ class DataGenerator:
                 'risk_score': risk_score,
                 'start_date': start_date.strftime('%Y-%m-%d'),
                 'end_date': end_date.strftime('%Y-%m-%d'),
-                'team_size': random.randint(3, 15),
-                'priority': random.choice(['High', 'Medium', 'Low']),
-                'completion_date': end_date.strftime('%Y-%m-%d') if status == 'Complete' else None
+                'team_size': self.random.randint(3, 15),
+                'priority': self.random.choice(self.priorities),
+                'completion_date': end_date.strftime('%Y-%m-%d') if status == 'Complete' else None,
+                'updated_at': self.as_of
             }
             
             projects.append(project)
         
         return pd.DataFrame(projects)
     
+    def iter_projects_data(self, num_projects, chunk_size=100000):
+        """Yield a columnar portfolio as DataFrame chunks of at most chunk_size projects"""
+        for start in range(0, num_projects, chunk_size):
+            chunk = self.generate_projects_data(
+                min(chunk_size, num_projects - start), columnar=True, first_project_id=start + 1
+            )
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            yield chunk
+    
+    def generate_projects_sharded(self, num_projects, shard_size=250000, max_workers=None):
+        """Generate a columnar portfolio across a process pool, one fixed SeedSequence child per shard"""
+        # Shard layout depends only on num_projects and shard_size, never on the worker count
+        shard_starts = list(range(0, num_projects, shard_size))
+        shard_sizes = [min(shard_size, num_projects - start) for start in shard_starts]
+        # Shard i always gets the same child of the generator's seed: spawn() would move on every call
+        shard_seeds = [
+            np.random.SeedSequence(self.seed_sequence.entropy, spawn_key=self.seed_sequence.spawn_key + (shard,))
+            for shard in range(len(shard_sizes))
+        ]
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            shards = list(executor.map(
+                _generate_projects_shard, shard_seeds, [self.as_of] * len(shard_sizes), shard_sizes,
+                [start + 1 for start in shard_starts]
+            ))
+        
+        if not shards:
+            return self.generate_projects_data(0, columnar=True)
+        return pd.concat(shards, ignore_index=True)
+    
+    def _generate_projects_columnar(self, num_projects, first_project_id=1):
+        """Draw every project column as a NumPy array and build the DataFrame once"""
+        rng = self.rng
+        categories = list(self.project_categories.keys())
+        
+        # Select random category and project from a flattened name table
+        name_counts = np.array([len(self.project_categories[c]) for c in categories])
+        name_offsets = np.concatenate(([0], np.cumsum(name_counts)[:-1]))
+        project_names = np.array(
+            [name for c in categories for name in self.project_categories[c]], dtype=object
+        )
+        
+        category_idx = rng.integers(0, len(categories), size=num_projects)
+        name_idx = name_offsets[category_idx] + (
+            rng.random(num_projects) * name_counts[category_idx]
+        ).astype(np.int64)
+        
+        # Generate project timelines at day resolution
+        today = np.datetime64(self.as_of.date(), 'D')
+        elapsed_days = rng.integers(30, 180, size=num_projects, endpoint=True)
+        duration_days = rng.integers(60, 365, size=num_projects, endpoint=True)
+        start_dates = today - elapsed_days
+        end_dates = start_dates + duration_days
+        
+        # Budget based on project category
+        min_budget = np.array([self.budget_ranges[c][0] for c in categories])
+        max_budget = np.array([self.budget_ranges[c][1] for c in categories])
+        budget = rng.integers(min_budget[category_idx], max_budget[category_idx], endpoint=True)
+        
+        # Progress and spending
+        progress = rng.uniform(15, 95, size=num_projects)
+        spent_ratio = np.minimum(progress / 100 + rng.uniform(-0.1, 0.2, size=num_projects), 1.0)
+        spent = budget * spent_ratio
+        
+        # Risk score and status for every project at once
+        risk_score = self._calculate_risk_scores(progress, spent_ratio, elapsed_days, duration_days, jitter=True)
+        status = self._determine_statuses(progress, risk_score)
+        
+        end_strings = self._format_dates(end_dates)
+        
+        return pd.DataFrame({
+            'project_id': np.arange(first_project_id, first_project_id + num_projects),
+            'project_name': project_names[name_idx],
+            'department': np.array(categories, dtype=object)[category_idx],
+            'manager': np.array(self.project_managers, dtype=object)[
+                rng.integers(0, len(self.project_managers), size=num_projects)
+            ],
+            'status': status,
+            'budget': budget,
+            'spent': spent,
+            'progress': progress,
+            'risk_score': risk_score,
+            'start_date': self._format_dates(start_dates),
+            'end_date': end_strings,
+            'team_size': rng.integers(3, 15, size=num_projects, endpoint=True),
+            'priority': np.array(self.priorities, dtype=object)[
+                rng.integers(0, len(self.priorities), size=num_projects)
+            ],
+            'completion_date': np.where(status == 'Complete', end_strings, None),
+            'updated_at': np.full(num_projects, np.datetime64(self.as_of, 'us'))
+        })
+    
+    def _format_dates(self, dates):
+        """Format a datetime64[D] array as '%Y-%m-%d' strings via a lookup table of the days spanned"""
+        if len(dates) == 0:
+            return np.array([], dtype=object)
+        first_day = dates.min()
+        offsets = (dates - first_day).astype(np.int64)
+        day_table = np.datetime_as_string(first_day + np.arange(offsets.max() + 1), unit='D')
+        return day_table.astype(object)[offsets]
+    
+    def score_projects(self, projects, as_of=None, jitter=False):
+        """Re-score a DataFrame (or mapping of arrays) of projects, returning (risk_scores, statuses)"""
+        if 'spent_ratio' in projects:
+            spent_ratio = projects['spent_ratio']
+        else:
+            spent_ratio = np.asarray(projects['spent'], dtype=np.float64) / np.asarray(projects['budget'], dtype=np.float64)
+        
+        risk_scores = self.calculate_risk_scores(
+            projects['progress'], spent_ratio, projects['start_date'], projects['end_date'],
+            as_of=as_of, jitter=jitter
+        )
+        return risk_scores, self.determine_statuses(projects['progress'], risk_scores)
+    
+    def calculate_risk_scores(self, progress, spent_ratio, start_date, end_date, as_of=None, jitter=False):
+        """Calculate risk scores for whole columns of projects using the _calculate_risk_score thresholds"""
+        start_days = to_day_array(start_date)
+        end_days = to_day_array(end_date)
+        today = np.datetime64((as_of or self.as_of).date(), 'D')
+        
+        elapsed_days = (today - start_days).astype(np.int64)
+        total_days = (end_days - start_days).astype(np.int64)
+        
+        return self._calculate_risk_scores(progress, spent_ratio, elapsed_days, total_days, jitter=jitter)
+    
+    def determine_statuses(self, progress, risk_scores):
+        """Determine statuses for whole columns of projects using the _determine_status thresholds"""
+        return self._determine_statuses(
+            np.asarray(progress, dtype=np.float64), np.asarray(risk_scores, dtype=np.float64)
+        )
+    
+    def _calculate_risk_scores(self, progress, spent_ratio, elapsed_days, total_days, jitter=False):
+        """Vectorized counterpart of _calculate_risk_score over NumPy arrays"""
+        progress = np.asarray(progress, dtype=np.float64)
+        spent_ratio = np.asarray(spent_ratio, dtype=np.float64)
+        elapsed_days = np.asarray(elapsed_days, dtype=np.float64)
+        total_days = np.asarray(total_days, dtype=np.float64)
+        
+        # Base risk
+        risk = np.full(progress.shape, 3.0)
+        
+        # Budget overrun risk
+        risk += np.select([spent_ratio > 0.8, spent_ratio > 0.6], [2.0, 1.0], 0.0)
+        
+        # Timeline risk
+        time_progress = np.divide(
+            elapsed_days, total_days, out=np.zeros(progress.shape), where=total_days > 0
+        )
+        planned = progress / 100
+        risk += np.select([time_progress > planned + 0.2, time_progress > planned + 0.1], [2.5, 1.5], 0.0)
+        
+        # Progress risk
+        risk += np.select(
+            [(progress < 30) & (time_progress > 0.5), (progress < 50) & (time_progress > 0.7)],
+            [2.0, 1.0],
+            0.0
+        )
+        
+        # Add some randomness
+        if jitter:
+            risk += self.rng.uniform(-0.5, 0.5, size=progress.shape)
+        
+        return np.clip(risk, 1.0, 10.0)
+    
+    def _determine_statuses(self, progress, risk_score):
+        """Vectorized counterpart of _determine_status over NumPy arrays"""
+        return np.select(
+            [progress >= 95, risk_score >= 7, risk_score >= 5],
+            ['Complete', 'Behind', 'At Risk'],
+            'On Track'
+        )
+    
     def _calculate_risk_score(self, progress, spent_ratio, start_date, end_date):
         """Calculate risk score based on multiple factors"""
         # Base risk
@@ -129,7 +321,7 @@ class DataGenerator:
         
         # Timeline risk
         total_days = (end_date - start_date).days
-        elapsed_days = (datetime.now() - start_date).days
+        elapsed_days = (self.as_of - start_date).days
         time_progress = elapsed_days / total_days if total_days > 0 else 0
         
         if time_progress > progress / 100 + 0.2:
@@ -144,7 +336,7 @@ class DataGenerator:
             risk += 1.0
         
         # Add some randomness
-        risk += random.uniform(-0.5, 0.5)
+        risk += self.random.uniform(-0.5, 0.5)
         
         return min(max(risk, 1.0), 10.0)
     
@@ -161,67 +353,59 @@ class DataGenerator:
     
     def generate_kpi_data(self, projects_df):
         """Generate KPI metrics based on project data"""
-        total_projects = len(projects_df)
-        
-        kpis = {
-            'budget_health': {
-                'value': 100 - (projects_df['spent'].sum() / projects_df['budget'].sum() * 100 - 70),
-                'target': 85,
-                'trend': random.choice(['up', 'down', 'stable'])
-            },
-            'timeline_performance': {
-                'value': len(projects_df[projects_df['status'].isin(['On Track', 'Complete'])]) / total_projects * 100,
-                'target': 80,
-                'trend': random.choice(['up', 'down', 'stable'])
-            },
-            'risk_level': {
-                'value': projects_df['risk_score'].mean(),
-                'target': 4.0,
-                'trend': random.choice(['up', 'down', 'stable'])
-            },
-            'team_velocity': {
-                'value': projects_df['progress'].mean(),
-                'target': 75,
-                'trend': random.choice(['up', 'down', 'stable'])
-            },
-            'resource_utilization': {
-                'value': random.uniform(75, 95),
-                'target': 85,
-                'trend': random.choice(['up', 'down', 'stable'])
-            },
-            'quality_score': {
-                'value': random.uniform(85, 98),
-                'target': 90,
-                'trend': random.choice(['up', 'down', 'stable'])
-            }
+        return self.kpis_from_totals(KpiEngine(self.as_of).accumulate(projects_df))
+    
+    def kpis_from_totals(self, accumulators, previous_totals=None):
+        """Build KPI metrics from (possibly chunk-accumulated) KPI engine accumulators"""
+        kpis = build_kpis(accumulators, previous_totals)
+        
+        # No project column carries quality yet, so it remains a demonstration value
+        kpis['quality_score'] = {
+            'value': self.random.uniform(85, 98),
+            'target': 90,
+            'previous': None,
+            'trend': 'stable'
         }
         
         return kpis
     
-    def generate_milestone_data(self, projects_df):
+    def generate_milestone_data(self, projects_df, max_milestones=8):
         """Generate milestone data for projects"""
-        milestones = []
+        rng = self.rng
         
-        for _, project in projects_df.iterrows():
-            num_milestones = random.randint(3, 8)
-            project_milestones = []
-            
-            for i in range(num_milestones):
-                milestone = {
-                    'project_name': project['project_name'],
-                    'milestone': f"Milestone {i+1}",
-                    'completion': random.uniform(0, 100),
-                    'due_date': datetime.now() + timedelta(days=random.randint(-30, 90))
-                }
-                project_milestones.append(milestone)
-            
-            milestones.extend(project_milestones)
+        # 3-8 milestones per project, with project keys repeated by count
+        milestone_counts = rng.integers(3, max_milestones, size=len(projects_df), endpoint=True)
+        total_milestones = int(milestone_counts.sum())
+        project_keys = pd.Categorical(projects_df['project_name'])
+        project_names = pd.Categorical.from_codes(
+            np.repeat(project_keys.codes, milestone_counts), categories=project_keys.categories
+        )
+        
+        # Milestone number within its project: row position minus the project's first row
+        milestone_idx = np.arange(total_milestones)
+        milestone_idx -= np.repeat(np.cumsum(milestone_counts) - milestone_counts, milestone_counts)
+        milestone_labels = pd.Categorical.from_codes(
+            milestone_idx.astype(np.int8),
+            categories=[f"Milestone {i+1}" for i in range(max_milestones)]
+        )
+        del milestone_idx
         
-        return pd.DataFrame(milestones)
+        due_offsets = rng.integers(-30, 90, size=total_milestones, endpoint=True).astype('timedelta64[D]')
+        
+        return pd.DataFrame({
+            'project_id': np.repeat(projects_df['project_id'].to_numpy(), milestone_counts),
+            'project_name': project_names,
+            'milestone': milestone_labels,
+            'completion': rng.uniform(0, 100, size=total_milestones),
+            'due_date': np.datetime64(self.as_of, 'us') + due_offsets
+        })
     
-    def generate_all_data(self):
+    def generate_all_data(self, num_projects=25, chunk_size=None, projects_sink=None, milestones_sink=None):
         """Generate complete dataset for dashboard"""
-        projects_df = self.generate_projects_data()
+        if chunk_size is not None:
+            return self._generate_all_data_chunked(num_projects, chunk_size, projects_sink, milestones_sink)
+        
+        projects_df = self.generate_projects_data(num_projects)
         kpi_data = self.generate_kpi_data(projects_df)
         milestone_data = self.generate_milestone_data(projects_df)
         
@@ -230,3 +414,48 @@ class DataGenerator:
             'kpis': kpi_data,
             'milestones': milestone_data
         }
+    
+    def _generate_all_data_chunked(self, num_projects, chunk_size, projects_sink, milestones_sink):
+        """Generate projects, milestones and KPIs chunk by chunk with bounded memory"""
+        kpi_engine = KpiEngine(self.as_of)
+        accumulators = None
+        project_chunks = []
+        milestone_chunks = []
+        
+        # No projects still runs one empty chunk, so the result keeps the columnar schema and empty-portfolio KPIs
+        if num_projects > 0:
+            chunks = self.iter_projects_data(num_projects, chunk_size)
+        else:
+            chunks = [self.generate_projects_data(0, columnar=True)]
+        
+        for projects_chunk in chunks:
+            milestones_chunk = self.generate_milestone_data(projects_chunk)
+            
+            # KPIs only need running accumulators, not the rows themselves
+            if accumulators is None:
+                accumulators = kpi_engine.accumulate(projects_chunk)
+            else:
+                accumulators = kpi_engine.update(accumulators, added_df=projects_chunk)
+            
+            # Chunks go straight to the sinks when given, otherwise they are kept in memory
+            if projects_sink is not None:
+                projects_sink.write(projects_chunk)
+            else:
+                project_chunks.append(projects_chunk)
+            
+            if milestones_sink is not None:
+                milestones_sink.write(milestones_chunk)
+            else:
+                milestone_chunks.append(milestones_chunk)
+        
+        return {
+            'projects': projects_sink if projects_sink is not None else pd.concat(project_chunks),
+            'kpis': self.kpis_from_totals(accumulators),
+            'milestones': milestones_sink if milestones_sink is not None else pd.concat(milestone_chunks, ignore_index=True)
+        }
+
+def _generate_projects_shard(seed_sequence, as_of, num_projects, first_project_id):
+    """Process pool entry point that generates one independent portfolio shard"""
+    return DataGenerator(seed=seed_sequence, as_of=as_of).generate_projects_data(
+        num_projects, columnar=True, first_project_id=first_project_id
+    )
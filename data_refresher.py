@@ -0,0 +1,64 @@
+import logging
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
+
+class SnapshotRefresher:
+    """Poll registered data stores on one background thread per server process"""
+    
+    def __init__(self, interval_seconds=30):
+        """Initialize refresher with its polling interval; 0 disables polling"""
+        self.interval_seconds = interval_seconds
+        self._stores = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    @property
+    def enabled(self):
+        """Whether the refresher polls at all"""
+        return self.interval_seconds > 0
+    
+    def register(self, store):
+        """Add a store to the polling set and make sure the worker is running"""
+        with self._lock:
+            self._stores.add(store)
+        self.start()
+    
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='snapshot-refresher', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout=None):
+        """Stop the worker thread after its current poll"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def poll(self):
+        """Refresh every registered store once; returns the number of changed rows"""
+        with self._lock:
+            stores = list(self._stores)
+        
+        changed_rows = 0
+        for store in stores:
+            try:
+                changed_rows += store.refresh()
+            except Exception:
+                logger.exception("Background refresh failed for %r", store)
+        
+        return changed_rows
+    
+    def _run(self):
+        """Worker loop: wait one interval, then poll, until stopped"""
+        while not self._stop.wait(self.interval_seconds):
+            self.poll()
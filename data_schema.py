@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+# Known category orderings; values outside these lists are appended as extra categories
+PROJECT_CATEGORY_ORDER = {
+    'department': ['Retail Technology', 'Store Operations', 'Brand & Marketing', 'Supply Chain'],
+    'status': ['On Track', 'At Risk', 'Behind', 'Complete'],
+    'priority': ['High', 'Medium', 'Low']
+}
+
+PROJECT_CATEGORY_COLUMNS = ['project_name', 'department', 'manager', 'status', 'priority']
+
+# pandas cannot hold datetime64[D]; seconds is the coarsest unit it supports
+PROJECT_DATE_COLUMNS = ['start_date', 'end_date', 'completion_date']
+DATE_DTYPE = 'datetime64[s]'
+
+# Change-tracking timestamps keep their full resolution
+PROJECT_TIMESTAMP_COLUMNS = ['updated_at']
+
+# Integer columns get fixed widths from their domain, never from the range of one load, so later
+# loads and merged changes always fit; ids and money stay 64-bit
+PROJECT_INTEGER_DTYPES = {
+    'project_id': 'int64',
+    'budget': 'int64',
+    'team_size': 'int16'
+}
+
+# Float columns with the largest rounding error float32 may introduce and still be "safe"
+PROJECT_FLOAT_TOLERANCES = {
+    'spent': 0.5,
+    'progress': 0.01,
+    'risk_score': 0.01
+}
+
+def optimize_projects_frame(projects_df):
+    """Convert a projects frame to compact columnar dtypes"""
+    compact = {}
+    
+    for col in projects_df.columns:
+        values = projects_df[col]
+        
+        if col in PROJECT_CATEGORY_COLUMNS:
+            compact[col] = to_category(values, PROJECT_CATEGORY_ORDER.get(col))
+        elif col in PROJECT_DATE_COLUMNS:
+            compact[col] = to_dates(values)
+        elif col in PROJECT_TIMESTAMP_COLUMNS:
+            compact[col] = pd.to_datetime(values, format='ISO8601')
+        elif col in PROJECT_INTEGER_DTYPES:
+            compact[col] = pd.to_numeric(values).astype(PROJECT_INTEGER_DTYPES[col])
+        elif col in PROJECT_FLOAT_TOLERANCES:
+            compact[col] = downcast_float(values, PROJECT_FLOAT_TOLERANCES[col])
+        else:
+            compact[col] = values
+    
+    return pd.DataFrame(compact, index=projects_df.index)
+
+def to_category(values, known_categories=None):
+    """Convert values to a categorical, keeping known categories first in their given order"""
+    if isinstance(values.dtype, pd.CategoricalDtype) and known_categories is None:
+        return values
+    
+    categories = list(known_categories or [])
+    known = set(categories)
+    categories += sorted(value for value in pd.unique(values.dropna()) if value not in known)
+    
+    return pd.Series(pd.Categorical(values, categories=categories), index=values.index, name=values.name)
+
+def align_categories(base_df, other_df):
+    """Cast both frames to shared dtypes: categoricals get the union of categories, numbers the wider type"""
+    base_df = base_df.copy()
+    other_df = other_df.copy()
+    
+    # Numeric columns widen to hold both sides, so incoming values never wrap or lose precision
+    for col in base_df.select_dtypes('number').columns:
+        if col in other_df.columns and pd.api.types.is_numeric_dtype(other_df[col].dtype):
+            base_df[col] = base_df[col].astype(np.result_type(base_df[col].dtype, other_df[col].dtype))
+    
+    for col in base_df.select_dtypes('category').columns:
+        categories = list(base_df[col].cat.categories)
+        known = set(categories)
+        categories += [value for value in pd.unique(other_df[col].dropna()) if value not in known]
+        
+        base_df[col] = base_df[col].cat.set_categories(categories)
+        # A categorical may declare categories it does not use, which pd.Categorical would reject
+        if isinstance(other_df[col].dtype, pd.CategoricalDtype):
+            other_df[col] = other_df[col].cat.set_categories(categories)
+        else:
+            other_df[col] = pd.Categorical(other_df[col], categories=categories)
+    
+    return base_df, other_df[base_df.columns].astype(base_df.dtypes.to_dict())
+
+def to_dates(values):
+    """Convert date strings or timestamps to day-resolution datetimes"""
+    return pd.to_datetime(values, format='ISO8601').dt.floor('D').astype(DATE_DTYPE)
+
+def to_day_array(values):
+    """Convert date strings or timestamps to a datetime64[D] NumPy array"""
+    return np.asarray(pd.to_datetime(values, format='ISO8601'), dtype='datetime64[D]')
+
+def downcast_float(values, tolerance):
+    """Downcast to float32 when the round-trip error stays within tolerance"""
+    values = pd.to_numeric(values)
+    narrow = values.astype(np.float32)
+    
+    max_error = np.nanmax(np.abs(narrow.to_numpy(np.float64) - values.to_numpy(np.float64)), initial=0.0)
+    return narrow if max_error <= tolerance else values
+
+def memory_report(df, baseline_df=None):
+    """Report dtype and memory per column, optionally against a baseline frame"""
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'bytes': df.memory_usage(deep=True, index=False)
+    })
+    
+    if baseline_df is not None:
+        report['baseline_dtype'] = baseline_df.dtypes.astype(str).reindex(report.index)
+        report['baseline_bytes'] = baseline_df.memory_usage(deep=True, index=False).reindex(report.index)
+        report['reduction'] = report['baseline_bytes'] / report['bytes']
+    
+    totals = report.sum(numeric_only=True)
+    if baseline_df is not None:
+        totals['reduction'] = totals['baseline_bytes'] / totals['bytes']
+    report.loc['total'] = totals
+    return report
@@ -0,0 +1,76 @@
+import os
+import pandas as pd
+
+class ChunkedFileSink:
+    """Write DataFrame chunks straight to partitioned Parquet or CSV part files"""
+    
+    def __init__(self, directory, file_format='parquet', partition_cols=None, **write_options):
+        """Initialize sink output directory, file format and optional hive-style partition columns"""
+        if file_format not in ('parquet', 'csv'):
+            raise ValueError(f"Unsupported file format: {file_format}")
+        
+        self.directory = directory
+        self.file_format = file_format
+        self.partition_cols = list(partition_cols or [])
+        self.write_options = write_options
+        self.paths = []
+        self.chunks_written = 0
+        self.rows_written = 0
+        
+        os.makedirs(directory, exist_ok=True)
+    
+    def write(self, chunk):
+        """Write one chunk as the next numbered part file (one per partition)"""
+        if self.partition_cols:
+            for key, part in chunk.groupby(self.partition_cols, observed=True, sort=False):
+                key = key if isinstance(key, tuple) else (key,)
+                partition_dir = os.path.join(
+                    self.directory, *[f"{col}={value}" for col, value in zip(self.partition_cols, key)]
+                )
+                self._write_part(part.drop(columns=self.partition_cols), partition_dir)
+        else:
+            self._write_part(chunk, self.directory)
+        
+        self.chunks_written += 1
+        self.rows_written += len(chunk)
+    
+    def write_all(self, chunks):
+        """Drain an iterable of chunks into the sink"""
+        for chunk in chunks:
+            self.write(chunk)
+        return self
+    
+    def _write_part(self, part, directory):
+        """Write a single part file without the index"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{self.chunks_written:05d}.{self.file_format}")
+        
+        # Categoricals are written as plain values so parts with different categories stay compatible
+        part = part.astype({col: part[col].cat.categories.dtype for col in part.select_dtypes('category')})
+        
+        if self.file_format == 'parquet':
+            part.to_parquet(path, index=False, **self.write_options)
+        else:
+            part.to_csv(path, index=False, **self.write_options)
+        
+        self.paths.append(path)
+    
+    def read(self, columns=None):
+        """Read every written part back as a single DataFrame"""
+        if self.file_format == 'parquet':
+            return pd.read_parquet(self.directory, columns=columns)
+        
+        frames = []
+        for path in self.paths:
+            frame = pd.read_csv(path, usecols=columns)
+            
+            # Restore hive-style partition values from the directory names
+            relative_dir = os.path.relpath(os.path.dirname(path), self.directory)
+            if relative_dir != os.curdir:
+                for segment in relative_dir.split(os.sep):
+                    col, value = segment.split('=', 1)
+                    frame[col] = value
+            
+            frames.append(frame)
+        
+        return pd.concat(frames, ignore_index=True)
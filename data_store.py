@@ -0,0 +1,204 @@
+import itertools
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data_access import filter_projects
+from data_generator import DataGenerator
+from data_schema import align_categories
+from kpi_engine import KpiEngine, totals_from_accumulators
+
+# Process-wide snapshot ids; versions only count within one store
+_snapshot_ids = itertools.count(1)
+
+class DataSnapshot:
+    """Immutable view of the dashboard data at one version"""
+    
+    def __init__(self, version, projects, milestones, kpis, kpi_accumulators, watermark,
+                 alerts=None, raised_alerts=None, resolved_alerts=None, carried=None):
+        """Initialize snapshot; frames must not be mutated once published, carried holds earlier incremental structures"""
+        self.snapshot_id = next(_snapshot_ids)
+        self.version = version
+        self.projects = projects
+        self.milestones = milestones
+        self.kpis = kpis
+        self.kpi_accumulators = kpi_accumulators
+        self.watermark = watermark
+        self.alerts = alerts
+        self.raised_alerts = raised_alerts
+        self.resolved_alerts = resolved_alerts
+        self.created_at = datetime.now()
+        # Futures of derived structures by key; the lock only guards the dicts, builds run outside it
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+        # Incrementally derived structures: the latest from an earlier snapshot, and this snapshot's own
+        self._carried = dict(carried or {})
+        self._incremental = {}
+    
+    def derive(self, key, builder):
+        """Build a structure from this snapshot once (builder receives the projects frame) and reuse it"""
+        return self._build_once(self._derived, key, lambda: builder(self.projects))
+    
+    def derive_incremental(self, key, builder):
+        """Like derive, but builder also receives the latest earlier snapshot's structure (or None) to update"""
+        structure = self._build_once(self._incremental, key, lambda: builder(self.projects, self._carried.get(key)))
+        with self._derived_lock:
+            self._carried.pop(key, None)
+        return structure
+    
+    def carry_over(self):
+        """Latest incrementally derived structures, handed on to the next snapshot; never waits for a build"""
+        with self._derived_lock:
+            built = {
+                key: future.result() for key, future in self._incremental.items()
+                if future.done() and future.exception() is None
+            }
+            return {**self._carried, **built}
+    
+    def _build_once(self, futures, key, build):
+        """Run build for the first caller of a key outside the lock; later callers wait on its future"""
+        with self._derived_lock:
+            future = futures.get(key)
+            building = future is None
+            if building:
+                future = futures[key] = Future()
+        
+        if building:
+            try:
+                future.set_result(build())
+            except BaseException as exc:
+                # A failed build is not cached, so the next caller tries again
+                with self._derived_lock:
+                    del futures[key]
+                future.set_exception(exc)
+        return future.result()
+
+class ProjectDataStore:
+    """Hold the current snapshot of one filtered view and refresh it incrementally"""
+    
+    def __init__(self, provider, filters=None, history=None, alert_engine=None):
+        """Initialize store with a data provider, the view's column filters, and optional SnapshotHistory and AlertEngine"""
+        self.provider = provider
+        self.filters = filters or {}
+        self.history = history
+        self.alert_engine = alert_engine
+        self.kpi_calculator = DataGenerator()
+        self._lock = threading.Lock()
+        self.snapshot = self._full_load(version=1)
+    
+    def _full_load(self, version, previous_alerts=None, carried=None):
+        """Load the whole view from the provider"""
+        projects_df = self.provider.load_projects(self.filters)
+        self.kpi_engine = KpiEngine()
+        accumulators = self.kpi_engine.accumulate(projects_df)
+        
+        return DataSnapshot(
+            version,
+            projects_df,
+            self.provider.load_milestones(self.filters),
+            self._kpis(projects_df, accumulators),
+            accumulators,
+            _watermark(projects_df['updated_at']),
+            *self._alerts(projects_df, previous_alerts),
+            carried
+        )
+    
+    def refresh(self, full=False):
+        """Publish a new snapshot with rows changed since the watermark; returns the number of changed rows"""
+        with self._lock:
+            current = self.snapshot
+            
+            if full:
+                self.snapshot = self._full_load(current.version + 1, current.alerts, current.carry_over())
+                return len(self.snapshot.projects)
+            
+            changes_df = self.provider.load_changes(current.watermark)
+            if changes_df.empty:
+                return 0
+            
+            self.snapshot = self._merge(current, changes_df)
+            return len(changes_df)
+    
+    def _merge(self, current, changes_df):
+        """Merge changed rows into a copy of the current snapshot"""
+        projects_df = current.projects
+        incoming_df = filter_projects(changes_df, self.filters)
+        
+        # Changed rows already in view are replaced, rows no longer matching leave, new matches enter
+        stale = projects_df['project_id'].isin(changes_df['project_id']).to_numpy()
+        positions = pd.Index(projects_df['project_id']).get_indexer(incoming_df['project_id'])
+        updated = positions >= 0
+        leaving = stale.copy()
+        leaving[positions[updated]] = False
+        
+        # Rows updated in place only touch the KPIs reading a column that actually changed
+        if leaving.any() or not updated.all():
+            changed_columns = None
+        else:
+            changed_columns = _changed_columns(projects_df.iloc[positions], incoming_df)
+        
+        merged_df, incoming_df = align_categories(projects_df, incoming_df)
+        for col_idx, col in enumerate(merged_df.columns):
+            merged_df.iloc[positions[updated], col_idx] = incoming_df[col].to_numpy()[updated]
+        
+        entering_df = incoming_df[~updated]
+        merged_df = pd.concat([merged_df[~leaving], entering_df], ignore_index=True)
+        
+        # KPI accumulators only move by the rows that changed, except once a day when the utilization window moves
+        if self.kpi_engine.is_current():
+            accumulators = self.kpi_engine.update(
+                current.kpi_accumulators, projects_df[stale], incoming_df, changed_columns
+            )
+        else:
+            self.kpi_engine = KpiEngine()
+            accumulators = self.kpi_engine.accumulate(merged_df)
+        
+        # Milestones follow projects in and out of the view
+        milestones_df = current.milestones
+        left_ids = projects_df['project_id'].to_numpy()[leaving]
+        if len(left_ids):
+            milestones_df = milestones_df[~milestones_df['project_id'].isin(left_ids)]
+        if not entering_df.empty:
+            entering_milestones = self.provider.load_milestones(project_ids=entering_df['project_id'].tolist())
+            milestones_df = pd.concat([milestones_df, entering_milestones], ignore_index=True)
+        
+        return DataSnapshot(
+            current.version + 1,
+            merged_df,
+            milestones_df,
+            self._kpis(merged_df, accumulators),
+            accumulators,
+            max(current.watermark, _watermark(changes_df['updated_at'])),
+            *self._alerts(merged_df, current.alerts),
+            current.carry_over()
+        )
+    
+    def _kpis(self, projects_df, accumulators):
+        """Record the new state in the history, if any, and build KPIs trending against the previous day"""
+        if self.history is None:
+            return self.kpi_calculator.kpis_from_totals(accumulators)
+        
+        self.history.record(projects_df, totals_from_accumulators(accumulators))
+        return self.kpi_calculator.kpis_from_totals(accumulators, self.history.previous_totals(days=1))
+    
+    def _alerts(self, projects_df, previous_alerts):
+        """Evaluate the alert rules, if any, with the alerts raised and resolved since the previous snapshot"""
+        if self.alert_engine is None:
+            return None, None, None
+        
+        alerts = self.alert_engine.evaluate(projects_df)
+        return (alerts, *self.alert_engine.diff(previous_alerts, alerts))
+
+def _changed_columns(old_df, new_df):
+    """Columns whose values differ anywhere between two row-aligned frames"""
+    return [
+        col for col in new_df.columns
+        if col not in old_df.columns or not np.array_equal(old_df[col].to_numpy(), new_df[col].to_numpy())
+    ]
+
+def _watermark(updated_at):
+    """Latest change timestamp in a column, or the epoch when there are no rows"""
+    if updated_at.empty:
+        return pd.Timestamp(0)
+    return pd.Timestamp(np.max(updated_at.to_numpy()))
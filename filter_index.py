@@ -0,0 +1,130 @@
+import threading
+import numpy as np
+from data_access import FILTER_COLUMNS
+from data_schema import to_category
+from interval_index import IntervalIndex
+
+# Filters entry holding a (mode, start, end) date range, resolved against the interval index
+DATE_FILTER_KEY = 'dates'
+
+# Columns with more distinct values than this are grouped by sorted row positions instead of bitmaps;
+# at 64 values the packed bitmaps take as much memory as the int64 positions
+BITMAP_MAX_VALUES = 64
+
+class FilterIndex:
+    """Packed per-value row bitmaps, or sorted row groups for high-cardinality columns, over the filter columns"""
+    
+    def __init__(self, projects_df, columns=FILTER_COLUMNS):
+        """Build one bitmap per distinct value of each low-cardinality filter column and row groups for the rest"""
+        self.projects_df = projects_df
+        self.num_rows = len(projects_df)
+        self.bitmaps = {}
+        self.groups = {}
+        self._interval_index = None
+        self._interval_lock = threading.Lock()
+        
+        for col in columns:
+            if col not in projects_df.columns:
+                continue
+            
+            values = to_category(projects_df[col])
+            categories = values.cat.categories
+            codes = values.cat.codes.to_numpy()
+            
+            if len(categories) <= BITMAP_MAX_VALUES:
+                self.bitmaps[col] = {value: np.packbits(codes == code) for code, value in enumerate(categories)}
+            else:
+                # Rows ordered by value, so a value's rows are one slice between its offsets
+                order = np.argsort(codes, kind='stable')
+                offsets = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+                self.groups[col] = (categories, order, offsets)
+    
+    @property
+    def interval_index(self):
+        """Start/end interval index over the same rows, built on first use"""
+        with self._interval_lock:
+            if self._interval_index is None:
+                self._interval_index = IntervalIndex(self.projects_df)
+            return self._interval_index
+    
+    def _empty_bits(self):
+        """Bitmap with no rows set"""
+        return np.zeros((self.num_rows + 7) // 8, dtype=np.uint8)
+    
+    def match_bits(self, filters):
+        """OR the bitmaps of each column's selected values, AND across columns; None means no restriction"""
+        result = None
+        
+        for col, values in (filters or {}).items():
+            if not values:
+                continue
+            if col in self.bitmaps:
+                col_bits = self._empty_bits()
+                for value in values:
+                    bits = self.bitmaps[col].get(value)
+                    if bits is not None:
+                        np.bitwise_or(col_bits, bits, out=col_bits)
+            elif col in self.groups:
+                col_bits = self._group_bits(col, values)
+            else:
+                continue
+            
+            if result is None:
+                result = col_bits
+            else:
+                np.bitwise_and(result, col_bits, out=result)
+        
+        return result
+    
+    def _group_bits(self, col, values):
+        """Bitmap of the rows holding any of the values of a grouped column"""
+        categories, order, offsets = self.groups[col]
+        codes = categories.get_indexer(list(values))
+        codes = codes[codes >= 0]
+        mask = np.zeros(self.num_rows, dtype=bool)
+        for code in codes:
+            mask[order[offsets[code]:offsets[code + 1]]] = True
+        return np.packbits(mask)
+    
+    def date_positions(self, filters):
+        """Row positions matching the filters' date range, or None when there is none"""
+        date_range = (filters or {}).get(DATE_FILTER_KEY)
+        if not date_range:
+            return None
+        return self.interval_index.match_positions(*date_range)
+    
+    def positions(self, filters):
+        """Row positions matching the filters, or None when nothing is filtered"""
+        bits = self.match_bits(filters)
+        date_positions = self.date_positions(filters)
+        if date_positions is None:
+            return None if bits is None else np.flatnonzero(np.unpackbits(bits, count=self.num_rows))
+        if bits is None:
+            return date_positions
+        
+        # Date matches come back sorted, so masking them keeps row order
+        return date_positions[np.unpackbits(bits, count=self.num_rows).view(bool)[date_positions]]
+    
+    def count(self, filters):
+        """Number of rows matching the filters without materialising positions where possible"""
+        if (filters or {}).get(DATE_FILTER_KEY):
+            return len(self.positions(filters))
+        
+        bits = self.match_bits(filters)
+        if bits is None:
+            return self.num_rows
+        return int(np.bitwise_count(bits).sum())
+    
+    def filter(self, projects_df, filters):
+        """Return the matching rows; the snapshot frame itself is returned when nothing is filtered"""
+        positions = self.positions(filters)
+        if positions is None:
+            return projects_df
+        return projects_df.take(positions)
+
+def filters_key(filters):
+    """Hashable, order-independent form of a filters dict, for cache keys"""
+    return tuple(sorted(
+        (col, tuple(sorted(map(str, values))))
+        for col, values in (filters or {}).items() if values
+    ))
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from data_schema import to_day_array
+
+# Date filter modes and their sidebar labels
+DATE_FILTER_MODES = {'active': 'Active during', 'started': 'Started in', 'due': 'Due in'}
+
+class IntervalIndex:
+    """Project [start, end] day intervals sorted by start, with a running max of ends"""
+    
+    def __init__(self, projects_df, start_col='start_date', end_col='end_date'):
+        """Build the index from date strings or datetimes; rows missing either date are left out"""
+        self.row_starts = to_day_array(projects_df[start_col])
+        self.row_ends = to_day_array(projects_df[end_col])
+        
+        valid = np.flatnonzero(~np.isnat(self.row_starts) & ~np.isnat(self.row_ends))
+        order = valid[np.argsort(self.row_starts[valid], kind='stable')]
+        
+        self.positions = order
+        self.starts = self.row_starts[order]
+        self.ends = self.row_ends[order]
+        # Non-decreasing, so everything left of the first max end >= t0 has already finished
+        self.max_ends = np.maximum.accumulate(self.ends) if len(order) else self.ends
+        end_order = np.argsort(self.ends, kind='stable')
+        self.sorted_ends = self.ends[end_order]
+        self.end_positions = order[end_order]
+    
+    def __len__(self):
+        """Number of indexed projects"""
+        return len(self.positions)
+    
+    def date_bounds(self):
+        """First start and last end as dates, or None when the index is empty"""
+        if not len(self):
+            return None
+        return self.starts[0].astype(object), self.max_ends[-1].astype(object)
+    
+    def active_positions(self, t0, t1, within=None):
+        """Row positions of projects overlapping [t0, t1], optionally restricted to other positions"""
+        t0, t1 = np.datetime64(t0, 'D'), np.datetime64(t1, 'D')
+        
+        # Binary search the candidate run, then check ends only inside it
+        lo = np.searchsorted(self.max_ends, t0, side='left')
+        hi = np.searchsorted(self.starts, t1, side='right')
+        if hi <= lo:
+            return np.array([], dtype=np.intp)
+        
+        positions = self.positions[lo:hi][self.ends[lo:hi] >= t0]
+        if within is not None:
+            positions = positions[np.isin(positions, within, assume_unique=True)]
+        return np.sort(positions)
+    
+    def started_positions(self, t0, t1):
+        """Row positions of projects starting within [t0, t1]"""
+        lo, hi = _day_bounds(self.starts, t0, t1)
+        return np.sort(self.positions[lo:hi])
+    
+    def due_positions(self, t0, t1):
+        """Row positions of projects due within [t0, t1]"""
+        lo, hi = _day_bounds(self.sorted_ends, t0, t1)
+        return np.sort(self.end_positions[lo:hi])
+    
+    def match_positions(self, mode, t0, t1):
+        """Row positions matching a date filter mode ('active', 'started' or 'due') over [t0, t1]"""
+        queries = {'active': self.active_positions, 'started': self.started_positions, 'due': self.due_positions}
+        if mode not in queries:
+            raise ValueError(f"Unknown date filter mode: {mode}")
+        return queries[mode](t0, t1)
+    
+    def count_active(self, t0, t1):
+        """Number of projects overlapping [t0, t1] in two binary searches"""
+        t0, t1 = np.datetime64(t0, 'D'), np.datetime64(t1, 'D')
+        started = np.searchsorted(self.starts, t1, side='right')
+        finished = np.searchsorted(self.sorted_ends, t0, side='left')
+        return int(max(started - finished, 0))
+    
+    def concurrency(self, t0, t1, positions=None):
+        """Concurrent projects on each day of [t0, t1], for all rows or only the given positions"""
+        days = np.arange(np.datetime64(t0, 'D'), np.datetime64(t1, 'D') + 1)
+        
+        if not len(days):
+            counts = np.array([], dtype=np.int64)
+        elif positions is None:
+            # Started on or before each day minus finished before it
+            counts = (
+                np.searchsorted(self.starts, days, side='right')
+                - np.searchsorted(self.sorted_ends, days, side='left')
+            )
+        else:
+            # Sweep +1/-1 difference arrays over the subset, clipped to the window
+            starts = self.row_starts[positions]
+            ends = self.row_ends[positions]
+            keep = ~np.isnat(starts) & ~np.isnat(ends) & (starts <= days[-1]) & (ends >= days[0])
+            start_offsets = (np.maximum(starts[keep], days[0]) - days[0]).astype(np.int64)
+            end_offsets = (np.minimum(ends[keep], days[-1]) - days[0]).astype(np.int64)
+            counts = sweep_counts(0, start_offsets, end_offsets, 1, len(days))[0]
+        
+        return pd.Series(counts, index=pd.DatetimeIndex(days, name='date'), name='active_projects')
+
+def sweep_counts(lanes, start_bins, end_bins, num_lanes, num_bins, weights=None):
+    """Ranges (or their weights) active per lane and bin, swept from +1/-1 difference arrays of inclusive bin ranges"""
+    lane_width = num_bins + 1
+    size = num_lanes * lane_width
+    deltas = (
+        np.bincount(lanes * lane_width + start_bins, weights=weights, minlength=size)
+        - np.bincount(lanes * lane_width + end_bins + 1, weights=weights, minlength=size)
+    )
+    return np.cumsum(deltas.reshape(num_lanes, lane_width), axis=1)[:, :num_bins]
+
+def _day_bounds(sorted_days, t0, t1):
+    """Slice bounds of the days falling within [t0, t1] in a sorted array"""
+    lo = np.searchsorted(sorted_days, np.datetime64(t0, 'D'), side='left')
+    hi = np.searchsorted(sorted_days, np.datetime64(t1, 'D'), side='right')
+    return lo, max(lo, hi)
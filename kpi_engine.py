@@ -0,0 +1,224 @@
+from datetime import datetime
+import numpy as np
+from data_schema import to_day_array
+
+# Each KPI's target and the project columns its accumulators read
+KPI_DEFINITIONS = {
+    'budget_health': {'columns': ('spent', 'budget'), 'target': 85},
+    'timeline_performance': {'columns': ('status',), 'target': 80},
+    'risk_level': {'columns': ('risk_score',), 'target': 4.0},
+    'team_velocity': {'columns': ('progress',), 'target': 75},
+    'resource_utilization': {'columns': ('team_size', 'start_date', 'end_date'), 'target': 85}
+}
+
+# Every project column some KPI reads
+KPI_COLUMNS = sorted({col for kpi in KPI_DEFINITIONS.values() for col in kpi['columns']})
+
+# Statuses counted as on schedule by timeline performance
+ON_SCHEDULE_STATUSES = ['On Track', 'Complete']
+
+# Trailing days over which team_size is booked against project date ranges
+UTILIZATION_WINDOW_DAYS = 90
+
+class RunningMoments:
+    """Count, mean and sum of squared deviations (Welford), combined and removed a batch at a time"""
+    
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        """Initialize moments, empty by default"""
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+    
+    @classmethod
+    def of(cls, values):
+        """Moments of a batch of values, taken in float64"""
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return cls()
+        mean = values.mean()
+        return cls(len(values), float(mean), float(((values - mean) ** 2).sum()))
+    
+    @classmethod
+    def from_sums(cls, count, total, total_sq):
+        """Moments from a count, sum and sum of squares, as aggregated by a database"""
+        if not count:
+            return cls()
+        mean = total / count
+        return cls(count, mean, max(total_sq - total * mean, 0.0))
+    
+    def __add__(self, other):
+        """Moments of both batches together (Chan's parallel update)"""
+        count = self.count + other.count
+        if not count:
+            return RunningMoments()
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / count
+        return RunningMoments(count, mean, m2)
+    
+    def __sub__(self, other):
+        """Moments with a previously added batch taken back out"""
+        count = self.count - other.count
+        if count <= 0:
+            return RunningMoments()
+        mean = (self.mean * self.count - other.mean * other.count) / count
+        delta = other.mean - mean
+        m2 = self.m2 - other.m2 - delta * delta * count * other.count / self.count
+        return RunningMoments(count, mean, max(m2, 0.0))
+    
+    @property
+    def total(self):
+        """Sum of the values"""
+        return self.mean * self.count
+    
+    @property
+    def std(self):
+        """Population standard deviation"""
+        return (self.m2 / self.count) ** 0.5 if self.count else 0.0
+
+class KpiEngine:
+    """Running KPI accumulators that move by changed rows, only for KPIs reading a changed column"""
+    
+    def __init__(self, as_of=None, window_days=UTILIZATION_WINDOW_DAYS):
+        """Initialize engine; the utilization window ends on the as_of day"""
+        self.window_days = window_days
+        self.window_end = np.datetime64(as_of or datetime.now(), 'D')
+        self.window_start = self.window_end - (window_days - 1)
+        self._accumulators = {
+            'budget_health': self._budget_health,
+            'timeline_performance': self._timeline_performance,
+            'risk_level': self._risk_level,
+            'team_velocity': self._team_velocity,
+            'resource_utilization': self._resource_utilization
+        }
+    
+    def is_current(self, as_of=None):
+        """Whether the utilization window still ends on the as_of day (today by default)"""
+        return self.window_end == np.datetime64(as_of or datetime.now(), 'D')
+    
+    def affected(self, changed_columns=None):
+        """Names of the KPIs reading any of the changed columns; every KPI when unknown"""
+        if changed_columns is None:
+            return list(KPI_DEFINITIONS)
+        changed_columns = set(changed_columns)
+        return [name for name, kpi in KPI_DEFINITIONS.items() if changed_columns.intersection(kpi['columns'])]
+    
+    def accumulate(self, projects_df, names=None):
+        """Accumulators of each named KPI (all by default) over a batch of project rows"""
+        return {name: self._accumulators[name](projects_df) for name in (names or KPI_DEFINITIONS)}
+    
+    def update(self, accumulators, removed_df=None, added_df=None, changed_columns=None):
+        """New accumulators with removed rows taken out and added rows folded in, in O(changed rows)"""
+        names = self.affected(changed_columns)
+        removed = self.accumulate(removed_df, names) if removed_df is not None and len(removed_df) else {}
+        added = self.accumulate(added_df, names) if added_df is not None and len(added_df) else {}
+        
+        # Unaffected KPIs keep their accumulators as they are
+        updated = dict(accumulators)
+        for name in names:
+            kpi_accumulators = dict(accumulators[name])
+            for key in kpi_accumulators:
+                if name in removed:
+                    kpi_accumulators[key] = kpi_accumulators[key] - removed[name][key]
+                if name in added:
+                    kpi_accumulators[key] = kpi_accumulators[key] + added[name][key]
+            updated[name] = kpi_accumulators
+        return updated
+    
+    def _budget_health(self, projects_df):
+        """Budget and spend sums"""
+        return {
+            'spent': projects_df['spent'].to_numpy(np.float64).sum(),
+            'budget': projects_df['budget'].to_numpy(np.float64).sum()
+        }
+    
+    def _timeline_performance(self, projects_df):
+        """Project count and on-schedule count"""
+        return {
+            'projects': len(projects_df),
+            'on_schedule': int(projects_df['status'].isin(ON_SCHEDULE_STATUSES).sum())
+        }
+    
+    def _risk_level(self, projects_df):
+        """Moments of the risk score"""
+        return {'risk_score': RunningMoments.of(projects_df['risk_score'])}
+    
+    def _team_velocity(self, projects_df):
+        """Moments of progress"""
+        return {'progress': RunningMoments.of(projects_df['progress'])}
+    
+    def _resource_utilization(self, projects_df):
+        """Person-days booked inside the window and the window capacity of the teams active in it"""
+        starts = to_day_array(projects_df['start_date'])
+        ends = to_day_array(projects_df['end_date'])
+        valid = ~np.isnat(starts) & ~np.isnat(ends)
+        
+        # Days of each project's date range falling inside the window
+        overlap = np.zeros(len(projects_df), dtype=np.int64)
+        overlap[valid] = (
+            np.minimum(ends[valid], self.window_end) - np.maximum(starts[valid], self.window_start)
+        ).astype(np.int64) + 1
+        active = overlap > 0
+        
+        team_size = projects_df['team_size'].to_numpy(np.float64)
+        return {
+            'staffed_days': (team_size[active] * overlap[active]).sum(),
+            'capacity_days': team_size[active].sum() * self.window_days
+        }
+
+def totals_from_accumulators(accumulators):
+    """Flat additive totals behind the KPIs, as kept per day by SnapshotHistory"""
+    return {
+        'projects': accumulators['timeline_performance']['projects'],
+        'spent': accumulators['budget_health']['spent'],
+        'budget': accumulators['budget_health']['budget'],
+        'on_schedule': accumulators['timeline_performance']['on_schedule'],
+        'risk_score': accumulators['risk_level']['risk_score'].total,
+        'progress': accumulators['team_velocity']['progress'].total,
+        'staffed_days': accumulators['resource_utilization']['staffed_days'],
+        'capacity_days': accumulators['resource_utilization']['capacity_days']
+    }
+
+def kpi_values(totals):
+    """KPI values from flat totals; also works column-wise on a frame of per-period totals"""
+    total_projects = totals['projects']
+    return {
+        'budget_health': 100 - (_ratio(totals['spent'], totals['budget']) * 100 - 70),
+        'timeline_performance': _ratio(totals['on_schedule'], total_projects) * 100,
+        'risk_level': _ratio(totals['risk_score'], total_projects),
+        'team_velocity': _ratio(totals['progress'], total_projects),
+        'resource_utilization': _ratio(totals['staffed_days'], totals['capacity_days']) * 100
+    }
+
+def build_kpis(accumulators, previous_totals=None):
+    """KPI metrics with target, spread where tracked, and trend against a previous period's totals"""
+    values = kpi_values(totals_from_accumulators(accumulators))
+    previous_values = kpi_values(previous_totals) if previous_totals else {}
+    
+    kpis = {}
+    for name, definition in KPI_DEFINITIONS.items():
+        previous = previous_values.get(name)
+        if previous is not None and np.isnan(previous):
+            previous = None
+        kpis[name] = {
+            'value': values[name],
+            'target': definition['target'],
+            'previous': previous,
+            'trend': _trend(values[name], previous)
+        }
+    
+    kpis['risk_level']['spread'] = accumulators['risk_level']['risk_score'].std
+    kpis['team_velocity']['spread'] = accumulators['team_velocity']['progress'].std
+    return kpis
+
+def _ratio(numerator, denominator):
+    """numerator / denominator, NaN where the denominator is zero (an empty view has no KPI value)"""
+    if np.ndim(denominator) == 0:
+        return numerator / denominator if denominator else np.nan
+    return numerator / denominator.where(denominator != 0)
+
+def _trend(value, previous, tolerance=0.005):
+    """'up', 'down' or 'stable' for a value against its previous period"""
+    if previous is None or np.isnan(value) or abs(value - previous) <= tolerance * max(abs(previous), 1e-9):
+        return 'stable'
+    return 'up' if value > previous else 'down'
@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from filter_index import filters_key
+
+class ProjectTable:
+    """Server-side sort, search and paging over one snapshot's projects frame"""
+    
+    def __init__(self, projects_df, filter_index, search_index, max_cached_views=16):
+        """Initialize table over a snapshot frame and its filter and search indexes"""
+        self.projects_df = projects_df
+        self.filter_index = filter_index
+        self.search_index = search_index
+        self.max_cached_views = max_cached_views
+        self._sort_orders = {}
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def sort_order(self, column):
+        """Ascending row order for one column, computed once per snapshot"""
+        with self._lock:
+            if column not in self._sort_orders:
+                self._sort_orders[column] = self.projects_df[column].argsort(kind='stable').to_numpy()
+            return self._sort_orders[column]
+    
+    def rows(self, filters=None, search='', sort_by=None, ascending=True):
+        """Row positions of the filtered, searched and sorted view; recent views are cached"""
+        search = search.strip()
+        key = (filters_key(filters), search.lower(), sort_by, ascending)
+        
+        with self._lock:
+            if key in self._views:
+                self._views.move_to_end(key)
+                return self._views[key]
+        
+        positions = self.filter_index.positions(filters)
+        if search:
+            mask = self.search_index.match_mask(search)
+            if positions is not None:
+                mask &= _positions_mask(positions, len(mask))
+            positions = np.flatnonzero(mask)
+        
+        if sort_by is not None:
+            order = self.sort_order(sort_by)
+            if not ascending:
+                order = order[::-1]
+            if positions is None:
+                positions = order
+            else:
+                # Keep the cached sort order, restricted to the matching rows
+                positions = order[_positions_mask(positions, len(order))[order]]
+        elif positions is None:
+            positions = np.arange(len(self.projects_df))
+        
+        with self._lock:
+            self._views[key] = positions
+            if len(self._views) > self.max_cached_views:
+                self._views.popitem(last=False)
+        return positions
+    
+    def page(self, rows, page_number, page_size, columns=None):
+        """Materialise one page of rows; page numbers start at 1"""
+        start = (page_number - 1) * page_size
+        page_df = self.projects_df.take(rows[start:start + page_size])
+        return page_df if columns is None else page_df[columns]
+
+def page_count(num_rows, page_size):
+    """Number of pages needed for a row count, at least one"""
+    return max(1, -(-num_rows // page_size))
+
+def _positions_mask(positions, num_rows):
+    """Boolean row mask with the given positions set"""
+    mask = np.zeros(num_rows, dtype=bool)
+    mask[positions] = True
+    return mask
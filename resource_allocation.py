@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from data_schema import to_category, to_day_array
+from interval_index import sweep_counts
+
+# Columns allocation can be grouped by, with their labels
+ALLOCATION_GROUPS = {'department': 'Department', 'manager': 'Manager'}
+
+class ResourceAllocation:
+    """Team members allocated per group and week, swept from start/end difference arrays"""
+    
+    def __init__(self, projects_df, group_col='department', bin_days=7):
+        """Bin every project's date range once, so a matrix over any set of rows is two bincounts"""
+        groups = to_category(projects_df[group_col])
+        
+        self.group_col = group_col
+        self.bin_days = bin_days
+        self.lanes = pd.Index(groups.cat.categories.astype(str), name=group_col)
+        self.codes = groups.cat.codes.to_numpy().astype(np.int64)
+        starts = to_day_array(projects_df['start_date'])
+        ends = to_day_array(projects_df['end_date'])
+        self.valid = (self.codes >= 0) & ~np.isnat(starts) & ~np.isnat(ends)
+        self.team_size = projects_df['team_size'].to_numpy(np.float64)
+        self._matrix = None
+        
+        if not self.valid.any():
+            self.num_bins = 0
+            self.week_starts = pd.DatetimeIndex([], name='week')
+            self.start_bins = self.end_bins = np.zeros(len(projects_df), dtype=np.int64)
+            return
+        
+        # Bins start on the Monday on or before the first start (day 0 of the epoch was a Thursday)
+        first_day = starts[self.valid].min()
+        first_day -= (first_day.astype(np.int64) + 3) % 7
+        span_days = int((ends[self.valid].max() - first_day).astype(np.int64)) + 1
+        self.num_bins = max(-(-span_days // bin_days), 1)
+        self.week_starts = pd.DatetimeIndex(first_day + np.arange(self.num_bins) * bin_days, name='week')
+        
+        # First and last bin of every project; team_size is swept over the bins in between
+        self.start_bins = np.zeros(len(projects_df), dtype=np.int64)
+        self.end_bins = np.zeros(len(projects_df), dtype=np.int64)
+        self.start_bins[self.valid] = (starts[self.valid] - first_day).astype(np.int64) // bin_days
+        self.end_bins[self.valid] = np.maximum(
+            (ends[self.valid] - first_day).astype(np.int64) // bin_days, self.start_bins[self.valid]
+        )
+    
+    def __len__(self):
+        """Number of projects with a group and both dates"""
+        return int(self.valid.sum())
+    
+    def matrix(self, positions=None):
+        """Team members per lane (rows) and week (columns), for all rows or only the given positions"""
+        if positions is None:
+            if self._matrix is None:
+                self._matrix = self._sweep(np.flatnonzero(self.valid))
+            return self._matrix
+        
+        positions = np.asarray(positions, dtype=np.intp)
+        return self._sweep(positions[self.valid[positions]])
+    
+    def _sweep(self, rows):
+        """Team members per lane and bin, swept over the given rows"""
+        allocated = sweep_counts(
+            self.codes[rows], self.start_bins[rows], self.end_bins[rows], len(self.lanes), self.num_bins,
+            weights=self.team_size[rows]
+        )
+        return pd.DataFrame(np.rint(allocated).astype(np.int64), index=self.lanes, columns=self.week_starts)
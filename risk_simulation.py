@@ -0,0 +1,176 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data_schema import to_day_array
+
+# Simulated outcomes per project, and the percentiles reported from them
+DEFAULT_SIMULATIONS = 2000
+PERCENTILES = (10, 50, 90)
+
+# Draws per batch matrix, which bounds memory whatever the portfolio size
+BATCH_DRAWS = 1000000
+
+# Slower delivery tends to come with higher cost, so the two draws are correlated
+SCHEDULE_COST_CORRELATION = 0.5
+
+class RiskSimulation:
+    """Monte Carlo completion-date and final-spend outcomes for every project, simulated in batches"""
+    
+    def __init__(self, projects_df, num_simulations=DEFAULT_SIMULATIONS, as_of=None, seed=0, max_workers=0,
+                 previous=None):
+        """Simulate every project, or only those whose updated_at moved since a previous simulation"""
+        self.num_simulations = num_simulations
+        self.today = np.datetime64(as_of or datetime.now(), 'D')
+        self.project_ids = projects_df['project_id'].to_numpy()
+        self.updated_at = projects_df['updated_at'].to_numpy() if 'updated_at' in projects_df else None
+        starts = to_day_array(projects_df['start_date'])
+        ends = to_day_array(projects_df['end_date'])
+        
+        # Outcomes are only reusable when drawn the same day, at the same count and with change tracking
+        previous_positions = np.full(len(projects_df), -1)
+        if (previous is not None and previous.num_simulations == num_simulations and previous.today == self.today
+                and self.updated_at is not None and previous.updated_at is not None):
+            previous_positions = pd.Index(previous.project_ids).get_indexer(self.project_ids)
+            matched = previous_positions >= 0
+            matched[matched] = previous.updated_at[previous_positions[matched]] == self.updated_at[matched]
+            previous_positions[~matched] = -1
+        reused = previous_positions >= 0
+        rows = np.flatnonzero(~reused)
+        self.simulated_rows = len(rows)
+        
+        progress = projects_df['progress'].to_numpy(np.float64)[rows]
+        spent_ratio = (
+            projects_df['spent'].to_numpy(np.float64) / np.maximum(projects_df['budget'].to_numpy(np.float64), 1.0)
+        )[rows]
+        planned_days = np.maximum((ends[rows] - starts[rows]).astype(np.int64), 1).astype(np.float64)
+        elapsed_days = np.maximum((self.today - starts[rows]).astype(np.int64), 0).astype(np.float64)
+        
+        # Finished work stops the clock: at its completion date when known, else on the planned end
+        finished = progress >= 100
+        if 'completion_date' in projects_df:
+            completed = to_day_array(projects_df['completion_date'])[rows]
+            known = finished & ~np.isnat(completed)
+            elapsed_days[known] = np.maximum((completed[known] - starts[rows][known]).astype(np.int64), 0)
+        else:
+            known = np.zeros(len(rows), dtype=bool)
+        elapsed_days[finished & ~known] = np.minimum(elapsed_days, planned_days)[finished & ~known]
+        
+        # Batch layout depends only on the simulated rows and simulation count, never on the worker count
+        batch_size = max(1, BATCH_DRAWS // num_simulations)
+        batch_starts = list(range(0, len(rows), batch_size))
+        batch_seeds = np.random.SeedSequence(seed).spawn(len(batch_starts))
+        batches = [
+            (batch_seed, progress[start:start + batch_size], spent_ratio[start:start + batch_size],
+             elapsed_days[start:start + batch_size], planned_days[start:start + batch_size], num_simulations)
+            for batch_seed, start in zip(batch_seeds, batch_starts)
+        ]
+        
+        if max_workers != 0 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_simulate_batch, *zip(*batches)))
+        else:
+            results = [_simulate_batch(*batch) for batch in batches]
+        
+        # Per-project results: simulated rows from the batches, unchanged rows copied from the previous run
+        late = np.zeros(len(projects_df))
+        over_budget = np.zeros(len(projects_df))
+        finish_days = np.zeros((len(projects_df), len(PERCENTILES)))
+        spend_ratios = np.zeros((len(projects_df), len(PERCENTILES)))
+        if results:
+            late[rows], over_budget[rows], finish_days[rows], spend_ratios[rows] = (
+                np.concatenate(parts) for parts in zip(*results)
+            )
+        if reused.any():
+            source = previous_positions[reused]
+            late[reused] = previous._late[source]
+            over_budget[reused] = previous._over_budget[source]
+            finish_days[reused] = previous._finish_days[source]
+            spend_ratios[reused] = previous._spend_ratios[source]
+        self._late = late
+        self._over_budget = over_budget
+        self._finish_days = finish_days
+        self._spend_ratios = spend_ratios
+        
+        budget = projects_df['budget'].to_numpy(np.float64)
+        outcomes = {
+            'project_id': self.project_ids,
+            'project_name': projects_df['project_name'].to_numpy(),
+            'end_date': ends,
+            'late_probability': late * 100,
+            'over_budget_probability': over_budget * 100
+        }
+        for band, percentile in enumerate(PERCENTILES):
+            outcomes[f'finish_p{percentile}'] = starts + np.rint(finish_days[:, band]).astype('timedelta64[D]')
+        for band, percentile in enumerate(PERCENTILES):
+            outcomes[f'spend_p{percentile}'] = spend_ratios[:, band] * budget
+        self.outcomes = pd.DataFrame(outcomes)
+    
+    def __len__(self):
+        """Number of simulated projects"""
+        return len(self.outcomes)
+    
+    def summary(self, positions=None):
+        """Expected and likely (probability of at least 50%) late and over-budget project counts"""
+        outcomes = self.outcomes if positions is None else self.outcomes.take(positions)
+        late = outcomes['late_probability'].to_numpy() / 100
+        over_budget = outcomes['over_budget_probability'].to_numpy() / 100
+        return {
+            'projects': len(outcomes),
+            'expected_late': late.sum(),
+            'expected_over_budget': over_budget.sum(),
+            'likely_late': int((late >= 0.5).sum()),
+            'likely_over_budget': int((over_budget >= 0.5).sum())
+        }
+    
+    def top_risks(self, limit=20, positions=None):
+        """Outcomes of the projects most likely to finish late, ties broken by over-budget probability"""
+        outcomes = self.outcomes if positions is None else self.outcomes.take(positions)
+        order = np.lexsort((
+            -outcomes['over_budget_probability'].to_numpy(), -outcomes['late_probability'].to_numpy()
+        ))
+        return outcomes.take(order[:limit])
+
+def _simulate_batch(seed_sequence, progress, spent_ratio, elapsed_days, planned_days, num_simulations):
+    """Simulate one batch: (P(late), P(over budget), finish-day and spend-ratio percentiles) per project"""
+    rng = np.random.default_rng(seed_sequence)
+    
+    # Single precision throughout; outcomes are reported in whole days and percents
+    done = np.clip(progress / 100, 0.0, 1.0).astype(np.float32)[:, None]
+    remaining = 1 - done
+    elapsed_days = elapsed_days.astype(np.float32)[:, None]
+    planned_days = planned_days.astype(np.float32)[:, None]
+    spent_ratio = spent_ratio.astype(np.float32)[:, None]
+    
+    # The observed rate and cost per unit of work count for more the further along a project is
+    observed_rate = done / np.maximum(elapsed_days, 1.0)
+    rate = done * observed_rate + remaining / planned_days
+    observed_cost = np.divide(spent_ratio, done, out=np.ones_like(done), where=done > 0)
+    cost = done * observed_cost + remaining
+    
+    # Lognormal multipliers with mean 1, wider while more work remains
+    schedule_sigma = 0.2 + 0.4 * remaining
+    cost_sigma = 0.1 + 0.3 * remaining
+    shape = (len(progress), num_simulations)
+    schedule_noise = rng.standard_normal(shape, dtype=np.float32)
+    cost_noise = rng.standard_normal(shape, dtype=np.float32)
+    cost_noise *= np.float32(np.sqrt(1 - SCHEDULE_COST_CORRELATION ** 2))
+    cost_noise += np.float32(SCHEDULE_COST_CORRELATION) * schedule_noise
+    
+    rate_draws = rate * np.exp(schedule_sigma * schedule_noise - schedule_sigma ** 2 / 2)
+    finish_days = elapsed_days + remaining / rate_draws
+    # A faster draw (positive schedule noise) comes with a lower cost
+    cost_draws = cost * np.exp(-cost_sigma * cost_noise - cost_sigma ** 2 / 2)
+    spend_ratios = spent_ratio + remaining * cost_draws
+    
+    return (
+        (finish_days > planned_days).mean(axis=1),
+        (spend_ratios > 1.0).mean(axis=1),
+        _percentiles(finish_days),
+        _percentiles(spend_ratios)
+    )
+
+def _percentiles(draws):
+    """Nearest-rank PERCENTILES of each row, from one partial sort instead of a full one"""
+    ranks = [min(int(percentile / 100 * draws.shape[1]), draws.shape[1] - 1) for percentile in PERCENTILES]
+    return np.partition(draws, ranks, axis=1)[:, ranks].astype(np.float64)
@@ -0,0 +1,213 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from data_schema import to_category
+
+SEARCH_COLUMNS = ['project_name', 'manager', 'department']
+
+# Rank weight of a match in each column; earlier columns rank higher
+COLUMN_WEIGHTS = {'project_name': 3.0, 'manager': 2.0, 'department': 1.0}
+
+# Characters after which a match counts as starting a word
+WORD_SEPARATORS = ' \t\n\r\x0b\x0c'
+
+# A gram packs three 21-bit code points; an occurrence packs a term id above a 32-bit position in the term
+CODE_POINT_BITS = 21
+POSITION_BITS = 32
+POSITION_MASK = (1 << POSITION_BITS) - 1
+
+class SearchIndex:
+    """Trigram index over the distinct values of the search columns, carried across snapshots"""
+    
+    def __init__(self, projects_df, columns=SEARCH_COLUMNS, max_cached_queries=64, previous=None):
+        """Index each column's categories, only indexing values the previous snapshot's index lacks"""
+        self.num_rows = len(projects_df)
+        self.columns = [col for col in columns if col in projects_df.columns]
+        self.max_cached_queries = max_cached_queries
+        self.grams = {}
+        self.row_terms = {}
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+        
+        for col in self.columns:
+            values = to_category(projects_df[col])
+            grams = previous.grams.get(col) if previous is not None else None
+            if grams is None:
+                grams = _ColumnGrams(values.cat.categories)
+            else:
+                grams = grams.extend(values.cat.categories)
+            self.grams[col] = grams
+            
+            # Terms are the categories, so a row's category code is its term id (-1 for missing values)
+            self.row_terms[col] = values.cat.codes.to_numpy()
+    
+    def _rank(self, query):
+        """All matching rows with their best score, best first and by row position within a score"""
+        best = np.zeros(self.num_rows)
+        for col in self.columns:
+            # One slot past the terms stays zero for missing values
+            term_scores = self.grams[col].term_scores(query, COLUMN_WEIGHTS.get(col, 1.0))
+            np.maximum(best, term_scores[self.row_terms[col]], out=best)
+        
+        positions = np.flatnonzero(best)
+        ranked = np.argsort(-best[positions], kind='stable')
+        return positions[ranked], best[positions][ranked]
+    
+    def search(self, query, limit=None, within=None):
+        """Ranked (positions, scores) of rows matching the query, optionally only among given positions"""
+        query = ' '.join(query.lower().split())
+        if not query:
+            return np.array([], dtype=np.intp), np.array([])
+        
+        with self._lock:
+            cached = self._queries.get(query)
+            if cached is not None:
+                self._queries.move_to_end(query)
+        
+        if cached is None:
+            cached = self._rank(query)
+            with self._lock:
+                self._queries[query] = cached
+                if len(self._queries) > self.max_cached_queries:
+                    self._queries.popitem(last=False)
+        
+        positions, scores = cached
+        if within is not None:
+            allowed = np.zeros(self.num_rows, dtype=bool)
+            allowed[within] = True
+            keep = allowed[positions]
+            positions, scores = positions[keep], scores[keep]
+        return positions[:limit], scores[:limit]
+    
+    def match_mask(self, query):
+        """Boolean row mask of every row matching the query"""
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[self.search(query)[0]] = True
+        return mask
+
+class _ColumnGrams:
+    """Sorted trigram postings of one column's lowercased terms; never modified once built"""
+    
+    def __init__(self, categories):
+        """Index every category as a term, with the category code as its term id"""
+        self.categories = categories
+        self.keys, self.offsets, self.occurrences = _group_grams(*_term_grams(categories, first_term=0))
+    
+    def extend(self, categories):
+        """Index for a later snapshot's categories, only indexing the categories appended since this one"""
+        known = len(self.categories)
+        # Merged snapshots append categories; any other change starts over
+        if len(categories) < known or not categories[:known].equals(self.categories):
+            return _ColumnGrams(categories)
+        
+        extended = object.__new__(_ColumnGrams)
+        extended.categories = categories
+        if len(categories) == known:
+            extended.keys, extended.offsets, extended.occurrences = self.keys, self.offsets, self.occurrences
+            return extended
+        
+        # New terms have the highest ids, so their occurrences go at the end of each gram's postings
+        new_keys, new_offsets, new_occurrences = _group_grams(*_term_grams(categories[known:], first_term=known))
+        extended.keys = np.union1d(self.keys, new_keys)
+        counts = np.zeros(len(extended.keys), dtype=np.int64)
+        counts[np.searchsorted(extended.keys, self.keys)] += np.diff(self.offsets)
+        counts[np.searchsorted(extended.keys, new_keys)] += np.diff(new_offsets)
+        extended.offsets = np.concatenate([[0], np.cumsum(counts)])
+        
+        insert_at = self.offsets[np.searchsorted(self.keys, new_keys, side='right')]
+        extended.occurrences = np.insert(
+            self.occurrences, np.repeat(insert_at, np.diff(new_offsets)), new_occurrences
+        )
+        return extended
+    
+    def term_scores(self, query, weight):
+        """Score of every term for the query, plus a trailing zero: weight, +1 at a word start, +2 at the start"""
+        scores = np.zeros(len(self.categories) + 1)
+        occurrences = self._matches(query)
+        scores[occurrences >> POSITION_BITS] = weight
+        
+        # A word-start match follows a separator, found as a gram of separator plus the query's start
+        for separator in WORD_SEPARATORS:
+            if len(query) < 3:
+                word_starts = self._prefix_postings(separator + query) >> POSITION_BITS
+            else:
+                preceded = self._prefix_postings(separator + query[:2]) + 1
+                word_starts = occurrences[np.isin(occurrences, preceded)] >> POSITION_BITS
+            scores[word_starts] = weight + 1.0
+        
+        scores[occurrences[(occurrences & POSITION_MASK) == 0] >> POSITION_BITS] = weight + 2.0
+        return scores
+    
+    def _matches(self, query):
+        """Occurrences (term id and start position) of every match of the query"""
+        if len(query) < 3:
+            return self._prefix_postings(query)
+        
+        # Every trigram of the query must occur at its offset from the same start
+        grams = [(offset, self._prefix_postings(query[offset:offset + 3])) for offset in range(len(query) - 2)]
+        grams.sort(key=lambda gram: len(gram[1]))
+        offset, postings = grams[0]
+        matches = postings[(postings & POSITION_MASK) >= offset] - offset
+        for offset, postings in grams[1:]:
+            if not len(postings):
+                return postings
+            shifted = matches + offset
+            found = np.minimum(np.searchsorted(postings, shifted), len(postings) - 1)
+            matches = matches[postings[found] == shifted]
+        return matches
+    
+    def _prefix_postings(self, prefix):
+        """Occurrences of every gram starting with a prefix of up to three characters"""
+        code_points = _code_points(prefix)
+        shift = CODE_POINT_BITS * (3 - len(code_points))
+        low = _pack_grams(np.concatenate([code_points, np.zeros(3 - len(code_points), dtype=np.uint64)]))[0]
+        bounds = np.searchsorted(self.keys, [low, low + (np.uint64(1) << np.uint64(shift))])
+        return self.occurrences[self.offsets[bounds[0]]:self.offsets[bounds[1]]]
+
+def _code_points(text):
+    """Unicode code points of a string as a uint64 array"""
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+
+def _pack_grams(code_points):
+    """Gram keys starting at every position of a code point array but the last two"""
+    return (
+        (code_points[:-2] << np.uint64(2 * CODE_POINT_BITS))
+        | (code_points[1:-1] << np.uint64(CODE_POINT_BITS))
+        | code_points[2:]
+    )
+
+def _term_grams(categories, first_term):
+    """(gram keys, occurrences) at every position of the lowercased terms, in term and position order"""
+    if not len(categories):
+        return np.array([], dtype=np.uint64), np.array([], dtype=np.int64)
+    
+    # One text of all terms, each followed by two NULs, so grams near a term's end are padded
+    terms = np.asarray(categories.astype(str), dtype=object)
+    text = '\0\0'.join(terms) + '\0\0'
+    if text.count('\0') != 2 * len(terms):
+        text = '\0\0'.join(term.replace('\0', ' ') for term in terms) + '\0\0'
+    code_points = _code_points(text.lower())
+    
+    # Lowercasing can change a term's length, so terms are delimited by their NUL pairs
+    positions = np.flatnonzero(code_points)
+    term_ends = np.flatnonzero(code_points == 0)[::2]
+    term_starts = np.concatenate([[0], term_ends[:-1] + 2])
+    term_ids = np.repeat(np.arange(len(term_ends)), term_ends - term_starts)
+    occurrences = ((term_ids + first_term) << POSITION_BITS) | (positions - term_starts[term_ids])
+    return _pack_grams(code_points)[positions], occurrences
+
+def _group_grams(keys, occurrences):
+    """Group occurrences by gram, keeping term and position order within a gram: (unique keys, offsets, occurrences)"""
+    codes, unique_keys = pd.factorize(keys, sort=True)
+    counts = np.bincount(codes, minlength=len(unique_keys))
+    return unique_keys, np.concatenate([[0], np.cumsum(counts)]), occurrences[_stable_order(codes, len(unique_keys))]
+
+def _stable_order(codes, num_groups):
+    """Stable argsort of group codes in 16-bit radix passes, which NumPy sorts in linear time"""
+    order = np.argsort((codes & 0xFFFF).astype(np.uint16), kind='stable')
+    shift = 16
+    while num_groups > 1 << shift:
+        order = order[np.argsort(((codes[order] >> shift) & 0xFFFF).astype(np.uint16), kind='stable')]
+        shift += 16
+    return order
@@ -0,0 +1,174 @@
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from data_schema import optimize_projects_frame
+
+# Additive KPI totals kept per period, as returned by kpi_engine.totals_from_accumulators
+TOTAL_COLUMNS = ['projects', 'spent', 'budget', 'on_schedule', 'risk_score', 'progress', 'staffed_days', 'capacity_days']
+
+class SnapshotHistory:
+    """Append-only SQLite history of one data source: changed project rows per snapshot plus KPI totals per day"""
+    
+    def __init__(self, path, source=''):
+        """Initialize history at a database path for a source key, creating its tables on first use"""
+        self.path = path
+        self.source = source
+        self._lock = threading.Lock()
+        self._last_updated = None
+        
+        with closing(sqlite3.connect(self.path)) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT, recorded_at TEXT NOT NULL, "
+                "period TEXT NOT NULL, changed_rows INTEGER NOT NULL, removed_rows INTEGER NOT NULL, "
+                "source TEXT NOT NULL DEFAULT '')"
+            )
+            if 'source' not in _table_columns(conn, 'snapshots'):
+                conn.execute("ALTER TABLE snapshots ADD COLUMN source TEXT NOT NULL DEFAULT ''")
+            
+            # Totals recorded before sources were tracked belong to the unnamed source ''
+            existing = _table_columns(conn, 'period_totals')
+            if existing and 'source' not in existing:
+                conn.execute("ALTER TABLE period_totals RENAME TO period_totals_unkeyed")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS period_totals (source TEXT NOT NULL, period TEXT NOT NULL, "
+                "snapshot_id INTEGER NOT NULL, " + ", ".join(f"{col} REAL NOT NULL" for col in TOTAL_COLUMNS)
+                + ", PRIMARY KEY (source, period))"
+            )
+            if existing and 'source' not in existing:
+                columns = ['period', 'snapshot_id'] + TOTAL_COLUMNS
+                conn.execute(
+                    f"INSERT INTO period_totals (source, {', '.join(columns)}) "
+                    f"SELECT '', {', '.join(col if col in existing else '0' for col in columns)} "
+                    "FROM period_totals_unkeyed"
+                )
+                conn.execute("DROP TABLE period_totals_unkeyed")
+            
+            # Totals added after a database was created read as 0 for the periods before them
+            existing = _table_columns(conn, 'period_totals')
+            for col in TOTAL_COLUMNS:
+                if col not in existing:
+                    conn.execute(f"ALTER TABLE period_totals ADD COLUMN {col} REAL NOT NULL DEFAULT 0")
+            conn.commit()
+    
+    def _query(self, query, params=()):
+        """Run a read query on a short-lived connection"""
+        with closing(sqlite3.connect(self.path)) as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    
+    def _has_deltas(self, conn):
+        """Whether the project_deltas table exists yet (it takes its columns from the first frame)"""
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'project_deltas'"
+        ).fetchone() is not None
+    
+    def _load_last_updated(self):
+        """Latest recorded updated_at per live project, rebuilt from the deltas"""
+        with closing(sqlite3.connect(self.path)) as conn:
+            if not self._has_deltas(conn):
+                return pd.Series(dtype='datetime64[us]')
+            latest_df = pd.read_sql_query(
+                "SELECT project_id, updated_at, removed FROM project_deltas WHERE rowid IN ("
+                "SELECT MAX(d.rowid) FROM project_deltas d JOIN snapshots s USING (snapshot_id) "
+                "WHERE s.source = ? GROUP BY d.project_id)",
+                conn,
+                params=[self.source]
+            )
+        
+        latest_df = latest_df[latest_df['removed'] == 0]
+        return pd.Series(
+            pd.to_datetime(latest_df['updated_at'], format='ISO8601').to_numpy(), index=latest_df['project_id']
+        )
+    
+    def record(self, projects_df, totals, recorded_at=None):
+        """Append rows changed since the last record and upsert the day's totals; returns changed rows"""
+        recorded_at = recorded_at or datetime.now()
+        period = recorded_at.strftime('%Y-%m-%d')
+        
+        with self._lock:
+            if self._last_updated is None:
+                self._last_updated = self._load_last_updated()
+            last_updated = self._last_updated
+            
+            # A row is new or changed when its updated_at moved past the recorded one
+            previous = last_updated.reindex(projects_df['project_id'].to_numpy()).to_numpy()
+            current = projects_df['updated_at'].to_numpy()
+            changed = np.isnat(previous) | (current > previous)
+            removed_ids = last_updated.index[~last_updated.index.isin(projects_df['project_id'])]
+            
+            changed_df = projects_df[changed].assign(removed=0)
+            removed_df = pd.DataFrame({'project_id': removed_ids, 'removed': 1})
+            
+            with closing(sqlite3.connect(self.path)) as conn:
+                has_totals = conn.execute(
+                    "SELECT 1 FROM period_totals WHERE source = ? AND period = ?", [self.source, period]
+                ).fetchone() is not None
+                if changed_df.empty and removed_df.empty and has_totals:
+                    return 0
+                
+                cursor = conn.execute(
+                    "INSERT INTO snapshots (recorded_at, period, changed_rows, removed_rows, source) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [recorded_at.isoformat(sep=' '), period, len(changed_df), len(removed_df), self.source]
+                )
+                snapshot_id = cursor.lastrowid
+                
+                deltas_df = pd.concat([changed_df, removed_df], ignore_index=True).assign(snapshot_id=snapshot_id)
+                if not deltas_df.empty:
+                    create_index = not self._has_deltas(conn)
+                    deltas_df.to_sql('project_deltas', conn, if_exists='append', index=False)
+                    if create_index:
+                        conn.execute("CREATE INDEX idx_deltas_project ON project_deltas (project_id, snapshot_id)")
+                
+                conn.execute(
+                    f"INSERT OR REPLACE INTO period_totals (source, period, snapshot_id, {', '.join(TOTAL_COLUMNS)}) "
+                    f"VALUES (?, ?, ?, {', '.join('?' * len(TOTAL_COLUMNS))})",
+                    [self.source, period, snapshot_id] + [float(totals[col]) for col in TOTAL_COLUMNS]
+                )
+                conn.commit()
+            
+            self._last_updated = pd.Series(current, index=projects_df['project_id'].to_numpy())
+            return len(changed_df) + len(removed_df)
+    
+    def period_totals(self, days=90, end=None):
+        """KPI totals per day over the last `days` days, indexed by period"""
+        end = pd.Timestamp(end or datetime.now()).normalize()
+        totals_df = self._query(
+            f"SELECT period, {', '.join(TOTAL_COLUMNS)} FROM period_totals "
+            "WHERE source = ? AND period > ? AND period <= ? ORDER BY period",
+            [self.source, (end - timedelta(days=days)).strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')]
+        )
+        return totals_df.set_index(pd.DatetimeIndex(totals_df.pop('period'), name='period'))
+    
+    def previous_totals(self, days=1, end=None):
+        """Totals of the latest recorded day at least `days` before end, or None without history"""
+        cutoff = pd.Timestamp(end or datetime.now()).normalize() - timedelta(days=days)
+        totals_df = self._query(
+            f"SELECT {', '.join(TOTAL_COLUMNS)} FROM period_totals "
+            "WHERE source = ? AND period <= ? ORDER BY period DESC LIMIT 1",
+            [self.source, cutoff.strftime('%Y-%m-%d')]
+        )
+        return None if totals_df.empty else totals_df.iloc[0].to_dict()
+    
+    def projects_as_of(self, recorded_at):
+        """Rebuild the project rows as they stood at a point in time from the latest delta per project"""
+        with closing(sqlite3.connect(self.path)) as conn:
+            if not self._has_deltas(conn):
+                return pd.DataFrame()
+            projects_df = pd.read_sql_query(
+                "SELECT * FROM project_deltas WHERE rowid IN ("
+                "SELECT MAX(d.rowid) FROM project_deltas d JOIN snapshots s USING (snapshot_id) "
+                "WHERE s.source = ? AND s.recorded_at <= ? GROUP BY d.project_id)",
+                conn,
+                params=[self.source, pd.Timestamp(recorded_at).isoformat(sep=' ')]
+            )
+        
+        projects_df = projects_df[projects_df['removed'] == 0]
+        return optimize_projects_frame(projects_df.drop(columns=['removed', 'snapshot_id']).reset_index(drop=True))
+
+def _table_columns(conn, table):
+    """Column names of a table, empty when it does not exist"""
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
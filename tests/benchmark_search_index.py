@@ -0,0 +1,49 @@
+"""Time SearchIndex builds, carried-over updates and queries on unique names: PYTHONPATH=. python tests/benchmark_search_index.py [rows ...]"""
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data_generator import DataGenerator
+from data_schema import align_categories, optimize_projects_frame
+from search_index import SearchIndex
+
+QUERIES = ['a', 'st', 'ore', 'store op', 'project 12345', 'zzzz']
+
+def unique_names(count, rng):
+    """Project names from a 5000-word vocabulary plus a running number, so every name is distinct"""
+    words = np.array([''.join(rng.choice(list('abcdefghijklmnopqrstuvwxyz'), size=rng.integers(3, 10))) for _ in range(5000)])
+    picks = rng.choice(words, size=(count, 3))
+    return [f"{a.title()} {b.title()} {c} {i}" for i, (a, b, c) in enumerate(picks)]
+
+def timed(label, func):
+    """Run func once and print its wall time"""
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<28}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+def benchmark(num_rows):
+    """Build from scratch, carry over to a snapshot with 1% new names, and run cold queries"""
+    rng = np.random.default_rng(0)
+    projects_df = DataGenerator(seed=0, as_of=datetime.now()).generate_projects_data(num_rows, columnar=True)
+    projects = optimize_projects_frame(projects_df.assign(project_name=unique_names(num_rows, rng)))
+    print(f"{num_rows:,} rows, {projects['project_name'].nunique():,} distinct names")
+    
+    index = timed('build', lambda: SearchIndex(projects))
+    
+    changed = projects.head(num_rows // 100).assign(
+        project_id=np.arange(num_rows, num_rows + num_rows // 100),
+        project_name=[f"Renamed {name}" for name in projects['project_name'].head(num_rows // 100)]
+    )
+    merged, incoming = align_categories(projects, optimize_projects_frame(changed))
+    merged = pd.concat([merged, incoming], ignore_index=True)
+    timed('carry over, 1% new names', lambda: SearchIndex(merged, previous=index))
+    timed('carry over, no new names', lambda: SearchIndex(projects, previous=index))
+    
+    for query in QUERIES:
+        positions, _ = timed(f"query {query!r}", lambda: index.search(query))
+
+if __name__ == '__main__':
+    for num_rows in map(int, sys.argv[1:] or ['200000', '1000000']):
+        benchmark(num_rows)
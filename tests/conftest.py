@@ -0,0 +1,57 @@
+from datetime import datetime
+import pandas as pd
+import pytest
+from data_access import DataProvider, filter_projects
+from data_generator import DataGenerator
+from data_schema import optimize_projects_frame
+
+class FrameProvider(DataProvider):
+    """In-memory provider whose rows tests change directly, as a database would be changed"""
+    
+    name = 'frame'
+    
+    def __init__(self, projects_df, milestones_df):
+        """Initialize provider with raw project and milestone frames"""
+        self.projects_df = projects_df.copy()
+        self.milestones_df = milestones_df
+    
+    def load_projects(self, filters=None):
+        """Return the matching projects in the compact schema"""
+        return optimize_projects_frame(filter_projects(self.projects_df, filters).reset_index(drop=True))
+    
+    def load_milestones(self, filters=None, project_ids=None):
+        """Return milestones of the matching projects"""
+        if project_ids is None:
+            project_ids = filter_projects(self.projects_df, filters)['project_id']
+        return self.milestones_df[self.milestones_df['project_id'].isin(project_ids)]
+    
+    def load_changes(self, since):
+        """Return rows updated after the watermark"""
+        projects_df = self.load_projects()
+        return projects_df[projects_df['updated_at'] > since]
+    
+    def update(self, project_ids, **values):
+        """Change columns of some projects and move their updated_at past every earlier change"""
+        rows = self.projects_df['project_id'].isin(project_ids)
+        for col, value in values.items():
+            self.projects_df.loc[rows, col] = value
+        self.projects_df.loc[rows, 'updated_at'] = self.projects_df['updated_at'].max() + pd.Timedelta(seconds=1)
+    
+    def append(self, rows_df):
+        """Add new project rows"""
+        self.projects_df = pd.concat([self.projects_df, rows_df], ignore_index=True)
+
+@pytest.fixture
+def generator():
+    """Seeded generator dated today, so KPI windows match the store's"""
+    return DataGenerator(seed=7, as_of=datetime.now())
+
+@pytest.fixture
+def projects_df(generator):
+    """Raw columnar portfolio of 300 projects"""
+    return generator.generate_projects_data(300, columnar=True)
+
+@pytest.fixture
+def provider(generator, projects_df):
+    """Provider over the seeded portfolio and its milestones"""
+    return FrameProvider(projects_df, generator.generate_milestone_data(projects_df))
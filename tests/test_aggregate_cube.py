@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from aggregate_cube import CUBE_MEASURES, HIGH_RISK_THRESHOLD, AggregateCube
+from data_access import filter_projects
+from data_schema import optimize_projects_frame
+
+FILTERS = [
+    {},
+    {'status': ['Behind', 'At Risk']},
+    {'department': ['Retail Technology', 'Store Operations'], 'priority': ['High']},
+    {'department': ['Supply Chain'], 'manager': ['No Such Manager']}
+]
+
+def brute_force_rollup(projects_df, by, filters):
+    """Per-group statistics computed directly from the filtered rows"""
+    rows = filter_projects(projects_df, filters)
+    keys = rows[by].astype(object) if by else pd.Series('total', index=rows.index)
+    grouped = rows.assign(high_risk=rows['risk_score'] >= HIGH_RISK_THRESHOLD).groupby(keys.to_numpy())
+    result = pd.DataFrame({'count': grouped.size(), 'high_risk': grouped['high_risk'].sum()})
+    for measure in CUBE_MEASURES:
+        result[f'{measure}_sum'] = grouped[measure].sum()
+        result[f'{measure}_mean'] = grouped[measure].mean()
+        result[f'{measure}_std'] = grouped[measure].std(ddof=0)
+    return result.sort_index()
+
+@pytest.mark.parametrize('by', [None, 'department', 'status', 'manager'])
+@pytest.mark.parametrize('filters', FILTERS)
+def test_rollups_match_grouping_the_filtered_rows(projects_df, by, filters):
+    """Counts, sums, means and spreads of every rollup equal a groupby over the filtered rows"""
+    projects = optimize_projects_frame(projects_df)
+    rollup = AggregateCube(projects).rollup(by, filters)
+    expected = brute_force_rollup(projects, by, filters)
+    
+    if by is None and expected.empty:
+        assert rollup['count'].tolist() == [0]
+        return
+    actual = rollup.set_axis(rollup.index.astype(object)).sort_index()
+    assert actual.index.tolist() == expected.index.tolist()
+    for col in expected.columns:
+        np.testing.assert_allclose(actual[col].to_numpy(np.float64), expected[col].to_numpy(np.float64), atol=1e-6)
+
+def test_rows_missing_a_dimension_are_left_out(projects_df):
+    """A project without a manager falls in no cell, as it matches no manager filter"""
+    managers = projects_df['manager'].where(projects_df['project_id'] != 1)
+    projects = optimize_projects_frame(projects_df.assign(manager=managers))
+    totals = AggregateCube(projects).totals()
+    assert totals['count'] == len(projects) - 1
+    assert totals['budget_sum'] == pytest.approx(projects.loc[projects['project_id'] != 1, 'budget'].sum())
@@ -0,0 +1,78 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from alert_engine import ALERT_RULES, AlertEngine, compile_condition
+from data_schema import optimize_projects_frame
+
+@pytest.mark.parametrize('condition', [
+    "__import__('os').system('true')",
+    "budget.__class__",
+    "status.str.contains('x')",
+    "[budget for budget in budget]",
+    "budget[0] > 1",
+    "(lambda: 1)()",
+    "budget if progress else spent",
+    "{'a': 1}",
+    "progress in [1, 2]",
+    "budget is None"
+])
+def test_compile_condition_rejects_unsafe_syntax(condition):
+    """Calls, attribute access, subscripts, comprehensions and the like never reach eval"""
+    with pytest.raises(ValueError, match='Unsupported syntax'):
+        compile_condition(condition)
+
+def test_compile_condition_reports_the_names_it_reads():
+    """Every column name in a condition is returned, once and sorted"""
+    _, names = compile_condition("spent / budget * 100 - progress > 15 and budget > 0")
+    assert names == ['budget', 'progress', 'spent']
+
+@pytest.mark.parametrize('condition, expected', [
+    ("a > 1 and b < 3", lambda df: (df['a'] > 1) & (df['b'] < 3)),
+    ("a > 1 or not b < 3", lambda df: (df['a'] > 1) | ~(df['b'] < 3)),
+    ("1 < a <= 3", lambda df: (df['a'] > 1) & (df['a'] <= 3)),
+    ("a * 2 - b == 0", lambda df: df['a'] * 2 - df['b'] == 0)
+])
+def test_conditions_apply_row_by_row(condition, expected):
+    """and/or/not and chained comparisons are rewritten to element-wise operators"""
+    df = pd.DataFrame({'a': [0, 1, 2, 3, 4], 'b': [0, 2, 4, 6, 8]})
+    code, _ = compile_condition(condition)
+    result = eval(code, {'__builtins__': {}}, {'a': df['a'], 'b': df['b']})
+    assert np.asarray(result).tolist() == expected(df).tolist()
+
+def test_evaluate_matches_pandas_filters(projects_df):
+    """Each rule flags exactly the rows the equivalent pandas expression selects"""
+    projects = optimize_projects_frame(projects_df)
+    as_of = datetime.now()
+    alerts = AlertEngine().evaluate(projects, as_of=as_of)
+    
+    today = pd.Timestamp(as_of).normalize()
+    expected = {
+        'high_risk_high_priority': (projects['risk_score'] >= 7) & (projects['priority'] == 'High'),
+        'spend_ahead_of_progress': projects['spent'] / projects['budget'] * 100 - projects['progress'] > 15,
+        'past_due': (projects['end_date'] < today) & (projects['status'] != 'Complete')
+    }
+    assert set(expected) == set(ALERT_RULES)
+    for rule_id, mask in expected.items():
+        flagged = alerts.loc[alerts['rule_id'] == rule_id, 'position'].tolist()
+        assert flagged == np.flatnonzero(mask.to_numpy()).tolist(), rule_id
+
+def test_unknown_column_is_rejected(projects_df):
+    """A rule over a column the snapshot lacks fails loudly"""
+    engine = AlertEngine({'bad': {'label': 'Bad', 'condition': 'no_such_column > 1', 'severity': 'info'}})
+    with pytest.raises(ValueError, match='unknown column'):
+        engine.evaluate(optimize_projects_frame(projects_df))
+
+def test_diff_matches_on_rule_and_project():
+    """Alerts present only now are raised, alerts present only before are resolved"""
+    engine = AlertEngine()
+    before = pd.DataFrame({
+        'project_id': [1, 2, 3], 'risk_score': [8.0, 8.0, 1.0], 'priority': ['High', 'High', 'High'],
+        'spent': [0.0, 0.0, 0.0], 'budget': [1, 1, 1], 'progress': [0.0, 0.0, 0.0],
+        'end_date': pd.to_datetime(['2099-01-01'] * 3), 'status': ['On Track'] * 3, 'project_name': ['a', 'b', 'c']
+    })
+    after = before.assign(risk_score=[8.0, 1.0, 8.0])
+    
+    raised, resolved = engine.diff(engine.evaluate(before), engine.evaluate(after))
+    assert raised['project_id'].tolist() == [3]
+    assert resolved['project_id'].tolist() == [2]
@@ -0,0 +1,125 @@
+import os
+import sqlite3
+from contextlib import closing
+import pandas as pd
+import pytest
+from data_access import ParquetDataProvider, SQLiteDataProvider, filter_projects, write_parquet, write_sqlite
+from data_schema import optimize_projects_frame
+from kpi_engine import KpiEngine, totals_from_accumulators
+
+@pytest.fixture
+def sqlite_path(tmp_path, generator, projects_df):
+    """SQLite database written from the seeded portfolio"""
+    path = str(tmp_path / 'projects.sqlite')
+    write_sqlite({'projects': projects_df, 'milestones': generator.generate_milestone_data(projects_df)}, path)
+    return path
+
+@pytest.fixture
+def parquet_dir(tmp_path, generator, projects_df):
+    """Parquet dataset written from the seeded portfolio, partitioned by department"""
+    directory = str(tmp_path / 'dataset')
+    write_parquet({'projects': projects_df, 'milestones': generator.generate_milestone_data(projects_df)}, directory)
+    return directory
+
+@pytest.fixture(params=['sqlite', 'parquet'])
+def pushdown_provider(request, sqlite_path, parquet_dir):
+    """Each provider that pushes filters into its source"""
+    if request.param == 'sqlite':
+        return SQLiteDataProvider(sqlite_path)
+    return ParquetDataProvider(parquet_dir)
+
+def set_updated_at(path, stamps):
+    """Overwrite updated_at text of some projects, as another writer would store it"""
+    with closing(sqlite3.connect(path)) as conn:
+        conn.executemany("UPDATE projects SET updated_at = ? WHERE project_id = ?", [
+            (stamp, project_id) for project_id, stamp in stamps.items()
+        ])
+        conn.commit()
+
+def test_sqlite_changes_compare_timestamps_not_text(sqlite_path):
+    """'T'-separated and coarser timestamps are newer or older by value, so a row is only sent once"""
+    provider = SQLiteDataProvider(sqlite_path)
+    set_updated_at(sqlite_path, {
+        1: '2030-01-01T00:00:00',
+        2: '2030-01-01 00:00:00.000100',
+        3: '2030-01-01T00:00:00.000250',
+        4: '2029-12-31T23:59:59.999'
+    })
+    
+    since = pd.Timestamp('2030-01-01 00:00:00.000100')
+    assert provider.load_changes(since)['project_id'].tolist() == [3]
+    assert provider.load_changes(pd.Timestamp('2030-01-01 00:00:00.000250')).empty
+    assert sorted(provider.load_changes(pd.Timestamp('2029-12-31 23:59:59'))['project_id']) == [1, 2, 3, 4]
+
+def test_sqlite_change_query_uses_the_index(sqlite_path):
+    """The watermark predicate is answered from the updated_at expression index"""
+    with closing(sqlite3.connect(sqlite_path)) as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM projects WHERE julianday(updated_at) >= julianday(?)",
+            ['2030-01-01 00:00:00.000000']
+        ).fetchall()
+    assert 'idx_projects_updated_at' in plan[0][-1]
+
+def test_parquet_changes_only_read_files_with_newer_rows(parquet_dir, projects_df):
+    """A poll skips every file whose footer says nothing is newer, and reads rows appended in a new file"""
+    provider = ParquetDataProvider(parquet_dir)
+    watermark = pd.Timestamp(projects_df['updated_at'].max())
+    assert provider._changed_files(watermark) == []
+    assert provider.load_changes(watermark).empty
+    
+    changed = projects_df[projects_df['department'] == 'Supply Chain'].head(3).assign(
+        progress=99.0, updated_at=watermark + pd.Timedelta(microseconds=1)
+    )
+    part_path = os.path.join(parquet_dir, 'projects', 'department=Supply Chain', 'part-changes.parquet')
+    changed.drop(columns='department').to_parquet(part_path, index=False)
+    
+    assert provider._changed_files(watermark) == [part_path]
+    changes_df = provider.load_changes(watermark)
+    assert changes_df['project_id'].tolist() == changed['project_id'].tolist()
+    assert (changes_df['department'] == 'Supply Chain').all()
+    assert provider.load_changes(watermark + pd.Timedelta(microseconds=1)).empty
+    
+    # A file rewritten in place is inspected again
+    changed.assign(updated_at=watermark + pd.Timedelta(seconds=5)).drop(columns='department').to_parquet(part_path, index=False)
+    os.utime(part_path, ns=(0, os.stat(part_path).st_mtime_ns + 1))
+    assert len(provider.load_changes(watermark + pd.Timedelta(seconds=1))) == 3
+
+@pytest.mark.parametrize('filters', [
+    None,
+    {'status': ['Behind']},
+    {'department': ['Supply Chain', 'Store Operations'], 'priority': ['High', 'Low']},
+    {'manager': ['No Such Manager']}
+])
+def test_pushdown_matches_filtering_in_pandas(pushdown_provider, generator, projects_df, filters):
+    """Rows and milestones selected by the source equal filter_projects over the whole portfolio"""
+    expected = filter_projects(optimize_projects_frame(projects_df), filters)
+    loaded = pushdown_provider.load_projects(filters)
+    assert sorted(loaded['project_id']) == sorted(expected['project_id'])
+    
+    columns = ['project_id', 'status', 'budget', 'spent', 'progress', 'team_size']
+    pd.testing.assert_frame_equal(
+        loaded.sort_values('project_id')[columns].reset_index(drop=True),
+        expected.sort_values('project_id')[columns].reset_index(drop=True),
+        check_dtype=False, check_categorical=False
+    )
+    
+    milestones = pushdown_provider.load_milestones(filters)
+    assert set(milestones['project_id']) == set(expected['project_id'])
+    by_id = pushdown_provider.load_milestones(project_ids=expected['project_id'].head(5).tolist())
+    assert set(by_id['project_id']) == set(expected['project_id'].head(5))
+
+def test_pushdown_rejects_unknown_filter_columns(pushdown_provider):
+    """Column names outside the filter whitelist never reach a query"""
+    with pytest.raises(ValueError):
+        pushdown_provider.load_projects({'status; DROP TABLE projects': ['x']})
+
+def test_distinct_values_and_count(pushdown_provider, projects_df):
+    """Filter options and the project count come from the source"""
+    assert pushdown_provider.count_projects() == len(projects_df)
+    assert pushdown_provider.distinct_values('manager') == sorted(projects_df['manager'].unique())
+
+def test_pushdown_kpis_match_accumulating_loaded_rows(pushdown_provider, generator, projects_df):
+    """KPI totals computed in the source equal the engine's over every loaded row"""
+    engine = KpiEngine(as_of=generator.as_of)
+    expected = totals_from_accumulators(engine.accumulate(optimize_projects_frame(projects_df)))
+    assert totals_from_accumulators(pushdown_provider.kpi_accumulators(engine)) == pytest.approx(expected)
@@ -0,0 +1,67 @@
+import io
+import pandas as pd
+import pytest
+import data_export
+from data_export import XLSX_ENGINE, ExportCache, write_export
+from data_schema import optimize_projects_frame
+
+CHUNK_SIZES = [1, 7, 300, 1000]
+
+@pytest.fixture
+def projects(projects_df):
+    """Portfolio in the compact schema the dashboard exports"""
+    return optimize_projects_frame(projects_df)
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_csv_chunks_join_into_one_csv(projects, chunk_size):
+    """Chunked CSV is byte for byte the frame written in one call, header once"""
+    assert write_export(projects, 'csv', chunk_size).read() == projects.to_csv(index=False).encode('utf-8')
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_parquet_row_groups_read_back_as_the_frame(projects, chunk_size):
+    """Every chunk becomes a row group, and the file reads back as the whole frame"""
+    data = write_export(projects, 'parquet', chunk_size).read()
+    read_back = pd.read_parquet(io.BytesIO(data))
+    pd.testing.assert_frame_equal(
+        read_back, projects.reset_index(drop=True), check_dtype=False, check_categorical=False
+    )
+
+@pytest.mark.skipif(XLSX_ENGINE is None, reason="Excel export requires openpyxl")
+@pytest.mark.parametrize('chunk_size', [7, 1000])
+def test_xlsx_sheets_split_at_the_row_limit(projects, chunk_size, monkeypatch):
+    """Rows continue on a new sheet once one is full, each sheet with its own header"""
+    monkeypatch.setattr(data_export, 'EXCEL_MAX_ROWS', 21)
+    frame = projects[['project_id', 'project_name', 'budget']].head(50).astype({'project_name': str})
+    sheets = pd.read_excel(write_export(frame, 'xlsx', chunk_size), sheet_name=None)
+    
+    assert list(sheets) == ['Projects 1', 'Projects 2', 'Projects 3']
+    assert [len(sheet) for sheet in sheets.values()] == [20, 20, 10]
+    pd.testing.assert_frame_equal(
+        pd.concat(sheets.values(), ignore_index=True), frame.reset_index(drop=True), check_dtype=False
+    )
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet'])
+def test_empty_frames_export_their_columns(projects, file_format):
+    """An empty view still exports a header or schema"""
+    data = write_export(projects.head(0), file_format, 7).read()
+    read = pd.read_csv if file_format == 'csv' else pd.read_parquet
+    assert list(read(io.BytesIO(data)).columns) == list(projects.columns)
+
+def test_cache_reuses_built_exports_and_evicts_the_oldest(projects, monkeypatch):
+    """Repeat downloads of a view are served from the cache until it is evicted"""
+    written = []
+    
+    def counting_write_export(df, file_format):
+        """Write the export, recording that it was built"""
+        written.append(file_format)
+        return write_export(df, file_format)
+    
+    monkeypatch.setattr(data_export, 'write_export', counting_write_export)
+    cache = ExportCache(max_entries=2)
+    
+    first = cache.get(projects, {}, 'csv')
+    assert cache.get(projects, {}, 'csv') == first == projects.to_csv(index=False).encode('utf-8')
+    cache.get(projects, {}, 'parquet')
+    cache.get(projects, {'status': ['Behind']}, 'csv')
+    cache.get(projects, {}, 'csv')
+    assert written == ['csv', 'parquet', 'csv', 'csv']
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_generator import DataGenerator
+
+def test_chunked_generation_of_no_projects(generator):
+    """An empty portfolio keeps the columnar schema, has no milestones and NaN ratio KPIs"""
+    data = generator.generate_all_data(0, chunk_size=1000)
+    expected = generator.generate_projects_data(0, columnar=True)
+    
+    assert data['projects'].empty and data['milestones'].empty
+    pd.testing.assert_series_equal(data['projects'].dtypes, expected.dtypes)
+    assert np.isnan(data['kpis']['budget_health']['value'])
+
+@pytest.mark.parametrize('chunk_size', [1, 100, 249, 250, 1000])
+def test_chunked_kpis_match_the_whole_portfolio(generator, chunk_size):
+    """KPIs accumulated chunk by chunk equal KPIs computed over the concatenated projects"""
+    data = generator.generate_all_data(250, chunk_size=chunk_size)
+    projects = data['projects']
+    
+    assert projects['project_id'].tolist() == list(range(1, 251))
+    assert set(data['milestones']['project_id']) <= set(projects['project_id'])
+    expected = generator.generate_kpi_data(projects)
+    for name, kpi in expected.items():
+        if name != 'quality_score':
+            assert data['kpis'][name]['value'] == pytest.approx(kpi['value'], rel=1e-9), name
+
+def test_columnar_scores_match_scalar_scores(generator, monkeypatch):
+    """calculate_risk_scores and determine_statuses equal the row-at-a-time rules with the jitter at zero"""
+    rng = np.random.default_rng(11)
+    size = 2000
+    # Values on and around every threshold, plus zero-length timelines
+    progress = rng.choice([10.0, 29.999, 30.0, 49.999, 50.0, 70.0, 94.999, 95.0, 100.0], size=size)
+    spent_ratio = rng.choice([0.2, 0.6, 0.600001, 0.8, 0.800001, 1.0], size=size)
+    start_dates = pd.Timestamp(generator.as_of.date()) - pd.to_timedelta(rng.integers(0, 400, size=size), unit='D')
+    end_dates = start_dates + pd.to_timedelta(rng.integers(0, 400, size=size), unit='D')
+    
+    scores = generator.calculate_risk_scores(progress, spent_ratio, start_dates, end_dates)
+    statuses = generator.determine_statuses(progress, scores)
+    
+    monkeypatch.setattr(generator.random, 'uniform', lambda low, high: 0.0)
+    for i in range(size):
+        expected = generator._calculate_risk_score(
+            progress[i], spent_ratio[i], start_dates[i].to_pydatetime(), end_dates[i].to_pydatetime()
+        )
+        assert scores[i] == pytest.approx(expected, abs=1e-12), i
+        assert statuses[i] == generator._determine_status(progress[i], expected), i
+
+def test_score_projects_reads_a_frame(generator, projects_df):
+    """score_projects gives the same scores as calculate_risk_scores over the frame's columns"""
+    scores, statuses = generator.score_projects(projects_df)
+    expected = generator.calculate_risk_scores(
+        projects_df['progress'], projects_df['spent'] / projects_df['budget'],
+        projects_df['start_date'], projects_df['end_date']
+    )
+    np.testing.assert_allclose(scores, expected)
+    np.testing.assert_array_equal(statuses, generator.determine_statuses(projects_df['progress'], expected))
+
+def test_bulk_milestones_follow_their_projects(generator, projects_df):
+    """Every project gets 3-8 consecutively numbered milestones with draws in range"""
+    milestones = generator.generate_milestone_data(projects_df)
+    
+    counts = milestones.groupby('project_id', sort=False).size()
+    assert counts.index.tolist() == projects_df['project_id'].tolist()
+    assert counts.between(3, 8).all()
+    
+    names = projects_df.set_index('project_id')['project_name']
+    assert (milestones['project_name'].astype(str).to_numpy() == names.loc[milestones['project_id']].to_numpy()).all()
+    numbers = milestones['milestone'].astype(str).str.removeprefix('Milestone ').astype(int)
+    expected_numbers = np.concatenate([np.arange(1, count + 1) for count in counts])
+    np.testing.assert_array_equal(numbers.to_numpy(), expected_numbers)
+    
+    assert milestones['completion'].between(0, 100).all()
+    offsets = (milestones['due_date'] - pd.Timestamp(generator.as_of)).dt.days
+    assert offsets.between(-30, 90).all()
+
+def test_seeded_generation_is_reproducible(generator):
+    """The same seed and as-of date give the same portfolio, row-wise or columnar"""
+    for columnar in (False, True):
+        first = DataGenerator(seed=21, as_of=generator.as_of).generate_projects_data(50, columnar=columnar)
+        second = DataGenerator(seed=21, as_of=generator.as_of).generate_projects_data(50, columnar=columnar)
+        pd.testing.assert_frame_equal(first, second)
+
+def test_sharded_output_is_independent_of_worker_count(generator):
+    """Shards depend only on the seed and shard layout, not on the pool size or earlier calls"""
+    sharded = DataGenerator(seed=21, as_of=generator.as_of)
+    single = sharded.generate_projects_sharded(1000, shard_size=300, max_workers=1)
+    
+    pd.testing.assert_frame_equal(single, sharded.generate_projects_sharded(1000, shard_size=300, max_workers=2))
+    pd.testing.assert_frame_equal(
+        single, DataGenerator(seed=21, as_of=generator.as_of).generate_projects_sharded(1000, shard_size=300, max_workers=3)
+    )
+    assert single['project_id'].tolist() == list(range(1, 1001))
+    # Shards are distinct draws, not one shard repeated
+    assert not np.array_equal(single['progress'].to_numpy()[:300], single['progress'].to_numpy()[300:600])
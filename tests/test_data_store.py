@@ -0,0 +1,127 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from data_schema import align_categories
+from data_store import ProjectDataStore
+from kpi_engine import KpiEngine, totals_from_accumulators
+
+def assert_kpis_match_recompute(snapshot):
+    """Incrementally maintained KPI totals equal a full recompute over the snapshot's rows"""
+    incremental = totals_from_accumulators(snapshot.kpi_accumulators)
+    recomputed = totals_from_accumulators(KpiEngine().accumulate(snapshot.projects))
+    for name, value in recomputed.items():
+        assert incremental[name] == pytest.approx(value, rel=1e-9), name
+
+def test_merge_replaces_changed_rows_in_place(provider):
+    """Changed rows are overwritten at their position and the rest are untouched"""
+    store = ProjectDataStore(provider)
+    before = store.snapshot.projects
+    
+    provider.update([3, 150], progress=99.5, status='Behind')
+    assert store.refresh() == 2
+    
+    after = store.snapshot.projects
+    assert len(after) == len(before)
+    changed = after['project_id'].isin([3, 150])
+    assert (after.loc[changed, 'status'] == 'Behind').all()
+    assert np.allclose(after.loc[changed, 'progress'], 99.5)
+    pd.testing.assert_frame_equal(after[~changed].drop(columns='updated_at'), before[~changed].drop(columns='updated_at'))
+    assert_kpis_match_recompute(store.snapshot)
+
+def test_merge_widens_columns_for_values_that_do_not_fit(provider):
+    """Incoming values outside the cached dtypes' range come through exactly"""
+    store = ProjectDataStore(provider)
+    
+    new_rows = provider.projects_df.head(3).assign(project_id=[1000, 1001, 1002], budget=3_000_000_000)
+    provider.append(new_rows)
+    provider.update([1000, 1001, 1002])
+    provider.update([5], spent=123456789.123)
+    store.refresh()
+    
+    projects = store.snapshot.projects.set_index('project_id')
+    assert projects.loc[[1000, 1001, 1002], 'budget'].tolist() == [3_000_000_000] * 3
+    assert projects.loc[5, 'spent'] == 123456789.123
+    assert projects['budget'].dtype == np.int64
+    assert_kpis_match_recompute(store.snapshot)
+
+def test_merge_moves_rows_in_and_out_of_a_filtered_view(provider):
+    """Rows changed into the filter enter the view, rows changed out of it leave with their milestones"""
+    store = ProjectDataStore(provider, filters={'status': ['Behind']})
+    view = store.snapshot.projects
+    leaving_id = int(view['project_id'].iloc[0])
+    entering_id = int(provider.projects_df.loc[provider.projects_df['status'] != 'Behind', 'project_id'].iloc[0])
+    
+    provider.update([leaving_id], status='On Track')
+    provider.update([entering_id], status='Behind')
+    store.refresh()
+    
+    snapshot = store.snapshot
+    expected = provider.load_projects({'status': ['Behind']})
+    assert sorted(snapshot.projects['project_id']) == sorted(expected['project_id'])
+    assert leaving_id not in set(snapshot.milestones['project_id'])
+    assert entering_id in set(snapshot.milestones['project_id'])
+    assert_kpis_match_recompute(snapshot)
+
+def test_align_categories_widens_numbers_and_unions_categories():
+    """Both frames come back with the wider numeric type and the union of categories"""
+    base = pd.DataFrame({
+        'project_id': np.array([1, 2], dtype=np.int8),
+        'spent': np.array([1.5, 2.5], dtype=np.float32),
+        'status': pd.Categorical(['On Track', 'Behind'])
+    })
+    incoming = pd.DataFrame({
+        'project_id': np.array([200], dtype=np.int64),
+        'spent': np.array([1e-9]),
+        'status': ['Complete']
+    })
+    
+    merged, aligned = align_categories(base, incoming)
+    assert merged['project_id'].dtype == aligned['project_id'].dtype == np.int64
+    assert merged['spent'].dtype == aligned['spent'].dtype == np.float64
+    assert aligned['project_id'].tolist() == [200]
+    assert aligned['spent'].tolist() == [1e-9]
+    assert list(merged['status'].cat.categories) == list(aligned['status'].cat.categories)
+    assert 'Complete' in merged['status'].cat.categories
+
+def test_slow_build_blocks_neither_other_keys_nor_carry_over(provider):
+    """Only callers of the key being built wait for it; every build still runs once"""
+    snapshot = ProjectDataStore(provider).snapshot
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    
+    def slow_builder(df, previous):
+        calls.append(previous)
+        started.set()
+        release.wait(5)
+        return 'simulated'
+    
+    results = []
+    workers = [
+        threading.Thread(target=lambda: results.append(snapshot.derive_incremental('slow', slow_builder)))
+        for _ in range(2)
+    ]
+    workers[0].start()
+    assert started.wait(5)
+    workers[1].start()
+    
+    assert snapshot.derive('fast', len) == len(snapshot.projects)
+    assert snapshot.carry_over() == {}
+    
+    release.set()
+    for worker in workers:
+        worker.join(5)
+    assert results == ['simulated', 'simulated']
+    assert calls == [None]
+    assert snapshot.carry_over() == {'slow': 'simulated'}
+
+def test_failed_build_is_retried(provider):
+    """A builder that raises leaves nothing cached behind"""
+    snapshot = ProjectDataStore(provider).snapshot
+    
+    def failing_builder(df):
+        raise RuntimeError('source unavailable')
+    
+    with pytest.raises(RuntimeError):
+        snapshot.derive('table', failing_builder)
+    assert snapshot.derive('table', len) == len(snapshot.projects)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from data_access import filter_projects
+from data_schema import optimize_projects_frame
+from filter_index import DATE_FILTER_KEY, FilterIndex
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'status': []},
+    {'status': ['Behind']},
+    {'status': ['Behind', 'At Risk'], 'priority': ['High']},
+    {'department': ['Supply Chain'], 'manager': ['No Such Manager']},
+    {'department': ['Retail Technology', 'Store Operations'], 'status': ['On Track', 'Complete'], 'priority': ['Low', 'Medium']}
+])
+def test_bitmaps_match_a_row_scan(projects_df, filters):
+    """Positions, counts and filtered rows equal filter_projects over the frame"""
+    projects = optimize_projects_frame(projects_df)
+    index = FilterIndex(projects)
+    expected = filter_projects(projects, filters)
+    
+    positions = index.positions(filters)
+    assert (positions is None) == (not any(filters.values()))
+    assert index.count(filters) == len(expected)
+    assert index.filter(projects, filters)['project_id'].tolist() == expected['project_id'].tolist()
+
+def test_date_filter_combines_with_column_filters(projects_df):
+    """A date range narrows the column filters to projects active in it"""
+    projects = optimize_projects_frame(projects_df)
+    index = FilterIndex(projects)
+    t0, t1 = projects['start_date'].median(), projects['end_date'].median()
+    filters = {'status': ['On Track'], DATE_FILTER_KEY: ('active', t0.date(), t1.date())}
+    
+    mask = (
+        (projects['status'] == 'On Track') & (projects['start_date'] <= t1.normalize())
+        & (projects['end_date'] >= t0.normalize())
+    )
+    assert index.positions(filters).tolist() == np.flatnonzero(mask.to_numpy()).tolist()
+    assert index.count(filters) == int(mask.sum())
+
+def test_high_cardinality_columns_use_row_groups(projects_df):
+    """A column with many managers is grouped by sorted positions and filters like a row scan"""
+    projects_df = projects_df.assign(manager=[f"Manager {i % 150}" for i in range(len(projects_df))])
+    projects_df.loc[::17, 'manager'] = None
+    projects = optimize_projects_frame(projects_df)
+    index = FilterIndex(projects)
+    assert 'manager' in index.groups and 'manager' not in index.bitmaps
+    
+    for filters in [
+        {'manager': ['Manager 3']},
+        {'manager': ['Manager 3', 'Manager 149', 'No Such Manager'], 'status': ['Behind', 'On Track']},
+        {'manager': ['No Such Manager']}
+    ]:
+        expected = filter_projects(projects, filters)
+        assert index.count(filters) == len(expected)
+        assert index.filter(projects, filters)['project_id'].tolist() == expected['project_id'].tolist()
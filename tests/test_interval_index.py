@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from interval_index import IntervalIndex, sweep_counts
+
+@pytest.fixture
+def intervals():
+    """Random project date ranges, a few with a missing date"""
+    rng = np.random.default_rng(3)
+    starts = np.datetime64('2025-01-01') + rng.integers(0, 365, size=500)
+    ends = starts + rng.integers(0, 200, size=500)
+    starts[::50] = np.datetime64('NaT')
+    ends[7::60] = np.datetime64('NaT')
+    return pd.DataFrame({'start_date': starts.astype('datetime64[s]'), 'end_date': ends.astype('datetime64[s]')})
+
+def brute_force(intervals, predicate):
+    """Positions of rows with both dates for which predicate(start, end) holds"""
+    starts = intervals['start_date'].to_numpy().astype('datetime64[D]')
+    ends = intervals['end_date'].to_numpy().astype('datetime64[D]')
+    valid = ~np.isnat(starts) & ~np.isnat(ends)
+    return np.flatnonzero(valid & predicate(starts, ends))
+
+WINDOWS = [('2025-03-01', '2025-03-31'), ('2025-06-15', '2025-06-15'), ('2024-01-01', '2024-06-01'), ('2025-01-01', '2026-12-31')]
+
+@pytest.mark.parametrize('t0, t1', WINDOWS)
+def test_position_queries_match_brute_force(intervals, t0, t1):
+    """Active, started and due queries return exactly the rows a full scan finds"""
+    index = IntervalIndex(intervals)
+    d0, d1 = np.datetime64(t0), np.datetime64(t1)
+    
+    active = brute_force(intervals, lambda starts, ends: (starts <= d1) & (ends >= d0))
+    assert index.active_positions(t0, t1).tolist() == active.tolist()
+    assert index.count_active(t0, t1) == len(active)
+    assert index.started_positions(t0, t1).tolist() == brute_force(
+        intervals, lambda starts, ends: (starts >= d0) & (starts <= d1)
+    ).tolist()
+    assert index.due_positions(t0, t1).tolist() == brute_force(
+        intervals, lambda starts, ends: (ends >= d0) & (ends <= d1)
+    ).tolist()
+    
+    within = np.arange(0, len(intervals), 3)
+    assert index.active_positions(t0, t1, within=within).tolist() == np.intersect1d(active, within).tolist()
+
+@pytest.mark.parametrize('subset', [None, np.arange(0, 500, 4)])
+def test_concurrency_matches_brute_force(intervals, subset):
+    """Projects active on each day, for every row and for a subset"""
+    index = IntervalIndex(intervals)
+    concurrency = index.concurrency('2025-02-01', '2025-08-31', positions=subset)
+    
+    rows = np.arange(len(intervals)) if subset is None else subset
+    expected = [
+        len(np.intersect1d(brute_force(intervals, lambda starts, ends: (starts <= day) & (ends >= day)), rows))
+        for day in concurrency.index.to_numpy().astype('datetime64[D]')
+    ]
+    assert concurrency.tolist() == expected
+
+def test_empty_index():
+    """An index without valid rows answers every query with nothing"""
+    empty_dates = pd.Series([], dtype='datetime64[s]')
+    index = IntervalIndex(pd.DataFrame({'start_date': empty_dates, 'end_date': empty_dates}))
+    assert len(index) == 0
+    assert index.date_bounds() is None
+    assert index.active_positions('2025-01-01', '2025-12-31').tolist() == []
+    assert index.concurrency('2025-01-01', '2025-01-03', positions=[]).tolist() == [0, 0, 0]
+
+def test_sweep_counts_matches_brute_force():
+    """Weighted ranges per lane and bin equal summing each range's bins directly"""
+    rng = np.random.default_rng(4)
+    lanes = rng.integers(0, 3, size=200)
+    start_bins = rng.integers(0, 20, size=200)
+    end_bins = start_bins + rng.integers(0, 10, size=200)
+    weights = rng.uniform(1, 5, size=200)
+    
+    expected = np.zeros((3, 30))
+    for lane, start, end, weight in zip(lanes, start_bins, end_bins, weights):
+        expected[lane, start:end + 1] += weight
+    
+    assert np.allclose(sweep_counts(lanes, start_bins, end_bins, 3, 30, weights=weights), expected)
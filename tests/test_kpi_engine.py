@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_schema import optimize_projects_frame
+from data_store import ProjectDataStore
+from kpi_engine import KPI_DEFINITIONS, KpiEngine, RunningMoments, kpi_values, totals_from_accumulators
+
+def assert_same_accumulators(actual, expected):
+    """Accumulators agree on every total and on the tracked spreads"""
+    actual_totals = totals_from_accumulators(actual)
+    for name, value in totals_from_accumulators(expected).items():
+        assert actual_totals[name] == pytest.approx(value, rel=1e-9), name
+    for name, key in [('risk_level', 'risk_score'), ('team_velocity', 'progress')]:
+        assert actual[name][key].std == pytest.approx(expected[name][key].std, rel=1e-9), name
+
+def test_running_moments_add_and_sub_match_numpy():
+    """Combining and removing batches gives the moments of the remaining values"""
+    values = np.random.default_rng(1).normal(50, 20, size=1000)
+    left, right = RunningMoments.of(values[:400]), RunningMoments.of(values[400:])
+    
+    combined = left + right
+    assert combined.count == 1000
+    assert combined.mean == pytest.approx(values.mean())
+    assert combined.std == pytest.approx(values.std())
+    
+    remaining = combined - left
+    assert remaining.mean == pytest.approx(values[400:].mean())
+    assert remaining.std == pytest.approx(values[400:].std())
+
+def test_running_moments_from_sums_match_numpy():
+    """Moments rebuilt from database-style sums match the direct ones"""
+    values = np.random.default_rng(2).uniform(0, 10, size=500)
+    moments = RunningMoments.from_sums(len(values), values.sum(), (values ** 2).sum())
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.std == pytest.approx(values.std())
+
+@pytest.mark.parametrize('changed_columns', [None, ['progress'], ['spent', 'budget'], ['status', 'team_size']])
+def test_update_matches_full_recompute(projects_df, changed_columns):
+    """Taking changed rows out and folding their new versions in equals accumulating from scratch"""
+    before = optimize_projects_frame(projects_df)
+    after = before.copy()
+    rows = np.arange(0, len(after), 7)
+    after.loc[rows, 'progress'] = np.minimum(after.loc[rows, 'progress'] + 10, 100)
+    after.loc[rows, 'spent'] = after.loc[rows, 'spent'] * 1.1
+    after.loc[rows, 'budget'] = after.loc[rows, 'budget'] + 1000
+    after.loc[rows, 'status'] = 'Behind'
+    after.loc[rows, 'team_size'] = after.loc[rows, 'team_size'] + 1
+    
+    engine = KpiEngine()
+    updated = engine.update(engine.accumulate(before), before.iloc[rows], after.iloc[rows])
+    assert_same_accumulators(updated, engine.accumulate(after))
+    
+    # Only the KPIs reading a changed column move; the others keep their accumulators
+    accumulators = engine.accumulate(before)
+    partial = engine.update(accumulators, before.iloc[rows], after.iloc[rows], changed_columns)
+    affected = engine.affected(changed_columns)
+    for name in KPI_DEFINITIONS:
+        if name in affected:
+            assert totals_from_accumulators({**updated, name: partial[name]}) == totals_from_accumulators(updated)
+        else:
+            assert partial[name] is accumulators[name]
+
+def test_update_handles_rows_entering_and_leaving(projects_df):
+    """Removed rows are taken out and added rows folded in"""
+    projects = optimize_projects_frame(projects_df)
+    engine = KpiEngine()
+    
+    updated = engine.update(engine.accumulate(projects.iloc[:200]), projects.iloc[:50], projects.iloc[200:])
+    assert_same_accumulators(updated, engine.accumulate(projects.iloc[50:]))
+
+def test_kpi_values_of_empty_totals_are_nan():
+    """No projects, budget or capacity gives NaN rather than ZeroDivisionError"""
+    values = kpi_values(totals_from_accumulators(KpiEngine().accumulate(pd.DataFrame({
+        'spent': [], 'budget': [], 'status': [], 'risk_score': [], 'progress': [],
+        'team_size': [], 'start_date': [], 'end_date': []
+    }))))
+    assert all(np.isnan(value) for value in values.values())
+
+def test_kpi_values_work_column_wise_with_zero_rows():
+    """Per-period totals with an empty period give NaN only for that period"""
+    totals = pd.DataFrame({
+        'projects': [10, 0], 'spent': [50.0, 0.0], 'budget': [100.0, 0.0], 'on_schedule': [5, 0],
+        'risk_score': [40.0, 0.0], 'progress': [500.0, 0.0], 'staffed_days': [80.0, 0.0], 'capacity_days': [100.0, 0.0]
+    })
+    values = kpi_values(totals)
+    assert values['timeline_performance'].tolist()[0] == 50.0
+    assert values['resource_utilization'].tolist()[0] == 80.0
+    assert all(np.isnan(series.iloc[1]) for series in values.values())
+
+def test_empty_view_has_no_kpi_values(provider):
+    """A view matching no projects builds with NaN KPI values instead of dividing by zero"""
+    store = ProjectDataStore(provider, filters={'department': ['No Such Department']})
+    
+    assert store.snapshot.projects.empty
+    assert np.isnan(store.snapshot.kpis['timeline_performance']['value'])
+    assert store.snapshot.kpis['timeline_performance']['trend'] == 'stable'
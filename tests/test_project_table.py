@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_access import filter_projects
+from data_schema import optimize_projects_frame
+from filter_index import FilterIndex
+from project_table import ProjectTable, page_count
+from search_index import SEARCH_COLUMNS, SearchIndex
+
+@pytest.fixture
+def projects(projects_df):
+    """Portfolio in the compact schema the table serves"""
+    return optimize_projects_frame(projects_df)
+
+@pytest.fixture
+def table(projects):
+    """Table over the portfolio and its indexes"""
+    return ProjectTable(projects, FilterIndex(projects), SearchIndex(projects))
+
+def brute_force_rows(projects_df, filters, search, sort_by, ascending):
+    """Positions of the view found by scanning, substring-matching and sorting the frame"""
+    rows = filter_projects(projects_df.assign(position=np.arange(len(projects_df))), filters)
+    query = ' '.join(search.lower().split())
+    if query:
+        matches = np.logical_or.reduce([
+            rows[col].astype(str).str.lower().str.contains(query, regex=False).to_numpy() for col in SEARCH_COLUMNS
+        ])
+        rows = rows[matches]
+    if sort_by is not None:
+        rows = rows.sort_values(sort_by, kind='stable')
+        if not ascending:
+            rows = rows[::-1]
+    return rows['position'].to_numpy()
+
+@pytest.mark.parametrize('filters', [{}, {'status': ['Behind', 'At Risk']}, {'department': ['Retail Technology']}])
+@pytest.mark.parametrize('search', ['', 'an', 'store'])
+@pytest.mark.parametrize('sort_by, ascending', [(None, True), ('budget', True), ('risk_score', False), ('status', True)])
+def test_rows_match_a_scan_of_the_frame(projects, table, filters, search, sort_by, ascending):
+    """Filtered, searched and sorted positions equal a brute-force scan, from the cache as well"""
+    expected = brute_force_rows(projects, filters, search, sort_by, ascending)
+    np.testing.assert_array_equal(table.rows(filters, search, sort_by, ascending), expected)
+    np.testing.assert_array_equal(table.rows(filters, search, sort_by, ascending), expected)
+
+@pytest.mark.parametrize('page_size', [7, 25, 300, 1000])
+def test_pages_cover_the_view_once(projects, table, page_size):
+    """Consecutive pages concatenate to the whole sorted view, in order"""
+    rows = table.rows({'status': ['On Track', 'Behind']}, sort_by='spent', ascending=False)
+    pages = [
+        table.page(rows, page_number, page_size, ['project_id', 'spent'])
+        for page_number in range(1, page_count(len(rows), page_size) + 1)
+    ]
+    assert all(len(page) == page_size for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= page_size
+    pd.testing.assert_frame_equal(pd.concat(pages), projects.take(rows)[['project_id', 'spent']])
+
+def test_page_count_of_an_empty_view_is_one():
+    """An empty view still has one (empty) page to show"""
+    assert page_count(0, 25) == 1
+    assert page_count(25, 25) == 1
+    assert page_count(26, 25) == 2
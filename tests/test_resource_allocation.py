@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_access import filter_projects
+from data_schema import optimize_projects_frame
+from resource_allocation import ResourceAllocation
+
+def brute_force_matrix(projects_df, group_col, week_starts, bin_days):
+    """Team members per group and bin, summing every project whose days overlap the bin"""
+    starts = projects_df['start_date'].dt.normalize()
+    ends = np.maximum(projects_df['end_date'].dt.normalize(), starts)
+    columns = {}
+    for week in week_starts:
+        active = (starts <= week + pd.Timedelta(days=bin_days - 1)) & (ends >= week)
+        columns[week] = projects_df['team_size'].where(active, 0).groupby(
+            projects_df[group_col].astype(str).to_numpy()
+        ).sum()
+    return pd.DataFrame(columns).fillna(0).astype(np.int64)
+
+@pytest.mark.parametrize('group_col', ['department', 'manager'])
+@pytest.mark.parametrize('bin_days', [7, 14])
+@pytest.mark.parametrize('filters', [{}, {'status': ['Behind', 'At Risk']}, {'priority': ['High']}])
+def test_matrix_matches_summing_overlapping_projects(projects_df, group_col, bin_days, filters):
+    """Every cell is the team size of the (filtered) projects active at some point of its bin"""
+    projects = optimize_projects_frame(projects_df)
+    allocation = ResourceAllocation(projects, group_col, bin_days)
+    
+    rows = filter_projects(projects.assign(position=np.arange(len(projects))), filters)
+    matrix = allocation.matrix(None if not filters else rows['position'].to_numpy())
+    expected = brute_force_matrix(rows, group_col, allocation.week_starts, bin_days)
+    
+    assert (allocation.week_starts.dayofweek == 0).all()
+    pd.testing.assert_frame_equal(
+        matrix.loc[expected.index], expected, check_names=False, check_freq=False, check_index_type=False,
+        check_column_type=False
+    )
+    assert (matrix.drop(index=expected.index) == 0).all().all()
+
+def test_bins_cover_every_project(projects_df):
+    """The first bin holds the earliest start and the last bin the latest end"""
+    projects = optimize_projects_frame(projects_df)
+    allocation = ResourceAllocation(projects)
+    first, last = allocation.week_starts[0], allocation.week_starts[-1]
+    assert first <= projects['start_date'].min().normalize() < first + pd.Timedelta(days=7)
+    assert last <= projects['end_date'].max().normalize() < last + pd.Timedelta(days=7)
+
+def test_rows_missing_a_group_or_date_are_not_allocated(projects_df):
+    """Projects without a department or an end date add no team members"""
+    projects = optimize_projects_frame(projects_df.assign(
+        department=projects_df['department'].where(projects_df['project_id'] != 1),
+        end_date=projects_df['end_date'].where(projects_df['project_id'] != 2)
+    ))
+    allocation = ResourceAllocation(projects)
+    assert len(allocation) == len(projects) - 2
+    
+    kept = projects[~projects['project_id'].isin([1, 2])]
+    expected = brute_force_matrix(kept, 'department', allocation.week_starts, 7)
+    assert allocation.matrix().loc[expected.index].to_numpy().tolist() == expected.to_numpy().tolist()
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from data_schema import optimize_projects_frame
+from risk_simulation import RiskSimulation
+
+def test_unchanged_projects_keep_their_outcomes(projects_df):
+    """Only rows whose updated_at moved are simulated again; the rest are copied over by project id"""
+    projects = optimize_projects_frame(projects_df)
+    first = RiskSimulation(projects, num_simulations=200)
+    
+    changed = projects.copy()
+    rows = np.arange(0, len(changed), 10)
+    changed.loc[rows, 'progress'] = 100.0
+    changed.loc[rows, 'updated_at'] = changed['updated_at'].max() + pd.Timedelta(seconds=1)
+    # Reordered and without the first 5 projects, as after rows leave a view
+    changed = changed.iloc[::-1].iloc[:-5].reset_index(drop=True)
+    
+    second = RiskSimulation(changed, num_simulations=200, previous=first)
+    assert second.simulated_rows == len(rows) - 1
+    
+    first_outcomes = first.outcomes.set_index('project_id')
+    second_outcomes = second.outcomes.set_index('project_id')
+    unchanged = np.setdiff1d(second_outcomes.index, projects['project_id'].to_numpy()[rows])
+    pd.testing.assert_frame_equal(second_outcomes.loc[unchanged], first_outcomes.loc[unchanged])
+
+def test_previous_is_ignored_at_another_simulation_count(projects_df):
+    """Outcomes drawn at a different count are never reused"""
+    projects = optimize_projects_frame(projects_df)
+    first = RiskSimulation(projects, num_simulations=100)
+    assert RiskSimulation(projects, num_simulations=200, previous=first).simulated_rows == len(projects)
+    assert RiskSimulation(projects, num_simulations=100, previous=first).simulated_rows == 0
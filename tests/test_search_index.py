@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_schema import align_categories, optimize_projects_frame
+from search_index import COLUMN_WEIGHTS, SEARCH_COLUMNS, WORD_SEPARATORS, SearchIndex, _stable_order
+
+QUERIES = ['a', 'e', 'st', 'ore', 'Store Op', 'tech', 'ion', 'x', 'zzq', 'an an', '  SUPPLY   chain ', '7', 'é']
+
+def brute_force(projects_df, query):
+    """Best score per row from a Python scan of every value, as (positions, scores) in rank order"""
+    query = ' '.join(query.lower().split())
+    best = np.zeros(len(projects_df))
+    for col in SEARCH_COLUMNS:
+        for row, value in enumerate(projects_df[col]):
+            if pd.isna(value):
+                continue
+            term = str(value).lower()
+            starts = [i for i in range(len(term)) if term.startswith(query, i)]
+            if not starts:
+                continue
+            score = COLUMN_WEIGHTS[col]
+            if 0 in starts:
+                score += 2.0
+            elif any(term[i - 1] in WORD_SEPARATORS for i in starts):
+                score += 1.0
+            best[row] = max(best[row], score)
+    positions = np.flatnonzero(best)
+    ranked = np.argsort(-best[positions], kind='stable')
+    return positions[ranked], best[positions][ranked]
+
+def unique_names(count, seed):
+    """High-cardinality project names built from random words and a running number"""
+    rng = np.random.default_rng(seed)
+    words = [''.join(rng.choice(list('abcdefghijklmnopqrstuvwxyzé'), size=rng.integers(2, 8))) for _ in range(60)]
+    picks = rng.choice(words, size=(count, 3))
+    return [f"{a.title()} {b}\t{c} {seed * 10000 + i}" for i, (a, b, c) in enumerate(picks)]
+
+def assert_matches_brute_force(index, projects_df):
+    """Every query ranks the same rows with the same scores as the brute-force scan"""
+    for query in QUERIES:
+        positions, scores = index.search(query)
+        expected_positions, expected_scores = brute_force(projects_df, query)
+        np.testing.assert_array_equal(positions, expected_positions, err_msg=query)
+        np.testing.assert_array_equal(scores, expected_scores, err_msg=query)
+
+@pytest.fixture
+def projects(projects_df):
+    """Compact portfolio with unique project names and a few missing managers"""
+    projects_df = projects_df.assign(project_name=unique_names(len(projects_df), seed=1))
+    projects_df.loc[::40, 'manager'] = None
+    return optimize_projects_frame(projects_df)
+
+def test_search_matches_brute_force(projects):
+    """Ranking, scores and word-start bonuses equal a scan of every value"""
+    assert_matches_brute_force(SearchIndex(projects), projects)
+
+def test_carried_index_only_adds_new_terms(projects):
+    """An index extended with appended categories equals one built from scratch"""
+    first = SearchIndex(projects)
+    
+    incoming = optimize_projects_frame(projects.head(50).assign(
+        project_id=np.arange(10000, 10050), project_name=unique_names(50, seed=2)
+    ))
+    merged, incoming = align_categories(projects, incoming)
+    merged = pd.concat([merged.iloc[25:], incoming], ignore_index=True)
+    
+    carried = SearchIndex(merged, previous=first)
+    rebuilt = SearchIndex(merged)
+    grams, fresh = carried.grams['project_name'], rebuilt.grams['project_name']
+    np.testing.assert_array_equal(grams.keys, fresh.keys)
+    np.testing.assert_array_equal(grams.offsets, fresh.offsets)
+    np.testing.assert_array_equal(grams.occurrences, fresh.occurrences)
+    assert carried.grams['department'].occurrences is first.grams['department'].occurrences
+    assert_matches_brute_force(carried, merged)
+
+def test_reordered_categories_rebuild(projects):
+    """Categories that no longer extend the previous ones are indexed again"""
+    first = SearchIndex(projects)
+    reordered = projects.assign(manager=projects['manager'].cat.reorder_categories(
+        projects['manager'].cat.categories[::-1]
+    ))
+    assert_matches_brute_force(SearchIndex(reordered, previous=first), reordered)
+
+def test_within_and_limit(projects):
+    """Results are restricted to the given positions and cut at the limit, keeping rank order"""
+    index = SearchIndex(projects)
+    positions, scores = index.search('a')
+    within = np.arange(0, len(projects), 3)
+    
+    limited, limited_scores = index.search('a', limit=5, within=within)
+    keep = np.isin(positions, within)
+    np.testing.assert_array_equal(limited, positions[keep][:5])
+    np.testing.assert_array_equal(limited_scores, scores[keep][:5])
+    assert index.match_mask('a').sum() == len(positions)
+
+def test_stable_order_beyond_one_radix_pass():
+    """Group codes above 16 bits are ordered like a stable argsort"""
+    codes = np.random.default_rng(5).integers(0, 200000, size=50000)
+    np.testing.assert_array_equal(_stable_order(codes, 200000), np.argsort(codes, kind='stable'))
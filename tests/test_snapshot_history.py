@@ -0,0 +1,137 @@
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+import pandas as pd
+import pytest
+from data_access import SQLiteDataProvider, SyntheticDataProvider, get_provider, write_sqlite
+from data_schema import optimize_projects_frame
+from kpi_engine import KpiEngine, totals_from_accumulators
+from snapshot_history import SnapshotHistory
+
+DAY_1 = datetime(2030, 1, 1, 9)
+DAY_2 = datetime(2030, 1, 2, 9)
+DAY_3 = datetime(2030, 1, 3, 9)
+
+@pytest.fixture
+def history(tmp_path):
+    """Empty history keyed on one source"""
+    return SnapshotHistory(str(tmp_path / 'history.sqlite'), 'sqlite:/data/a.sqlite')
+
+@pytest.fixture
+def frame(projects_df):
+    """Portfolio in the compact schema the store records"""
+    return optimize_projects_frame(projects_df)
+
+def totals_of(projects_df):
+    """Daily totals of a frame, as the store records them"""
+    return totals_from_accumulators(KpiEngine(as_of=DAY_1).accumulate(projects_df))
+
+def touch(projects_df, project_ids, **values):
+    """Copy of a frame with some projects changed and their updated_at moved forward"""
+    projects_df = projects_df.copy()
+    rows = projects_df['project_id'].isin(project_ids)
+    for col, value in values.items():
+        projects_df.loc[rows, col] = value
+    projects_df.loc[rows, 'updated_at'] = projects_df['updated_at'].max() + pd.Timedelta(seconds=1)
+    return projects_df
+
+def by_id(projects_df):
+    """Frame ordered by project id, for comparing rebuilt rows"""
+    return projects_df.sort_values('project_id').reset_index(drop=True)
+
+def test_record_appends_only_changed_and_removed_rows(history, frame):
+    """The first record stores every row; later ones only rows whose updated_at moved, plus removals"""
+    assert history.record(frame, totals_of(frame), DAY_1) == len(frame)
+    assert history.record(frame, totals_of(frame), DAY_1) == 0
+    
+    changed = touch(frame, [3, 5, 8], spent=1.0)
+    assert history.record(changed, totals_of(changed), DAY_1) == 3
+    
+    remaining = changed[~changed['project_id'].isin([10, 11])].reset_index(drop=True)
+    assert history.record(remaining, totals_of(remaining), DAY_1) == 2
+    
+    reopened = SnapshotHistory(history.path, history.source)
+    assert reopened.record(remaining, totals_of(remaining), DAY_1) == 0
+
+def test_totals_are_upserted_per_day(history, frame):
+    """Each day keeps its last totals, even when no row changed that day"""
+    history.record(frame, totals_of(frame), DAY_1)
+    changed = touch(frame, [1, 2], budget=1.0)
+    history.record(changed, totals_of(changed), DAY_1)
+    assert history.record(changed, totals_of(changed), DAY_2) == 0
+    
+    totals_df = history.period_totals(days=90, end=DAY_2)
+    assert list(totals_df.index) == [pd.Timestamp('2030-01-01'), pd.Timestamp('2030-01-02')]
+    assert totals_df.iloc[0].to_dict() == pytest.approx(totals_of(changed))
+    assert totals_df.iloc[1].to_dict() == pytest.approx(totals_of(changed))
+
+def test_previous_totals_is_the_latest_day_before_the_cutoff(history, frame):
+    """The comparison period skips today and gaps, and is None before any history"""
+    assert history.previous_totals(days=1, end=DAY_1) is None
+    
+    day_1 = touch(frame, [1], spent=1.0)
+    history.record(day_1, totals_of(day_1), DAY_1)
+    day_3 = touch(day_1, [2], spent=2.0)
+    history.record(day_3, totals_of(day_3), DAY_3)
+    
+    assert history.previous_totals(days=1, end=DAY_1) is None
+    assert history.previous_totals(days=1, end=DAY_3) == pytest.approx(totals_of(day_1))
+    assert history.previous_totals(days=0, end=DAY_3) == pytest.approx(totals_of(day_3))
+
+def test_projects_as_of_rebuilds_each_recorded_state(history, frame):
+    """Rows rebuilt at a point in time match the frame recorded then, including removals and additions"""
+    states = [(DAY_1, frame)]
+    changed = touch(frame, [4, 7], progress=100)
+    states.append((DAY_2, changed[changed['project_id'] != 9].reset_index(drop=True)))
+    readded = touch(frame[frame['project_id'] == 9], [9], spent=5.0)
+    states.append((DAY_3, pd.concat([states[-1][1], readded], ignore_index=True)))
+    
+    for recorded_at, projects_df in states:
+        history.record(projects_df, totals_of(projects_df), recorded_at)
+    
+    assert history.projects_as_of(datetime(2029, 12, 31)).empty
+    for recorded_at, projects_df in states:
+        rebuilt = history.projects_as_of(recorded_at)
+        pd.testing.assert_frame_equal(
+            by_id(rebuilt)[projects_df.columns], by_id(projects_df), check_dtype=False, check_categorical=False
+        )
+
+def test_sources_sharing_a_database_are_kept_apart(history, frame):
+    """Another source's records neither overwrite this one's day nor count as its deltas"""
+    other = SnapshotHistory(history.path, 'sqlite:/data/b.sqlite')
+    history.record(frame, totals_of(frame), DAY_1)
+    
+    smaller = frame.head(10)
+    assert other.record(smaller, totals_of(smaller), DAY_1) == 10
+    assert other.previous_totals(days=0, end=DAY_1) == pytest.approx(totals_of(smaller))
+    assert history.previous_totals(days=0, end=DAY_1) == pytest.approx(totals_of(frame))
+    assert len(history.projects_as_of(DAY_1)) == len(frame)
+    assert history.record(frame, totals_of(frame), DAY_1) == 0
+
+def test_unkeyed_history_is_kept_under_the_unnamed_source(tmp_path, frame):
+    """Totals recorded before sources were tracked migrate to the '' source"""
+    path = str(tmp_path / 'history.sqlite')
+    history = SnapshotHistory(path)
+    history.record(frame, totals_of(frame), DAY_1)
+    
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("ALTER TABLE period_totals RENAME TO keyed")
+        conn.execute("CREATE TABLE period_totals AS SELECT period, snapshot_id, projects, spent, budget FROM keyed")
+        conn.execute("DROP TABLE keyed")
+        conn.commit()
+    
+    migrated = SnapshotHistory(path)
+    totals = migrated.previous_totals(days=0, end=DAY_1)
+    assert totals['projects'] == len(frame)
+    assert totals['risk_score'] == 0
+    assert SnapshotHistory(path, 'parquet:/data').previous_totals(days=0, end=DAY_1) is None
+
+def test_history_keys_name_stable_sources(tmp_path, generator, projects_df):
+    """Database sources and seeded portfolios have a key; unseeded portfolios differ per start and have none"""
+    path = str(tmp_path / 'projects.sqlite')
+    write_sqlite({'projects': projects_df, 'milestones': generator.generate_milestone_data(projects_df)}, path)
+    
+    assert SQLiteDataProvider(path).history_key() == f"sqlite:{path}"
+    assert get_provider('synthetic:40:7').history_key() == 'synthetic:40:7'
+    assert get_provider('synthetic:40').history_key() is None
+    assert SyntheticDataProvider(40, seed=7).history_key() != SyntheticDataProvider(40, seed=8).history_key()
@@ -0,0 +1,24 @@
+import pytest
+from utils.styling import COLUMN_FORMATS, format_currency, format_number, format_percentage
+
+@pytest.mark.parametrize('number_format, value, expected', [
+    ('$%,.0f', 1234567.4, '$1,234,567'),
+    ('$%,.0f', 999.6, '$1,000'),
+    ('%.1f%%', 56.76, '56.8%'),
+    ('%.0f%%', 3.4, '3%'),
+    ('%.1f', 7.24, '7.2')
+])
+def test_format_number_follows_printf_specs(number_format, value, expected):
+    """Text helpers render a printf spec the way the table's column_config does"""
+    assert format_number(value, number_format) == expected
+
+def test_text_helpers_share_the_table_formats():
+    """Currency and percentage text match the budget and progress columns"""
+    assert format_currency(1234567) == format_number(1234567, COLUMN_FORMATS['budget']) == '$1,234,567'
+    assert format_percentage(42.24) == format_number(42.24, COLUMN_FORMATS['progress']) == '42.2%'
+    assert format_percentage(42.24, decimal_places=0) == '42%'
+
+def test_unsupported_formats_are_rejected():
+    """Only fixed-point printf specs can be shared with the table"""
+    with pytest.raises(ValueError):
+        format_number(1, '%d items')
@@ -0,0 +1,374 @@
+import json
+import numpy as np
+import pandas as pd
+import streamlit as st
+import plotly.express as px
+import plotly.graph_objects as go
+from data_schema import to_category, to_day_array
+from filter_index import filters_key
+from interval_index import sweep_counts
+
+# Above these row counts, charts draw server-side aggregates instead of one mark per project
+SCATTER_POINT_LIMIT = 20000
+TIMELINE_BAR_LIMIT = 500
+
+# Bin counts that bound the size of aggregated figures
+SCATTER_BINS = (50, 40)
+TIMELINE_MAX_BINS = 156
+
+class ChartComponents:
+    """Chart components for the Zumiez dashboard"""
+    
+    def __init__(self, figure_cache=None, snapshot_id=None):
+        """Initialize chart components with Zumiez brand colors and an optional figure cache"""
+        self.figure_cache = figure_cache
+        self.snapshot_id = snapshot_id
+        self.colors = {
+            'primary': '#FF6B35',
+            'secondary': '#262730',
+            'success': '#4CAF50',
+            'warning': '#FF9800',
+            'danger': '#F44336',
+            'info': '#2196F3'
+        }
+        self.status_colors = {
+            'On Track': self.colors['success'],
+            'At Risk': self.colors['warning'],
+            'Behind': self.colors['danger'],
+            'Complete': self.colors['info']
+        }
+        self.heat_colorscale = [[0, '#FFFFFF'], [1, self.colors['primary']]]
+    
+    def create_status_distribution_chart(self, cube, filters=None):
+        """Create project status distribution pie chart"""
+        self._show_figure('status_distribution', filters, lambda: self._build_status_distribution_figure(cube, filters))
+    
+    def create_department_progress_chart(self, cube, filters=None):
+        """Create department progress bar chart"""
+        self._show_figure('department_progress', filters, lambda: self._build_department_progress_figure(cube, filters))
+    
+    def create_budget_variance_chart(self, cube, filters=None):
+        """Create budget variance chart"""
+        self._show_figure('budget_variance', filters, lambda: self._build_budget_variance_figure(cube, filters))
+    
+    def create_risk_gauge(self, cube, filters=None):
+        """Create risk level gauge chart"""
+        self._show_figure('risk_gauge', filters, lambda: self._build_risk_gauge_figure(cube, filters))
+    
+    def create_risk_impact_scatter(self, projects_df, filters=None):
+        """Create risk vs budget impact scatter, binned into a density map for large portfolios"""
+        self._show_figure('risk_impact', filters, lambda: self._build_risk_impact_figure(projects_df))
+    
+    def create_timeline_chart(self, projects_df, filters=None, date_range=None):
+        """Create project Gantt timeline, collapsed into department swimlanes for large portfolios"""
+        self._show_figure(
+            'timeline', filters, lambda: self._build_timeline_figure(projects_df, date_range), date_range
+        )
+    
+    def create_concurrency_chart(self, concurrency, filters=None, date_range=None):
+        """Create concurrent projects per day chart from an IntervalIndex concurrency series"""
+        self._show_figure(
+            'concurrency', filters, lambda: self._build_concurrency_figure(concurrency), date_range
+        )
+    
+    def create_allocation_heatmap(self, allocation_matrix, filters=None, group_label='Department'):
+        """Create heat map of team members allocated per group and week from a ResourceAllocation matrix"""
+        self._show_figure(
+            'allocation_heatmap', filters,
+            lambda: self._build_allocation_heatmap_figure(allocation_matrix, group_label), group_label
+        )
+    
+    def create_schedule_risk_chart(self, risk_df, filters=None):
+        """Create simulated finish-date bands for the riskiest projects from RiskSimulation outcomes"""
+        self._show_figure(
+            'schedule_risk', filters, lambda: self._build_schedule_risk_figure(risk_df), len(risk_df)
+        )
+    
+    def _show_figure(self, chart_type, filters, build, *key_parts):
+        """Render a figure, reusing its cached JSON for the same snapshot, chart, filters and extra key parts"""
+        if self.figure_cache is None:
+            fig = build()
+        else:
+            key = self.figure_cache.make_key(self.snapshot_id, chart_type, filters_key(filters), *key_parts)
+            figure_json = self.figure_cache.get_or_build(key, lambda: build().to_json())
+            # The JSON came from a validated figure, so skip validating it a second time. st.plotly_chart
+            # still re-encodes the figure; decoding is what a hit adds, and it stays well below a rebuild
+            fig = go.Figure(json.loads(figure_json), _validate=False)
+        
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def _build_empty_figure(self, title):
+        """Build a placeholder figure for a chart whose filters match no projects"""
+        fig = go.Figure()
+        fig.add_annotation(text='No projects match the current filters', showarrow=False, font={'size': 16})
+        fig.update_layout(height=400, title=title, xaxis={'visible': False}, yaxis={'visible': False})
+        return fig
+    
+    def _build_status_distribution_figure(self, cube, filters=None):
+        """Build the status distribution figure"""
+        status_counts = cube.rollup('status', filters)['count']
+        
+        fig = px.pie(
+            values=status_counts.values,
+            names=status_counts.index,
+            title='Project Status Distribution',
+            color_discrete_map=self.status_colors
+        )
+        
+        fig.update_layout(height=400)
+        return fig
+    
+    def _build_department_progress_figure(self, cube, filters=None):
+        """Build the department progress figure"""
+        dept_progress = cube.rollup('department', filters)['progress_mean'].sort_values(ascending=True)
+        if dept_progress.empty:
+            return self._build_empty_figure('Average Progress by Department')
+        
+        fig = px.bar(
+            x=dept_progress.values,
+            y=dept_progress.index,
+            orientation='h',
+            title='Average Progress by Department',
+            color_discrete_sequence=[self.colors['primary']]
+        )
+        
+        fig.update_layout(height=400, xaxis_title='Progress (%)', yaxis_title='Department')
+        return fig
+    
+    def _build_budget_variance_figure(self, cube, filters=None):
+        """Build the budget variance figure"""
+        dept_budgets = cube.rollup('department', filters)[['budget_sum', 'spent_sum']].rename(
+            columns={'budget_sum': 'budget', 'spent_sum': 'spent'}
+        ).reset_index()
+        if dept_budgets.empty:
+            return self._build_empty_figure('Budget vs Actual Spending by Department')
+        
+        fig = px.bar(
+            dept_budgets,
+            x='department',
+            y=['budget', 'spent'],
+            title='Budget vs Actual Spending by Department',
+            barmode='group',
+            color_discrete_sequence=[self.colors['info'], self.colors['primary']]
+        )
+        
+        fig.update_layout(height=400, yaxis_title='Amount ($)')
+        return fig
+    
+    def _build_risk_gauge_figure(self, cube, filters=None):
+        """Build the risk gauge figure"""
+        avg_risk = cube.totals(filters)['risk_score_mean']
+        
+        fig = go.Figure(go.Indicator(
+            mode = "gauge+number+delta",
+            value = avg_risk,
+            domain = {'x': [0, 1], 'y': [0, 1]},
+            title = {'text': "Average Risk Level"},
+            delta = {'reference': 5.0},
+            gauge = {
+                'axis': {'range': [None, 10]},
+                'bar': {'color': self.colors['primary']},
+                'steps': [
+                    {'range': [0, 3], 'color': self.colors['success']},
+                    {'range': [3, 6], 'color': self.colors['warning']},
+                    {'range': [6, 10], 'color': self.colors['danger']}
+                ],
+                'threshold': {
+                    'line': {'color': "red", 'width': 4},
+                    'thickness': 0.75,
+                    'value': 7
+                }
+            }
+        ))
+        
+        fig.update_layout(height=400)
+        return fig
+    
+    def _build_risk_impact_figure(self, projects_df):
+        """Build the risk vs impact figure: WebGL points, or a 2D histogram past SCATTER_POINT_LIMIT"""
+        risk = projects_df['risk_score'].to_numpy(np.float64)
+        budget = projects_df['budget'].to_numpy(np.float64)
+        
+        if len(projects_df) <= SCATTER_POINT_LIMIT:
+            fig = go.Figure()
+            statuses = projects_df['status'].astype(str).to_numpy()
+            names = projects_df['project_name'].astype(str).to_numpy()
+            
+            for status in pd.unique(statuses):
+                mask = statuses == status
+                fig.add_trace(go.Scattergl(
+                    x=risk[mask],
+                    y=budget[mask],
+                    mode='markers',
+                    name=status,
+                    text=names[mask],
+                    marker={'color': self.status_colors.get(status, self.colors['secondary']), 'size': 6, 'opacity': 0.7},
+                    hovertemplate='%{text}<br>Risk: %{x:.1f}<br>Budget: $%{y:,.0f}<extra></extra>'
+                ))
+            title = 'Risk vs Budget Impact'
+        else:
+            counts, risk_edges, budget_edges = np.histogram2d(risk, budget, bins=SCATTER_BINS)
+            fig = go.Figure(go.Heatmap(
+                z=counts.T,
+                x=(risk_edges[:-1] + risk_edges[1:]) / 2,
+                y=(budget_edges[:-1] + budget_edges[1:]) / 2,
+                colorscale=self.heat_colorscale,
+                colorbar={'title': 'Projects'},
+                hovertemplate='Risk: %{x:.1f}<br>Budget: $%{y:,.0f}<br>Projects: %{z:,}<extra></extra>'
+            ))
+            title = f'Risk vs Budget Impact ({len(projects_df):,} projects, binned)'
+        
+        fig.update_layout(height=400, title=title, xaxis_title='Risk Score', yaxis_title='Budget ($)')
+        return fig
+    
+    def _build_timeline_figure(self, projects_df, date_range=None):
+        """Build the timeline figure: one bar per project, or department swimlanes past TIMELINE_BAR_LIMIT"""
+        starts = to_day_array(projects_df['start_date'])
+        ends = to_day_array(projects_df['end_date'])
+        
+        # Swimlanes only cover the visible window
+        if date_range is not None:
+            starts = np.maximum(starts, np.datetime64(date_range[0], 'D'))
+            ends = np.minimum(ends, np.datetime64(date_range[1], 'D'))
+        
+        if len(projects_df) <= TIMELINE_BAR_LIMIT:
+            fig = px.timeline(
+                x_start=starts,
+                x_end=ends,
+                y=_project_labels(projects_df),
+                color=projects_df['status'].astype(str),
+                color_discrete_map=self.status_colors,
+                title='Project Timeline'
+            )
+            fig.update_yaxes(autorange='reversed')
+        else:
+            bin_starts, lanes, active = _department_activity(projects_df['department'], starts, ends)
+            fig = go.Figure(go.Heatmap(
+                z=active,
+                x=bin_starts,
+                y=lanes,
+                colorscale=self.heat_colorscale,
+                colorbar={'title': 'Active'},
+                hovertemplate='%{y}<br>Week of %{x|%b %d, %Y}<br>Active projects: %{z:,}<extra></extra>'
+            ))
+            fig.update_layout(title=f'Active Projects by Department ({len(projects_df):,} projects)')
+        
+        fig.update_layout(height=400, xaxis_title='Date', yaxis_title=None)
+        if date_range is not None:
+            fig.update_xaxes(range=[str(date_range[0]), str(date_range[1])])
+        return fig
+    
+    def _build_concurrency_figure(self, concurrency):
+        """Build the concurrent projects per day figure"""
+        fig = go.Figure(go.Scatter(
+            x=concurrency.index,
+            y=concurrency.to_numpy(),
+            mode='lines',
+            fill='tozeroy',
+            line={'color': self.colors['primary']},
+            hovertemplate='%{x|%b %d, %Y}<br>Active projects: %{y:,}<extra></extra>'
+        ))
+        
+        fig.update_layout(
+            height=300,
+            title='Concurrent Projects per Day',
+            xaxis_title='Date',
+            yaxis_title='Active Projects'
+        )
+        return fig
+    
+    def _build_allocation_heatmap_figure(self, allocation_matrix, group_label):
+        """Build the allocation heat map, one row per group and one column per week"""
+        fig = go.Figure(go.Heatmap(
+            z=allocation_matrix.to_numpy(),
+            x=allocation_matrix.columns,
+            y=allocation_matrix.index,
+            colorscale=self.heat_colorscale,
+            colorbar={'title': 'Team Members'},
+            hovertemplate='%{y}<br>Week of %{x|%b %d, %Y}<br>Team members: %{z:,}<extra></extra>'
+        ))
+        
+        fig.update_layout(
+            height=400,
+            title=f'Team Members Allocated by {group_label} and Week',
+            xaxis_title='Week',
+            yaxis_title=None
+        )
+        return fig
+    
+    def _build_schedule_risk_figure(self, risk_df):
+        """Build the schedule risk figure: a P10-P90 finish band per project, its P50 and the planned end"""
+        labels = _project_labels(risk_df)
+        p10 = risk_df['finish_p10'].to_numpy()
+        p90 = risk_df['finish_p90'].to_numpy()
+        
+        # One line segment per project, separated by gaps
+        gaps = np.full(len(risk_df), None)
+        band_x = np.column_stack([p10.astype(object), p90.astype(object), gaps]).ravel()
+        band_y = np.column_stack([labels, labels, gaps]).ravel()
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=band_x,
+            y=band_y,
+            mode='lines',
+            line={'color': self.colors['primary'], 'width': 6},
+            name='P10-P90 finish',
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=risk_df['finish_p50'],
+            y=labels,
+            mode='markers',
+            marker={'color': self.colors['secondary'], 'size': 9},
+            name='P50 finish',
+            customdata=risk_df['late_probability'],
+            hovertemplate='%{y}<br>P50 finish: %{x|%b %d, %Y}<br>P(late): %{customdata:.0f}%<extra></extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            x=risk_df['end_date'],
+            y=labels,
+            mode='markers',
+            marker={'color': self.colors['danger'], 'symbol': 'line-ns-open', 'size': 16, 'line': {'width': 2}},
+            name='Planned end',
+            hovertemplate='%{y}<br>Planned end: %{x|%b %d, %Y}<extra></extra>'
+        ))
+        
+        fig.update_layout(
+            height=max(300, 28 * len(risk_df) + 120),
+            title='Simulated Finish Dates of the Projects Most Likely to Run Late',
+            xaxis_title='Finish Date',
+            yaxis_title=None,
+            legend={'orientation': 'h', 'y': -0.15}
+        )
+        fig.update_yaxes(autorange='reversed')
+        return fig
+
+def _project_labels(projects_df):
+    """One axis label per project; names repeat across the portfolio, so each carries its id"""
+    return [f"{name} (#{project_id})" for name, project_id in zip(projects_df['project_name'], projects_df['project_id'])]
+
+def _department_activity(departments, starts, ends, max_bins=TIMELINE_MAX_BINS):
+    """Active projects per department and time bin, swept from start/end difference arrays"""
+    departments = to_category(departments)
+    lanes = departments.cat.categories.astype(str)
+    codes = departments.cat.codes.to_numpy()
+    
+    valid = (codes >= 0) & ~np.isnat(starts) & ~np.isnat(ends)
+    if not valid.any():
+        return np.array([], dtype='datetime64[D]'), lanes, np.zeros((len(lanes), 0))
+    
+    codes, starts, ends = codes[valid].astype(np.int64), starts[valid], ends[valid]
+    first_day = starts.min()
+    span_days = int((ends.max() - first_day).astype(np.int64)) + 1
+    
+    # Weekly bins, widened so long portfolios still fit in max_bins
+    bin_days = max(7, -(-span_days // max_bins))
+    num_bins = -(-span_days // bin_days)
+    start_bins = (starts - first_day).astype(np.int64) // bin_days
+    end_bins = np.maximum((ends - first_day).astype(np.int64) // bin_days, start_bins)
+    
+    active = sweep_counts(codes, start_bins, end_bins, len(lanes), num_bins)
+    
+    bin_starts = first_day + np.arange(num_bins) * bin_days
+    return bin_starts, lanes, active
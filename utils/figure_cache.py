@@ -0,0 +1,52 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+class FigureCache:
+    """Serialized Plotly figures, evicted least recently used once they pass a byte budget"""
+    
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        """Initialize cache with the total size of figure JSON it may hold"""
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(*parts):
+        """Hash the parts that identify a figure (snapshot id, chart type, filter state, ...)"""
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def get_or_build(self, key, build):
+        """Return cached figure JSON for a key, building and storing it on a miss"""
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return self._figures[key]
+            self.misses += 1
+        
+        # Build outside the lock so one slow figure does not hold up other sessions
+        figure_json = build()
+        size = len(figure_json)
+        
+        with self._lock:
+            if size > self.max_bytes or key in self._figures:
+                return figure_json
+            
+            self._figures[key] = figure_json
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._figures.popitem(last=False)
+                self.total_bytes -= len(evicted)
+        
+        return figure_json
+    
+    def clear(self):
+        """Drop every cached figure"""
+        with self._lock:
+            self._figures.clear()
+            self.total_bytes = 0
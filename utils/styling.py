@@ -1,5 +1,26 @@
+import re
+from functools import lru_cache
 import streamlit as st
 
+# Number display formats (printf style, as understood by st.column_config); text helpers format with the same specs
+CURRENCY_FORMAT = '$%,.0f'
+PERCENT_FORMAT = '%.1f%%'
+SCORE_FORMAT = '%.1f'
+PROBABILITY_FORMAT = '%.0f%%'
+
+# Table column display formats
+COLUMN_FORMATS = {
+    'budget': CURRENCY_FORMAT,
+    'spent': CURRENCY_FORMAT,
+    'progress': PERCENT_FORMAT,
+    'risk_score': SCORE_FORMAT,
+    'late_probability': PROBABILITY_FORMAT,
+    'over_budget_probability': PROBABILITY_FORMAT,
+    'spend_p10': CURRENCY_FORMAT,
+    'spend_p50': CURRENCY_FORMAT,
+    'spend_p90': CURRENCY_FORMAT
+}
+
 def apply_custom_styling():
     """Apply Zumiez brand styling to the Streamlit dashboard"""
     
@@ -307,15 +328,38 @@ def create_alert(message, alert_type='info'):
     """Create a styled alert box"""
     return f'<div class="alert alert-{alert_type}">{message}</div>'
 
+def column_format_config(columns):
+    """Streamlit column_config that formats numeric columns at display time"""
+    return {
+        col: st.column_config.NumberColumn(format=number_format)
+        for col, number_format in COLUMN_FORMATS.items()
+        if col in columns
+    }
+
+def format_number(value, number_format, decimal_places=None):
+    """Format a number as st.column_config renders a printf format, optionally with other decimal places"""
+    return _format_template(number_format, decimal_places).format(value)
+
+@lru_cache(maxsize=None)
+def _format_template(number_format, decimal_places=None):
+    """str.format template of a printf number format such as '$%,.0f' or '%.1f%%'"""
+    match = re.fullmatch(r'(.*?)%(,?)\.(\d+)f(.*)', number_format)
+    if match is None:
+        raise ValueError(f"Unsupported number format: {number_format}")
+    prefix, thousands, precision, suffix = match.groups()
+    if decimal_places is not None:
+        precision = decimal_places
+    
+    def literal(text):
+        """Printf literal text as str.format literal text"""
+        return text.replace('%%', '%').replace('{', '{{').replace('}', '}}')
+    
+    return f"{literal(prefix)}{{:{thousands}.{precision}f}}{literal(suffix)}"
+
 def format_currency(amount):
-    """Format currency with proper styling"""
-    if amount >= 1000000:
-        return f"${amount/1000000:.1f}M"
-    elif amount >= 1000:
-        return f"${amount/1000:.0f}K"
-    else:
-        return f"${amount:,.0f}"
+    """Format currency as the table shows it"""
+    return format_number(amount, CURRENCY_FORMAT)
 
-def format_percentage(value, decimal_places=1):
-    """Format percentage with proper styling"""
-    return f"{value:.{decimal_places}f}%"
+def format_percentage(value, decimal_places=None):
+    """Format percentage as the table shows it, optionally with other decimal places"""
+    return format_number(value, PERCENT_FORMAT, decimal_places)